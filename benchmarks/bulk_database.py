@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+"""
+Counts the queries per database adapter, which the
+:mod:`jsonapi.bulk_database` sends for a mixed-type include set.
+
+The benchmark does not need a database server. Each type is stored in its
+own fake database adapter, which counts its :meth:`get_many` calls. The
+identifiers of the included resources are shuffled, like the relatives
+collected from several relationships, and loaded once grouped with
+:func:`itertools.groupby` on the unsorted list (the old behaviour: one query
+per run of equal types) and once with
+:meth:`jsonapi.bulk_database.database.Session.get_many`, which buckets the
+identifiers by their database adapter (one query per adapter).
+
+.. code-block:: bash
+
+    $ python3 benchmarks/bulk_database.py --types 4 --resources 1000
+"""
+
+# std
+import argparse
+import itertools
+import random
+
+# local
+import jsonapi
+import jsonapi.bulk_database
+
+
+class FakeDatabase(jsonapi.base.database.Database):
+    """
+    A database adapter, which counts the :meth:`get_many` calls of its
+    sessions.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.queries = 0
+        return None
+
+    def session(self):
+        return FakeSession(api=self.api, db=self)
+
+
+class FakeSession(jsonapi.base.database.Session):
+    """
+    Returns a placeholder object for each requested identifier.
+    """
+
+    def __init__(self, api, db):
+        super().__init__(api)
+        self.db = db
+        return None
+
+    def get_many(self, identifiers, required=False):
+        self.db.queries += 1
+        return {identifier: object() for identifier in identifiers}
+
+
+def setup(types, resources, seed):
+    """
+    Returns the bulk database, the fake database adapters and the shuffled
+    identifiers of *resources* resources, which are distributed over
+    *types* types.
+    """
+    bulk_db = jsonapi.bulk_database.Database()
+    dbs = dict()
+    for i in range(types):
+        typename = "type{}".format(i)
+        dbs[typename] = FakeDatabase()
+        bulk_db.add_type(typename, dbs[typename])
+
+    identifiers = [
+        ("type{}".format(i % types), str(i)) for i in range(resources)
+    ]
+    random.Random(seed).shuffle(identifiers)
+    return (bulk_db, dbs, identifiers)
+
+
+def run_groupby(bulk_db, identifiers):
+    """
+    Loads the resources with one :meth:`get_many` call per run of equal
+    types in the unsorted *identifiers*.
+    """
+    sessions = dict()
+    key = lambda identifier: identifier[0]
+    for typename, group in itertools.groupby(identifiers, key=key):
+        db = bulk_db.get_db(typename)
+        if not db in sessions:
+            sessions[db] = db.session()
+        sessions[db].get_many(list(group))
+    return None
+
+
+def run_bucketed(bulk_db, identifiers):
+    """
+    Loads the resources with the bulk session.
+    """
+    bulk_db.session().get_many(identifiers)
+    return None
+
+
+def count_queries(func, types, resources, seed):
+    """
+    Returns a dictionary, which maps each typename to the number of queries
+    sent to its database adapter by *func*.
+    """
+    bulk_db, dbs, identifiers = setup(types, resources, seed)
+    func(bulk_db, identifiers)
+    return {typename: db.queries for typename, db in dbs.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--types", type=int, default=4,
+        help="The number of types (and database adapters)."
+    )
+    parser.add_argument(
+        "--resources", type=int, default=1000,
+        help="The number of included resources."
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0,
+        help="The seed used to shuffle the identifiers."
+    )
+    args = parser.parse_args()
+
+    groupby = count_queries(run_groupby, args.types, args.resources, args.seed)
+    bucketed = count_queries(
+        run_bucketed, args.types, args.resources, args.seed
+    )
+
+    print("{:<10} {:>8} {:>8}".format("type", "groupby", "bucketed"))
+    for typename in sorted(groupby):
+        print("{:<10} {:>8} {:>8}".format(
+            typename, groupby[typename], bucketed[typename]
+        ))
+    print("{:<10} {:>8} {:>8}".format(
+        "total", sum(groupby.values()), sum(bucketed.values())
+    ))
+    return None
+
+
+if __name__ == "__main__":
+    main()
@@ -48,6 +48,7 @@ Contains an API base application for **asynchronous** database adapters.
 .. automodule:: jsonapi.asyncio.api
 .. automodule:: jsonapi.asyncio.database
 .. automodule:: jsonapi.asyncio.handler
+.. automodule:: jsonapi.asyncio.request
 .. automodule:: jsonapi.asyncio.serializer
 """
 
@@ -55,4 +56,5 @@ Contains an API base application for **asynchronous** database adapters.
 from . import api
 from . import database
 from . import handler
+from . import request
 from . import serializer
@@ -27,10 +27,51 @@ jsonapi.asyncio.api
 ===================
 
 API base application for asynchronous web frameworks.
+
+Offloading
+----------
+
+Serializing thousands of resources and encoding the JSON document are CPU
+bound tasks, which would block the event loop. So if a response contains more
+resources than the threshold, the work is done in an executor. Small responses
+are still created in the event loop to keep their latency low.
+
+The behaviour can be configured with the API settings:
+
+*   ``asyncio_offload_threshold``
+
+    The minimum number of resources in a document, before the serialization
+    is offloaded. Defaults to *1000*. Use *None* to disable offloading.
+
+*   ``asyncio_executor``
+
+    The :class:`~concurrent.futures.Executor` used to serialize resources.
+    This must be a thread pool, because the resources are not picklable in
+    general. If not given, a thread pool is created.
+
+*   ``asyncio_json_executor``
+
+    The executor used to encode the JSON document. The document contains only
+    plain data, so this can be a
+    :class:`~concurrent.futures.ProcessPoolExecutor`. Defaults to the
+    ``asyncio_executor``.
+
+Streaming
+---------
+
+The resources of a streamed response are loaded in batches from a
+:class:`~jsonapi.asyncio.database.BatchIterator`. So the
+:attr:`~jsonapi.base.response.Response.chunks` of an asynchronous response
+may also be coroutines, which return the next chunk of bytes. The web
+framework must wait for a coroutine, before it requests the next chunk.
+Each batch is serialized and encoded like a document, so large batches are
+offloaded too.
 """
 
 # std
 import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import functools
 import logging
 
 # local
@@ -53,6 +94,192 @@ class API(jsonapi.base.api.API):
     Overrides the base API to support asynchronous web frameworks.
     """
 
+    #: The default value for the ``asyncio_offload_threshold`` setting.
+    DEFAULT_OFFLOAD_THRESHOLD = 1000
+
+    @property
+    def offload_threshold(self):
+        """
+        The minimum number of resources in a document, before the serialization
+        and the JSON encoding are run in an executor. None, if nothing is
+        offloaded.
+        """
+        return self.settings.get(
+            "asyncio_offload_threshold", self.DEFAULT_OFFLOAD_THRESHOLD
+        )
+
+    @property
+    def executor(self):
+        """
+        The executor used to serialize large lists of resources.
+        """
+        if not "asyncio_executor" in self.settings:
+            self.settings["asyncio_executor"] = ThreadPoolExecutor()
+        return self.settings["asyncio_executor"]
+
+    @property
+    def json_executor(self):
+        """
+        The executor used to encode large JSON documents.
+        """
+        return self.settings.get("asyncio_json_executor") or self.executor
+
+    def must_offload(self, size):
+        """
+        Returns True, if a document with *size* resources should be created
+        in an executor.
+
+        :arg int size:
+        """
+        threshold = self.offload_threshold
+        return threshold is not None and size >= threshold
+
+    @asyncio.coroutine
+    def serialize_many(self, resources, fields):
+        """
+        The same as :func:`jsonapi.base.serializer.serialize_many`, but the
+        serialization is run in the :attr:`executor`, if there are many
+        *resources*.
+        """
+        resources = list(resources)
+        if not self.must_offload(len(resources)):
+            return jsonapi.base.serializer.serialize_many(resources, fields)
+
+        loop = asyncio.get_event_loop()
+        data = yield from loop.run_in_executor(
+            self.executor, jsonapi.base.serializer.serialize_many,
+            resources, fields
+        )
+        return data
+
+    @asyncio.coroutine
+    def dump_document(self, d, size):
+        """
+        Encodes the JSON document *d* like :meth:`dump_json`. If the document
+        contains many resources, the encoding is done in the
+        :attr:`json_executor`.
+
+        :arg d:
+        :arg int size:
+            The number of resources in the document *d*.
+        """
+        if not self.must_offload(size):
+            return self.dump_json(d)
+
+        # A process pool can only be used with the default json encoder,
+        # because the API itself can not be sent to another process.
+        executor = self.json_executor
+        if isinstance(executor, ProcessPoolExecutor)\
+            and type(self).dump_json is jsonapi.base.api.API.dump_json:
+            indent = 1 if self.debug else None
+            func = functools.partial(
+                jsonapi.base.api.dump_json, d, indent=indent
+            )
+        else:
+            func = functools.partial(self.dump_json, d)
+
+        loop = asyncio.get_event_loop()
+        body = yield from loop.run_in_executor(executor, func)
+        return body
+
+    @asyncio.coroutine
+    def _serialize_batch(self, batches, fields):
+        """
+        Loads the next batch from the
+        :class:`~jsonapi.asyncio.database.BatchIterator` *batches* and
+        returns the serialized resource objects.
+        """
+        resources = yield from batches.next_batch()
+        if not resources:
+            return list()
+        return (yield from self.serialize_many(resources, fields))
+
+    def dump_json_batches(self, d, batches, fields, stream_key="data"):
+        """
+        Encodes the JSON document *d* like
+        :meth:`~jsonapi.base.api.API.dump_json_chunks`, but the value of
+        *stream_key* are the resources loaded from the
+        :class:`~jsonapi.asyncio.database.BatchIterator` *batches*.
+
+        Returns a generator, which yields one coroutine per batch. Each
+        coroutine returns the next chunk of bytes. The first chunk contains
+        the first batch, so that an error raised by the query is raised
+        before the response is sent.
+
+        :arg dict d:
+        :arg jsonapi.asyncio.database.BatchIterator batches:
+        :arg dict fields:
+        :arg str stream_key:
+        """
+        keys = list(d.keys())
+        index = keys.index(stream_key)
+        head = "{" + "".join(
+            self.dump_json(key) + ": " + self.dump_json(d[key]) + ", "\
+            for key in keys[:index]
+        ) + self.dump_json(stream_key) + ": ["
+        tail = "]" + "".join(
+            ", " + self.dump_json(key) + ": " + self.dump_json(d[key])\
+            for key in keys[index + 1:]
+        ) + "}"
+
+        state = {"started": False, "exhausted": False}
+
+        @asyncio.coroutine
+        def next_chunk():
+            data = yield from self._serialize_batch(batches, fields)
+            prefix = "" if state["started"] else head
+            if not data:
+                state["exhausted"] = True
+                return (prefix + tail).encode()
+
+            # The resource objects are encoded like a document and the
+            # brackets of the array are removed.
+            body = yield from self.dump_document(data, size=len(data))
+            if state["started"]:
+                prefix = ", "
+            state["started"] = True
+            return (prefix + body.strip()[1:-1]).encode()
+
+        while not state["exhausted"]:
+            yield next_chunk()
+        return None
+
+    def dump_ndjson_batches(self, batches, fields):
+        """
+        The same as :meth:`~jsonapi.base.api.API.dump_ndjson_chunks`, but the
+        items are the resources loaded from the
+        :class:`~jsonapi.asyncio.database.BatchIterator` *batches*. Like
+        :meth:`dump_json_batches`, a coroutine is yielded for each batch.
+
+        :arg jsonapi.asyncio.database.BatchIterator batches:
+        :arg dict fields:
+        """
+        state = {"exhausted": False}
+
+        @asyncio.coroutine
+        def next_chunk():
+            data = yield from self._serialize_batch(batches, fields)
+            if not data:
+                state["exhausted"] = True
+                return b""
+
+            func = functools.partial(self._dump_ndjson, data)
+            if not self.must_offload(len(data)):
+                return func()
+
+            loop = asyncio.get_event_loop()
+            return (yield from loop.run_in_executor(self.executor, func))
+
+        while not state["exhausted"]:
+            yield next_chunk()
+        return None
+
+    def _dump_ndjson(self, items):
+        """
+        Returns the newline delimited JSON of all *items* as bytes.
+        """
+        return b"".join(self.dump_ndjson_chunks(items))
+
     def _create_routes(self):
         """
         We use our own *asynchronous* handlers. So we have to override this
@@ -60,6 +287,7 @@ class API(jsonapi.base.api.API):
         """
         uris = jsonapi.base.api.build_uris(self._uri)
         self._routes.extend([
+            (uris["batch"], handler.BatchHandler),
             (uris["collection"], handler.CollectionHandler),
             (uris["related"], handler.RelatedHandler),
             (uris["resource"], handler.ResourceHandler),
@@ -78,6 +306,86 @@ class API(jsonapi.base.api.API):
         super().add_type(schema, **kargs)
         return None
 
+    @asyncio.coroutine
+    def import_ndjson(self, body, typename=None, batch_size=None):
+        """
+        The same as :meth:`~jsonapi.base.api.API.import_ndjson`, but reads
+        the document from the :class:`~jsonapi.asyncio.request.BodyStream`
+        *body*. So the import starts before the whole document has been
+        received.
+
+        :arg jsonapi.asyncio.request.BodyStream body:
+        :arg str typename:
+        :arg int batch_size:
+        """
+        if batch_size is None:
+            batch_size = self.settings.get("import_batch_size", 1000)
+
+        reports = list()
+        batch = list()
+        lineno = 0
+        rest = b""
+        at_eof = False
+        while not at_eof:
+            chunk = yield from body.read()
+            at_eof = not chunk
+
+            lines = (rest + chunk).split(b"\n")
+            rest = b"" if at_eof else lines.pop()
+            for line in lines:
+                lineno += 1
+                if not line.strip():
+                    continue
+
+                batch.append((lineno, line))
+                if len(batch) >= batch_size:
+                    report = yield from self._import_batch(
+                        len(reports), batch, typename
+                    )
+                    reports.append(report)
+                    batch = list()
+
+        if batch:
+            report = yield from self._import_batch(
+                len(reports), batch, typename
+            )
+            reports.append(report)
+        return reports
+
+    @asyncio.coroutine
+    def _import_batch(self, index, batch, typename=None):
+        """
+        The same as :meth:`~jsonapi.base.api.API._import_batch`, but
+        asynchronous.
+        """
+        resource_objects, errors_ = self._load_import_batch(batch, typename)
+
+        db = self._db.session()
+        resources = list()
+        try:
+            for typename_, objects in resource_objects.items():
+                unserializer = self.get_unserializer(typename_)
+                resources.extend(
+                    (yield from unserializer.create_resources(db, objects))
+                )
+
+            db.save(resources)
+            yield from db.commit()
+        except errors.Error as err:
+            # The session is not committed, so the batch is skipped.
+            yield from db.rollback()
+            errors_.append((None, err))
+            resources = list()
+        except Exception as err:
+            # The database adapter rejected the batch.
+            LOG.error(err, exc_info=True)
+            yield from db.rollback()
+            errors_.append((None, errors.InternalServerError(
+                detail="The batch could not be saved in the database."
+            )))
+            resources = list()
+        return self._import_report(index, batch, len(resources), errors_)
+
     @asyncio.coroutine
     def handle_request(self, request):
         """
@@ -92,6 +400,15 @@ class API(jsonapi.base.api.API):
 
             yield from handler.prepare()
             yield from handler.handle()
+
+            # See :meth:`jsonapi.base.api.API.handle_request`.
+            response = handler.response
+            if response.is_stream:
+                chunks = iter(response.chunks)
+                first_chunk = next(chunks, None)
+                if asyncio.iscoroutine(first_chunk):
+                    first_chunk = yield from first_chunk
+                response.chunks = self._iter_stream(first_chunk, chunks)
         except (errors.Error, errors.ErrorList) as err:
             #LOG.debug(err, exc_info=False)
             print("DEBUG", self.debug)
@@ -104,4 +421,26 @@ class API(jsonapi.base.api.API):
             LOG.critical(err, exc_info=True)
             raise
         else:
-            return handler.response
+            return response
+
+    def _iter_stream(self, first_chunk, chunks):
+        """
+        The same as :meth:`jsonapi.base.api.API._iter_stream`, but an error
+        raised by a coroutine in the *chunks* is logged too.
+        """
+        for chunk in super()._iter_stream(first_chunk, chunks):
+            if asyncio.iscoroutine(chunk):
+                chunk = self._log_stream_error(chunk)
+            yield chunk
+        return None
+
+    @asyncio.coroutine
+    def _log_stream_error(self, chunk):
+        """
+        Waits for the coroutine *chunk* and logs the error, if it fails.
+        """
+        try:
+            return (yield from chunk)
+        except Exception as err:
+            LOG.critical(err, exc_info=True)
+            raise
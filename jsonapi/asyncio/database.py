@@ -27,23 +27,78 @@ jsonapi.asyncio.database
 ========================
 
 Defines the interface for an asynchronous database adapters.
+
+If you want to use a **synchronous** database adapter (e.g.
+:mod:`jsonapi.sqlalchemy`) with an asynchronous API, you can wrap it in an
+:class:`ExecutorDatabase`. The blocking database calls are then run in a
+thread pool and do not block the event loop:
+
+.. code-block:: python3
+
+    sql_db = jsonapi.sqlalchemy.Database(sessionmaker=Session)
+    db = jsonapi.asyncio.database.ExecutorDatabase(sql_db, max_workers=8)
+
+    api = jsonapi.tornado.TornadoAPI("/api", db=db)
 """
 
 # std
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import itertools
+import threading
 
 # local
 import jsonapi
 from jsonapi.base import errors
-from jsonapi.base.utilities import relative_identifiers
+from jsonapi.base.utilities import relative_identifiers, aggregate_resources
 
 
 __all__ = [
+    "BatchIterator",
     "Database",
-    "Session"
+    "Session",
+    "ExecutorDatabase",
+    "ExecutorSession",
+    "ExecutorBatchIterator"
 ]
 
 
+class BatchIterator(object):
+    """
+    Loads the resources of a streamed response in batches of *batch_size*
+    with the coroutine :meth:`next_batch`. It is returned by
+    :meth:`Session.query_iter`.
+
+    The default implementation slices the iterable *resources*, which is
+    already in memory.
+
+    :arg resources:
+    :arg int batch_size:
+    """
+
+    def __init__(self, resources, batch_size):
+        self.resources = iter(resources)
+        self.batch_size = batch_size
+        return None
+
+    def _slice(self):
+        """
+        Returns a list with the next *batch_size* resources.
+        """
+        return list(itertools.islice(self.resources, self.batch_size))
+
+    @asyncio.coroutine
+    def next_batch(self):
+        """
+        **May be overridden**
+
+        Returns a list with the next resources. The list is empty, if all
+        resources have been returned.
+        """
+        return self._slice()
+
+
 class Database(jsonapi.base.database.Database):
     """
     The same as the base database class, but you should inherit from this
@@ -57,13 +112,169 @@ class Session(jsonapi.base.database.Session):
     return *awaitables*:
 
     *   :meth:`query`
+    *   :meth:`query_iter`
     *   :meth:`query_size`
+    *   :meth:`query_serialized`
+    *   :meth:`aggregate`
+    *   :meth:`query_relatives`
+    *   :meth:`query_relatives_size`
+    *   :meth:`count_relatives`
     *   :meth:`get`
     *   :meth:`get_many`
+    *   :meth:`check_existence`
+    *   :meth:`delete_where`
     *   :meth:`commit`
+    *   :meth:`rollback`
     *   :meth:`get_relatives`
     """
 
+    @asyncio.coroutine
+    def query_iter(self, typename,
+        *, order=None, limit=None, offset=None, filters=None, batch_size=1000
+        ):
+        """
+        **May be overridden** for performance reasons.
+
+        Does the same as :meth:`jsonapi.base.database.Session.query_iter`,
+        but returns a :class:`BatchIterator`, which loads the resources
+        asynchronously in batches of *batch_size*. Database adapters should
+        override this method and load each batch from a server side cursor.
+
+        The default implementation loads all resources with :meth:`query`.
+        """
+        resources = yield from self.query(
+            typename, order=order, limit=limit, offset=offset, filters=filters
+        )
+        return BatchIterator(resources, batch_size)
+
+    @asyncio.coroutine
+    def query_serialized(self, typename,
+        *, order=None, limit=None, offset=None, filters=None, fields=None
+        ):
+        """
+        **May be overridden** for performance reasons.
+
+        Does the same as :meth:`jsonapi.base.database.Session.query_serialized`,
+        but asynchronous.
+        """
+        resources = yield from self.query(
+            typename, order=order, limit=limit, offset=offset, filters=filters
+        )
+        data = yield from self.api.serialize_many(
+            resources, fields=fields or dict()
+        )
+        return data
+
+    @asyncio.coroutine
+    def aggregate(self, typename, aggregates, *, group=None, filters=None):
+        """
+        **May be overridden** for performance reasons.
+
+        Does the same as :meth:`jsonapi.base.database.Session.aggregate`,
+        but asynchronous.
+        """
+        resources = yield from self.query(typename, filters=filters)
+        return aggregate_resources(
+            self.api.get_schema(typename), resources, aggregates, group or []
+        )
+
+    @asyncio.coroutine
+    def query_relatives(self, resource, relname,
+        *, order=None, limit=None, offset=None, filters=None
+        ):
+        """
+        **May be overridden** for performance reasons.
+
+        Does the same as :meth:`jsonapi.base.database.Session.query_relatives`,
+        but asynchronous.
+        """
+        relatives = yield from self.get_relatives([resource], [[relname]])
+        relatives = list(relatives.values())
+
+        offset = offset or 0
+        if limit is None:
+            return relatives[offset:]
+        return relatives[offset:offset + limit]
+
+    @asyncio.coroutine
+    def query_relatives_size(self, resource, relname, *, filters=None):
+        """
+        **May be overridden** for performance reasons.
+
+        Does the same as
+        :meth:`jsonapi.base.database.Session.query_relatives_size`, but
+        asynchronous.
+        """
+        relatives = yield from self.get_relatives([resource], [[relname]])
+        return len(relatives)
+
+    @asyncio.coroutine
+    def count_relatives(self, typename, ids, relname):
+        """
+        **May be overridden** for performance reasons.
+
+        Does the same as :meth:`jsonapi.base.database.Session.count_relatives`,
+        but asynchronous.
+        """
+        resources = yield from self.get_many(
+            [(typename, id_) for id_ in ids]
+        )
+
+        counts = dict()
+        for (typename_, id_), resource in resources.items():
+            if resource is not None:
+                counts[id_] = len(relative_identifiers(relname, resource))
+        return counts
+
+    @asyncio.coroutine
+    def delete_where(self, typename, *, filters=None, ids=None):
+        """
+        **May be overridden** for performance reasons.
+
+        Does the same as :meth:`jsonapi.base.database.Session.delete_where`,
+        but asynchronous.
+        """
+        if ids is not None and not filters:
+            identifiers = [(typename, resource_id) for resource_id in ids]
+            resources = yield from self.get_many(identifiers)
+            resources = [
+                resource for resource in resources.values() if resource
+            ]
+        else:
+            resources = yield from self.query(typename, filters=filters)
+
+            if ids is not None:
+                ids = set(ids)
+                id_attribute = self.api.get_schema(typename).id_attribute
+                resources = [
+                    resource for resource in resources\
+                    if id_attribute.get(resource) in ids
+                ]
+
+        self.delete(resources)
+        return len(resources)
+
+    @asyncio.coroutine
+    def rollback(self):
+        """
+        **Can be overridden**
+
+        Does the same as :meth:`jsonapi.base.database.Session.rollback`, but
+        asynchronous.
+        """
+        return None
+
+    @asyncio.coroutine
+    def check_existence(self, identifiers):
+        """
+        **May be overridden** for performance reasons.
+
+        Does the same as :meth:`jsonapi.base.database.Session.check_existence`,
+        but asynchronous.
+        """
+        yield from self.get_many(identifiers, required=True)
+        return None
+
     @asyncio.coroutine
     def get_relatives(self, resources, paths):
         """
@@ -100,3 +311,322 @@ class Session(jsonapi.base.database.Session):
                 # previously fetched relatives.
                 resources = relatives.values()
         return all_relatives
+
+
+class ExecutorDatabase(Database):
+    """
+    Wraps a **synchronous** database adapter, so that it can be used with an
+    asynchronous API. All blocking calls are run in a thread pool.
+
+    Each session is bound to **one** worker thread (session affinity), because
+    most synchronous drivers (e.g. sqlalchemy sessions) must not be used from
+    different threads.
+
+    :arg jsonapi.base.database.Database db:
+        The synchronous database adapter
+    :arg int max_workers:
+        The number of worker threads.
+    :arg jsonapi.base.api.API api:
+    """
+
+    def __init__(self, db, max_workers=4, api=None):
+        """
+        """
+        self.db = db
+        self.max_workers = max_workers
+
+        # Each worker is a thread pool with exactly one thread, so that all
+        # calls of a session are run in the same thread.
+        self._workers = [
+            ThreadPoolExecutor(max_workers=1) for i in range(max_workers)
+        ]
+
+        # The number of scheduled, but not yet finished calls for each worker.
+        self._queue_depths = [0 for i in range(max_workers)]
+        self._lock = threading.Lock()
+
+        super().__init__(api=api)
+        if api is not None:
+            db.init_api(api)
+        return None
+
+    def init_api(self, api):
+        """
+        """
+        super().init_api(api)
+        self.db.init_api(api)
+        return None
+
+    @property
+    def queue_depths(self):
+        """
+        A list with the number of pending calls for each worker thread.
+        """
+        with self._lock:
+            return list(self._queue_depths)
+
+    @property
+    def queue_depth(self):
+        """
+        The total number of pending calls in the thread pool.
+        """
+        return sum(self.queue_depths)
+
+    def _select_worker(self):
+        """
+        Returns the index of the worker with the lowest queue depth.
+        """
+        with self._lock:
+            depths = self._queue_depths
+            return min(range(len(depths)), key=depths.__getitem__)
+
+    def _done(self, worker, future):
+        """
+        Called, when a call scheduled on the *worker* is done.
+        """
+        with self._lock:
+            self._queue_depths[worker] -= 1
+        return None
+
+    def submit(self, worker, func, *args, **kargs):
+        """
+        Schedules the call ``func(*args, **kargs)`` on the *worker* thread and
+        returns a :class:`concurrent.futures.Future`.
+
+        :arg int worker:
+            The index of the worker thread
+        :arg func:
+        """
+        with self._lock:
+            self._queue_depths[worker] += 1
+
+        future = self._workers[worker].submit(func, *args, **kargs)
+        future.add_done_callback(functools.partial(self._done, worker))
+        return future
+
+    def session(self):
+        """
+        """
+        return ExecutorSession(self.api, self, self._select_worker())
+
+
+class ExecutorSession(Session):
+    """
+    Forwards all calls to a session of the wrapped synchronous database
+    adapter. The session is created and used only in the worker thread
+    *worker*.
+
+    .. hint::
+
+        The resources returned by this session are serialized outside of the
+        worker thread: Small responses in the event loop thread and large
+        ones in the ``asyncio_executor`` of the API
+        (see :mod:`jsonapi.asyncio.api`). So make sure, that your ORM does
+        not lazy load relationships, which are serialized.
+
+    :arg jsonapi.base.api.API api:
+    :arg ExecutorDatabase db:
+    :arg int worker:
+        The index of the worker thread this session is bound to.
+    """
+
+    def __init__(self, api, db, worker):
+        """
+        """
+        super().__init__(api)
+        self.db = db
+        self.worker = worker
+
+        # The synchronous session is created lazy in the worker thread.
+        self._session = None
+
+        # The futures of the *save()* and *delete()* calls. Errors are
+        # raised in :meth:`commit`.
+        self._scheduled = list()
+        return None
+
+    def _call(self, method, *args, **kargs):
+        """
+        Calls the *method* of the synchronous session. This method is
+        executed in the worker thread.
+        """
+        if self._session is None:
+            self._session = self.db.db.session()
+        return getattr(self._session, method)(*args, **kargs)
+
+    def _submit(self, method, *args, **kargs):
+        """
+        Schedules the call of the synchronous session's *method* in the worker
+        thread and returns an asyncio future.
+        """
+        future = self.db.submit(self.worker, self._call, method, *args, **kargs)
+        return asyncio.wrap_future(future)
+
+    def query(self, typename,
+        *, order=None, limit=None, offset=None, filters=None
+        ):
+        """
+        """
+        return self._submit(
+            "query", typename,
+            order=order, limit=limit, offset=offset, filters=filters
+        )
+
+    @asyncio.coroutine
+    def query_iter(self, typename,
+        *, order=None, limit=None, offset=None, filters=None, batch_size=1000
+        ):
+        """
+        Creates the iterator of the synchronous
+        :meth:`~jsonapi.base.database.Session.query_iter` in the worker
+        thread. The batches are loaded in the worker thread too, so the
+        server side cursor is never touched by another thread.
+        """
+        resources = yield from self._submit(
+            "query_iter", typename, order=order, limit=limit, offset=offset,
+            filters=filters, batch_size=batch_size
+        )
+        return ExecutorBatchIterator(self, resources, batch_size)
+
+    def query_size(self, typename,
+        *, order=None, limit=None, offset=None, filters=None
+        ):
+        """
+        """
+        return self._submit(
+            "query_size", typename,
+            order=order, limit=limit, offset=offset, filters=filters
+        )
+
+    def query_serialized(self, typename,
+        *, order=None, limit=None, offset=None, filters=None, fields=None
+        ):
+        """
+        """
+        return self._submit(
+            "query_serialized", typename, order=order, limit=limit,
+            offset=offset, filters=filters, fields=fields
+        )
+
+    def aggregate(self, typename, aggregates, *, group=None, filters=None):
+        """
+        """
+        return self._submit(
+            "aggregate", typename, aggregates, group=group, filters=filters
+        )
+
+    def query_relatives(self, resource, relname,
+        *, order=None, limit=None, offset=None, filters=None
+        ):
+        """
+        """
+        return self._submit(
+            "query_relatives", resource, relname,
+            order=order, limit=limit, offset=offset, filters=filters
+        )
+
+    def query_relatives_size(self, resource, relname, *, filters=None):
+        """
+        """
+        return self._submit(
+            "query_relatives_size", resource, relname, filters=filters
+        )
+
+    def get(self, identifier, required=False):
+        """
+        """
+        return self._submit("get", identifier, required)
+
+    def get_many(self, identifiers, required=False):
+        """
+        """
+        return self._submit("get_many", identifiers, required)
+
+    def check_existence(self, identifiers):
+        """
+        """
+        return self._submit("check_existence", identifiers)
+
+    def count_relatives(self, typename, ids, relname):
+        """
+        """
+        return self._submit("count_relatives", typename, ids, relname)
+
+    def get_relatives(self, resources, paths):
+        """
+        Runs the synchronous
+        :meth:`~jsonapi.base.database.Session.get_relatives` in the worker
+        thread, so that all include levels are resolved in one hand off.
+        """
+        return self._submit("get_relatives", resources, paths)
+
+    def delete_where(self, typename, *, filters=None, ids=None):
+        """
+        """
+        return self._submit("delete_where", typename, filters=filters, ids=ids)
+
+    def save(self, resources):
+        """
+        """
+        future = self.db.submit(self.worker, self._call, "save", resources)
+        self._scheduled.append(future)
+        return None
+
+    def delete(self, resources):
+        """
+        """
+        future = self.db.submit(self.worker, self._call, "delete", resources)
+        self._scheduled.append(future)
+        return None
+
+    def _commit(self, scheduled):
+        """
+        Commits the synchronous session. This method is executed in the
+        worker thread.
+
+        :arg list scheduled:
+            The futures of the *save()* and *delete()* calls, which have been
+            scheduled before the commit.
+        """
+        # The worker thread executes the calls in order, so all *scheduled*
+        # calls are done at this point.
+        for future in scheduled:
+            if future.exception() is not None:
+                raise future.exception()
+        return self._call("commit")
+
+    def commit(self):
+        """
+        """
+        scheduled, self._scheduled = self._scheduled, list()
+        future = self.db.submit(self.worker, self._commit, scheduled)
+        return asyncio.wrap_future(future)
+
+    def rollback(self):
+        """
+        """
+        self._scheduled = list()
+        return self._submit("rollback")
+
+
+class ExecutorBatchIterator(BatchIterator):
+    """
+    Loads the batches of the iterator *resources* returned by the
+    synchronous :meth:`~jsonapi.base.database.Session.query_iter` in the
+    worker thread of the :class:`ExecutorSession` *session*.
+
+    :arg ExecutorSession session:
+    :arg resources:
+    :arg int batch_size:
+    """
+
+    def __init__(self, session, resources, batch_size):
+        super().__init__(resources, batch_size)
+        self.session = session
+        return None
+
+    def next_batch(self):
+        """
+        """
+        future = self.session.db.submit(self.session.worker, self._slice)
+        return asyncio.wrap_future(future)
@@ -27,6 +27,7 @@ jsonapi.asyncio.handler
 =======================
 
 .. automodule:: jsonapi.asyncio.handler.base
+.. automodule:: jsonapi.asyncio.handler.batch
 .. automodule:: jsonapi.asyncio.handler.collection
 .. automodule:: jsonapi.asyncio.handler.related
 .. automodule:: jsonapi.asyncio.handler.relationship
@@ -34,6 +35,7 @@ jsonapi.asyncio.handler
 """
 
 # local
+from .batch import BatchHandler
 from .collection import CollectionHandler
 from .related import RelatedHandler
 from .relationship import RelationshipHandler
@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2016 Benedikt Schmitt
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+jsonapi.asyncio.handler.batch
+=============================
+
+The same as :mod:`jsonapi.base.handler.batch`, but asynchronous.
+"""
+
+# std
+import asyncio
+from collections import OrderedDict
+
+# local
+from jsonapi.base import errors
+from jsonapi.base import validators
+from jsonapi.base.handler.batch import LOCAL_ID_PREFIX
+from .base import BaseHandler
+
+
+class LocalIdSession(object):
+    """
+    The same as :class:`jsonapi.base.handler.batch.LocalIdSession`, but
+    for an asynchronous :class:`~jsonapi.asyncio.database.Session`.
+
+    :arg jsonapi.asyncio.database.Session db:
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+        #: Maps the identifiers ``(typename, LOCAL_ID_PREFIX + lid)`` to the
+        #: new resources.
+        self.local_resources = dict()
+        return None
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+    @asyncio.coroutine
+    def get(self, identifier, required=False):
+        """
+        The same as :meth:`jsonapi.asyncio.database.Session.get`, but also
+        returns resources with a local identifier.
+        """
+        if identifier in self.local_resources:
+            return self.local_resources[identifier]
+        return (yield from self.db.get(identifier, required=required))
+
+    @asyncio.coroutine
+    def get_many(self, identifiers, required=False):
+        """
+        The same as :meth:`jsonapi.asyncio.database.Session.get_many`, but
+        also returns resources with a local identifier.
+        """
+        identifiers = set(identifiers)
+        local_identifiers = identifiers & self.local_resources.keys()
+
+        resources = yield from self.db.get_many(
+            identifiers - local_identifiers, required=required
+        )
+        for identifier in local_identifiers:
+            resources[identifier] = self.local_resources[identifier]
+        return resources
+
+
+class BatchHandler(BaseHandler):
+    """
+    Handles the batch endpoint.
+    """
+
+    def __init__(self, api, db, request):
+        """
+        """
+        super().__init__(api, LocalIdSession(db), request)
+        return None
+
+    @asyncio.coroutine
+    def prepare(self):
+        """
+        """
+        if self.request.content_type[0] != "application/vnd.api+json":
+            raise errors.UnsupportedMediaType()
+        return None
+
+    def resolve_identifier(self, identifier, source_pointer="/"):
+        """
+        Replaces the local id (*lid*) in the resource identifier object
+        *identifier* with the local identifier of the new resource.
+
+        :arg dict identifier:
+        :arg str source_pointer:
+
+        :raises BadRequest:
+            If the local id is unknown.
+        """
+        if not isinstance(identifier, dict) or not "lid" in identifier:
+            return None
+
+        lid = identifier.pop("lid")
+        id_ = LOCAL_ID_PREFIX + str(lid)
+        if not (identifier.get("type"), id_) in self.db.local_resources:
+            raise errors.BadRequest(
+                detail="The local id '{}' is unknown.".format(lid),
+                source_pointer=source_pointer + "lid/"
+            )
+
+        identifier["id"] = id_
+        return None
+
+    def resolve_linkage(self, linkage, source_pointer="/"):
+        """
+        Resolves the local ids in the resource linkage *linkage* of a
+        relationship object.
+
+        :arg linkage:
+        :arg str source_pointer:
+        """
+        if isinstance(linkage, dict):
+            self.resolve_identifier(linkage, source_pointer)
+        elif isinstance(linkage, list):
+            for i, identifier in enumerate(linkage):
+                self.resolve_identifier(
+                    identifier, source_pointer + "{}/".format(i)
+                )
+        return None
+
+    def resolve_relationships(self, resource_object, source_pointer="/"):
+        """
+        Resolves the local ids in the relationships of the JSONapi resource
+        object *resource_object*.
+
+        :arg dict resource_object:
+        :arg str source_pointer:
+        """
+        relationships = resource_object.get("relationships")
+        if not isinstance(relationships, dict):
+            return None
+
+        for relname, relobj in relationships.items():
+            if isinstance(relobj, dict):
+                self.resolve_linkage(
+                    relobj.get("data"),
+                    source_pointer + "relationships/{}/data/".format(relname)
+                )
+        return None
+
+    def assert_type(self, typename, source_pointer="/"):
+        """
+        Raises a :exc:`~jsonapi.base.errors.BadRequest` error, if the type
+        *typename* does not exist.
+        """
+        if not self.api.has_type(typename):
+            raise errors.BadRequest(
+                detail="The type '{}' does not exist.".format(typename),
+                source_pointer=source_pointer + "type/"
+            )
+        return None
+
+    @asyncio.coroutine
+    def load_ref(self, ref, source_pointer="/"):
+        """
+        Loads the resource referenced by the *ref* member of an operation.
+
+        :arg dict ref:
+        :arg str source_pointer:
+
+        :raises NotFound:
+            If the resource does not exist.
+        """
+        self.resolve_identifier(ref, source_pointer)
+        validators.assert_resource_identifier_object(
+            {key: ref[key] for key in ref.keys() & {"type", "id"}},
+            source_pointer
+        )
+        self.assert_type(ref["type"], source_pointer)
+        return (yield from self.db.get((ref["type"], ref["id"]), required=True))
+
+    def get_relationship(self, resource, relname, source_pointer="/"):
+        """
+        Returns the relationship *relname* of the *resource*.
+
+        :raises BadRequest:
+            If the relationship does not exist.
+        """
+        schema = self.api.get_schema(self.api.get_typename(resource))
+        if not relname in schema.relationships:
+            raise errors.BadRequest(
+                detail="The relationship '{}' does not exist.".format(relname),
+                source_pointer=source_pointer + "relationship/"
+            )
+        return schema.relationships[relname]
+
+    @asyncio.coroutine
+    def add(self, operation, source_pointer="/"):
+        """
+        Creates a new resource or adds new relatives to a *to-many*
+        relationship.
+
+        :returns:
+            The new (or updated) resource and the name of the relationship.
+        """
+        ref = operation.get("ref")
+
+        # Extend the relationship.
+        if isinstance(ref, dict) and "relationship" in ref:
+            resource = yield from self.load_ref(ref, source_pointer + "ref/")
+            relname = ref["relationship"]
+            relationship = self.get_relationship(
+                resource, relname, source_pointer + "ref/"
+            )
+            if not relationship.to_many:
+                raise errors.BadRequest(
+                    detail="Only to-many relationships can be extended.",
+                    source_pointer=source_pointer + "ref/relationship/"
+                )
+
+            relationship_object = {"data": operation.get("data")}
+            self.resolve_linkage(
+                relationship_object["data"], source_pointer + "data/"
+            )
+            validators.assert_relationship_object(
+                relationship_object, source_pointer
+            )
+
+            unserializer = self.api.get_unserializer(
+                self.api.get_typename(resource)
+            )
+            yield from unserializer.extend_relationship(
+                self.db, resource, relname, relationship_object
+            )
+            self.db.save([resource])
+            return (resource, relname)
+
+        # Create a new resource.
+        resource_object = operation.get("data")
+        if not isinstance(resource_object, dict):
+            raise errors.InvalidDocument(
+                detail="The 'data' must be a resource object.",
+                source_pointer=source_pointer + "data/"
+            )
+
+        lid = resource_object.pop("lid", None)
+        self.resolve_relationships(resource_object, source_pointer + "data/")
+        validators.assert_resource_object(
+            resource_object, source_pointer + "data/"
+        )
+        self.assert_type(resource_object["type"], source_pointer + "data/")
+
+        unserializer = self.api.get_unserializer(resource_object["type"])
+        resource = yield from unserializer.create_resource(
+            self.db, resource_object
+        )
+        self.db.save([resource])
+
+        if lid is not None:
+            identifier = (resource_object["type"], LOCAL_ID_PREFIX + str(lid))
+            self.db.local_resources[identifier] = resource
+        return (resource, None)
+
+    @asyncio.coroutine
+    def update(self, operation, source_pointer="/"):
+        """
+        Updates the attributes and relationships of a resource or replaces
+        the relatives of a single relationship.
+
+        :returns:
+            The updated resource and the name of the relationship.
+        """
+        ref = operation.get("ref")
+
+        # Replace the relatives of the relationship.
+        if isinstance(ref, dict) and "relationship" in ref:
+            resource = yield from self.load_ref(ref, source_pointer + "ref/")
+            relname = ref["relationship"]
+            self.get_relationship(resource, relname, source_pointer + "ref/")
+
+            relationship_object = {"data": operation.get("data")}
+            self.resolve_linkage(
+                relationship_object["data"], source_pointer + "data/"
+            )
+            validators.assert_relationship_object(
+                relationship_object, source_pointer
+            )
+
+            unserializer = self.api.get_unserializer(
+                self.api.get_typename(resource)
+            )
+            yield from unserializer.update_relationship(
+                self.db, resource, relname, relationship_object
+            )
+            self.db.save([resource])
+            return (resource, relname)
+
+        # Update the resource.
+        resource_object = operation.get("data")
+        if not isinstance(resource_object, dict):
+            raise errors.InvalidDocument(
+                detail="The 'data' must be a resource object.",
+                source_pointer=source_pointer + "data/"
+            )
+
+        self.resolve_identifier(resource_object, source_pointer + "data/")
+        self.resolve_relationships(resource_object, source_pointer + "data/")
+        validators.assert_resource_object(
+            resource_object, source_pointer + "data/"
+        )
+        if not "id" in resource_object:
+            raise errors.InvalidDocument(
+                detail="The 'id' of the resource object is missing.",
+                source_pointer=source_pointer + "data/"
+            )
+        self.assert_type(resource_object["type"], source_pointer + "data/")
+
+        resource = yield from self.db.get(
+            (resource_object["type"], resource_object["id"]), required=True
+        )
+
+        # We do not use *update_resource()*, because the id of a new
+        # resource may not be known yet.
+        unserializer = self.api.get_unserializer(
+            self.api.get_typename(resource)
+        )
+        if "attributes" in resource_object:
+            unserializer.update_attributes(
+                resource, resource_object["attributes"]
+            )
+        for relname, relobj in resource_object.get("relationships", {}).items():
+            yield from unserializer.update_relationship(
+                self.db, resource, relname, relobj
+            )
+
+        self.db.save([resource])
+        return (resource, None)
+
+    @asyncio.coroutine
+    def remove(self, operation, source_pointer="/"):
+        """
+        Deletes a resource or removes relatives from a *to-many*
+        relationship.
+
+        :returns:
+            The updated resource and the name of the relationship or
+            ``(None, None)``, if the resource has been deleted.
+        """
+        ref = operation.get("ref")
+        if not isinstance(ref, dict):
+            raise errors.InvalidDocument(
+                detail="The 'ref' of a remove operation is missing.",
+                source_pointer=source_pointer
+            )
+
+        # Shrink the relationship.
+        if "relationship" in ref:
+            resource = yield from self.load_ref(ref, source_pointer + "ref/")
+            relname = ref["relationship"]
+            relationship = self.get_relationship(
+                resource, relname, source_pointer + "ref/"
+            )
+            if not relationship.to_many:
+                raise errors.BadRequest(
+                    detail="Only to-many relationships can be shrinked.",
+                    source_pointer=source_pointer + "ref/relationship/"
+                )
+
+            relationship_object = {"data": operation.get("data")}
+            self.resolve_linkage(
+                relationship_object["data"], source_pointer + "data/"
+            )
+            validators.assert_relationship_object(
+                relationship_object, source_pointer
+            )
+
+            unserializer = self.api.get_unserializer(
+                self.api.get_typename(resource)
+            )
+            unserializer.shrink_relationship(
+                resource, relname, relationship_object
+            )
+            self.db.save([resource])
+            return (resource, relname)
+
+        # Delete the resource.
+        resource = yield from self.load_ref(ref, source_pointer + "ref/")
+        self.db.delete([resource])
+        self.db.local_resources.pop((ref["type"], ref["id"]), None)
+        return (None, None)
+
+    def build_result(self, resource, relname):
+        """
+        Returns the result object for an operation, which changed the
+        *resource* or its relationship *relname*.
+        """
+        if resource is None:
+            return OrderedDict()
+
+        typename = self.api.get_typename(resource)
+        serializer = self.api.get_serializer(typename)
+
+        if relname is not None:
+            document = serializer.serialize_relationship(resource, relname)
+            return OrderedDict([("data", document["data"])])
+
+        resource_object = serializer.serialize_resource(
+            resource, fields=self.request.japi_fields.get(typename)
+        )
+        links = resource_object.setdefault("links", OrderedDict())
+        links["self"] = self.api.reverse_url(
+            typename=typename, endpoint="resource", id=resource_object["id"]
+        )
+        return OrderedDict([("data", resource_object)])
+
+    @asyncio.coroutine
+    def post(self):
+        """
+        Handles a POST request. The operations are executed in the given
+        order and committed at once.
+        """
+        operations = self.request.json.get("atomic:operations")
+        if not isinstance(operations, list):
+            raise errors.InvalidDocument(
+                detail="The 'atomic:operations' must be an array.",
+                source_pointer="/atomic:operations/"
+            )
+
+        # Nothing is committed, if an operation fails. The changes of the
+        # previous operations may already be flushed, so they are rolled back.
+        try:
+            changes = yield from self.execute(operations)
+
+            # Commit all changes at once.
+            yield from self.db.commit()
+        except Exception:
+            yield from self.db.rollback()
+            raise
+
+        # Create the response.
+        results = [
+            self.build_result(resource, relname)\
+            for resource, relname in changes
+        ]
+
+        self.response.headers["content-type"] = "application/vnd.api+json"
+        self.response.status_code = 200
+        self.response.body = self.api.dump_json(OrderedDict([
+            ("atomic:results", results),
+            ("jsonapi", self.api.jsonapi_object)
+        ]))
+        return None
+
+    @asyncio.coroutine
+    def execute(self, operations):
+        """
+        Executes the *operations* in the given order and returns the tuple
+        ``(resource, relname)`` for each operation.
+        """
+        changes = list()
+        for i, operation in enumerate(operations):
+            source_pointer = "/atomic:operations/{}/".format(i)
+            if not isinstance(operation, dict):
+                raise errors.InvalidDocument(
+                    detail="An operation must be an object.",
+                    source_pointer=source_pointer
+                )
+
+            op = operation.get("op")
+            if op == "add":
+                change = yield from self.add(operation, source_pointer)
+            elif op == "update":
+                change = yield from self.update(operation, source_pointer)
+            elif op == "remove":
+                change = yield from self.remove(operation, source_pointer)
+            else:
+                raise errors.InvalidDocument(
+                    detail="The 'op' must be 'add', 'update' or 'remove'.",
+                    source_pointer=source_pointer + "op/"
+                )
+            changes.append(change)
+        return changes
@@ -34,14 +34,27 @@ from collections import OrderedDict
 # local
 from jsonapi.base import errors
 from jsonapi.base import validators
-from jsonapi.base.serializer import serialize_many
 from jsonapi.base.pagination import Pagination
+from jsonapi.base.serializer import serialize_many
+from ..database import BatchIterator
+from ..request import BodyStream
 from .base import BaseHandler
 
 
 class CollectionHandler(BaseHandler):
     """
     Handles the collection endpoint.
+
+    If the API setting ``stream_collections`` is true, the response to a GET
+    request is sent in chunks (:attr:`jsonapi.base.response.Response.chunks`).
+
+    If no related resources must be included, the resource objects are
+    created with :meth:`~jsonapi.asyncio.database.Session.query_serialized`,
+    so that the database adapter can skip loading the resources.
+
+    The number of relatives in the relationships requested with
+    ``meta[counts]`` is added to the *meta* object of the relationships.
+    This is not supported, if the response is streamed.
     """
 
     def __init__(self, api, db, request):
@@ -55,7 +68,12 @@ class CollectionHandler(BaseHandler):
     def prepare(self):
         """
         """
-        if self.request.content_type[0] != "application/vnd.api+json":
+        content_type = self.request.content_type[0]
+        if content_type == "application/x-ndjson":
+            # Only an import can be sent as newline delimited JSON.
+            if self.request.method != "post":
+                raise errors.UnsupportedMediaType()
+        elif content_type != "application/vnd.api+json":
             raise errors.UnsupportedMediaType()
         if not self.api.has_type(self.typename):
             raise errors.NotFound()
@@ -69,6 +87,11 @@ class CollectionHandler(BaseHandler):
 
         http://jsonapi.org/format/#fetching-resources
         """
+        if self.request.japi_export == "ndjson":
+            return (yield from self.export_ndjson())
+        if self.request.japi_aggregate or self.request.japi_group:
+            return (yield from self.aggregate())
+
         # Fetch the requested resources.
         if self.request.japi_paginate:
             offset = self.request.japi_page_offset
@@ -77,10 +100,34 @@ class CollectionHandler(BaseHandler):
             offset = self.request.japi_offset
             limit = self.request.japi_limit
 
-        resources = yield from self.db.query(
-            self.typename, order=self.request.japi_sort, limit=limit,
-            offset=offset, filters=self.request.japi_filters
-        )
+        # Like in the synchronous handler, the resources of a streamed
+        # response are loaded in batches, if no relatives must be included.
+        stream = self.api.settings.get("stream_collections", False)
+        batch_size = self.api.settings.get("stream_batch_size", 1000)
+        fields = self.request.japi_fields if stream else self.data_fields()
+        data = None
+        batches = None
+        if stream and not self.request.japi_include:
+            resources = list()
+            batches = yield from self.db.query_iter(
+                self.typename, order=self.request.japi_sort, limit=limit,
+                offset=offset, filters=self.request.japi_filters,
+                batch_size=batch_size
+            )
+        elif stream or self.request.japi_include:
+            resources = yield from self.db.query(
+                self.typename, order=self.request.japi_sort, limit=limit,
+                offset=offset, filters=self.request.japi_filters
+            )
+        # Only the resource objects are needed, which the database adapter
+        # may create without loading the resources.
+        else:
+            resources = list()
+            data = yield from self.db.query_serialized(
+                self.typename, order=self.request.japi_sort, limit=limit,
+                offset=offset, filters=self.request.japi_filters,
+                fields=fields
+            )
 
         # Fetch all related resources, which should be included.
         included_resources = yield from self.db.get_relatives(
@@ -88,8 +135,7 @@ class CollectionHandler(BaseHandler):
         )
 
         # Build the response.
-        data = serialize_many(resources, fields=self.request.japi_fields)
-        included = serialize_many(
+        included = yield from self.api.serialize_many(
             included_resources.values(), fields=self.request.japi_fields
         )
         meta = OrderedDict()
@@ -105,14 +151,179 @@ class CollectionHandler(BaseHandler):
             meta.update(pagination.json_meta)
             links.update(pagination.json_links)
 
+        self.response.headers["content-type"] = "application/vnd.api+json"
+        self.response.status_code = 200
+
+        # The resources are serialized batch by batch, when the document is
+        # streamed.
+        if stream:
+            if batches is None:
+                batches = BatchIterator(resources, batch_size)
+            self.response.chunks = self.api.dump_json_batches(
+                OrderedDict([
+                    ("data", None),
+                    ("included", included),
+                    ("meta", meta),
+                    ("links", links),
+                    ("jsonapi", self.api.jsonapi_object)
+                ]),
+                batches, fields=fields
+            )
+            return None
+
+        if data is None:
+            data = yield from self.api.serialize_many(
+                resources, fields=fields
+            )
+
+        if self.request.japi_counts:
+            yield from self.add_relationship_counts(data)
+
         # Put all together
+        self.response.body = yield from self.api.dump_document(
+            OrderedDict([
+                ("data", data),
+                ("included", included),
+                ("meta", meta),
+                ("links", links),
+                ("jsonapi", self.api.jsonapi_object)
+            ]),
+            size=len(data) + len(included)
+        )
+        return None
+
+    def data_fields(self):
+        """
+        The same as the synchronous handler method in
+        :mod:`jsonapi.base.handler.collection`.
+        """
+        fields = self.request.japi_fields
+        counts = self.request.japi_counts
+        if not counts:
+            return fields
+
+        schema_ = self.api.get_schema(self.typename)
+        names = fields.get(self.typename)
+        if names is None:
+            names = list(schema_.attributes) + list(schema_.relationships)
+
+        fields = dict(fields)
+        fields[self.typename] = [name for name in names if not name in counts]
+        return fields
+
+    @asyncio.coroutine
+    def add_relationship_counts(self, data):
+        """
+        Adds the number of relatives in each relationship requested with
+        ``meta[counts]`` to the *meta* object of the relationship in the
+        resource objects *data* like the synchronous handler in
+        :mod:`jsonapi.base.handler.collection`.
+        """
+        schema_ = self.api.get_schema(self.typename)
+        for relname in self.request.japi_counts:
+            relationship = schema_.relationships.get(relname)
+            if relationship is None or not relationship.to_many:
+                raise errors.BadRequest(
+                    detail="The relatives in '{}' can not be counted."\
+                        .format(relname),
+                    source_parameter="meta[counts]"
+                )
+
+        ids = [item["id"] for item in data]
+        for relname in self.request.japi_counts:
+            counts = dict()
+            if ids:
+                counts = yield from self.db.count_relatives(
+                    self.typename, ids, relname
+                )
+
+            for item in data:
+                relationships = item.setdefault("relationships", OrderedDict())
+                relationship = relationships.setdefault(relname, OrderedDict())
+                meta = relationship.setdefault("meta", OrderedDict())
+                meta["count"] = counts.get(item["id"], 0)
+        return None
+
+    @asyncio.coroutine
+    def aggregate(self):
+        """
+        Handles a GET request with the query parameters ``aggregate[...]``
+        or ``group[by]`` like the synchronous
+        :meth:`~jsonapi.base.handler.collection.CollectionHandler.aggregate`.
+        """
+        aggregates = self.request.japi_aggregate or [("count", "*")]
+        results = yield from self.db.aggregate(
+            self.typename, aggregates, group=self.request.japi_group,
+            filters=self.request.japi_filters
+        )
+
+        meta = OrderedDict()
+        meta["aggregates"] = results
+
+        self.response.headers["content-type"] = "application/vnd.api+json"
+        self.response.status_code = 200
+        self.response.body = self.api.dump_json(OrderedDict([
+            ("meta", meta),
+            ("jsonapi", self.api.jsonapi_object)
+        ]))
+        return None
+
+    @asyncio.coroutine
+    def export_ndjson(self):
+        """
+        The same as
+        :meth:`jsonapi.base.handler.CollectionHandler.export_ndjson`, but
+        the resources are loaded with the asynchronous
+        :meth:`~jsonapi.asyncio.database.Session.query_iter` and each batch
+        is serialized with :meth:`~jsonapi.asyncio.api.API.serialize_many`,
+        when the client requests the next chunk.
+        """
+        batches = yield from self.db.query_iter(
+            self.typename, order=self.request.japi_sort,
+            filters=self.request.japi_filters,
+            batch_size=self.api.settings.get("stream_batch_size", 1000)
+        )
+
+        self.response.headers["content-type"] = "application/x-ndjson"
+        self.response.status_code = 200
+        self.response.chunks = self.api.dump_ndjson_batches(
+            batches, fields=self.request.japi_fields
+        )
+        return None
+
+    @asyncio.coroutine
+    def import_ndjson(self):
+        """
+        Handles a POST request with the content type ``application/x-ndjson``.
+
+        Each line of the body contains one JSONapi resource object of this
+        collection. The body is read incrementally and the resources are
+        created in batches of ``import_batch_size`` (default: 1000) objects
+        with :meth:`~jsonapi.asyncio.api.API.import_ndjson`. Each batch is
+        committed on its own.
+
+        The *meta* object of the response contains the report of each batch.
+        """
+        body = self.request.body
+        if isinstance(body, str):
+            body = body.encode()
+        if not self.request.is_stream:
+            body = yield from BodyStream.from_bytes(body)
+
+        reports = yield from self.api.import_ndjson(
+            body, typename=self.typename
+        )
+
+        meta = OrderedDict()
+        meta["imported-resources"] = sum(
+            report["created"] for report in reports
+        )
+        meta["batches"] = reports
+
         self.response.headers["content-type"] = "application/vnd.api+json"
         self.response.status_code = 200
         self.response.body = self.api.dump_json(OrderedDict([
-            ("data", data),
-            ("included", included),
             ("meta", meta),
-            ("links", links),
             ("jsonapi", self.api.jsonapi_object)
         ]))
         return None
@@ -127,6 +338,14 @@ class CollectionHandler(BaseHandler):
 
         .. todo:: Support the *include* parameter?
         """
+        # A newline delimited JSON body is imported in batches.
+        if self.request.content_type[0] == "application/x-ndjson":
+            return (yield from self.import_ndjson())
+
+        # An array of resource objects creates many resources at once.
+        if isinstance(self.request.json.get("data"), list):
+            return (yield from self.post_many())
+
         # Make sure the request contains a valid JSON resource object.
         resource_object = self.request.json.get("data", dict())
         validators.assert_resource_object(
@@ -168,3 +387,176 @@ class CollectionHandler(BaseHandler):
             ("jsonapi", self.api.jsonapi_object)
         ]))
         return None
+
+    @asyncio.coroutine
+    def post_many(self):
+        """
+        Handles a POST request, whichs *data* is an array of resource objects.
+        All resources are created in one transaction and their relatives are
+        loaded with only one database query.
+        """
+        resource_objects = self.request.json["data"]
+        for i, resource_object in enumerate(resource_objects):
+            validators.assert_resource_object(
+                resource_object, source_pointer="/data/{}/".format(i)
+            )
+
+            # Check if the *type* is supported by this collection endpoint.
+            if resource_object["type"] != self.typename:
+                raise errors.Conflict()
+
+        # Create the new resources.
+        unserializer = self.api.get_unserializer(self.typename)
+        resources = yield from unserializer.create_resources(
+            self.db, resource_objects
+        )
+
+        # Save the resources.
+        self.db.save(resources)
+        yield from self.db.commit()
+
+        # Create the response.
+        serializer = self.api.get_serializer(self.typename)
+        fields = self.request.japi_fields.get(self.typename)
+
+        data = list()
+        for resource in resources:
+            resource_object = serializer.serialize_resource(
+                resource, fields=fields
+            )
+            links = resource_object.setdefault("links", dict())
+            links["self"] = self.api.reverse_url(
+                typename=self.typename, endpoint="resource",
+                id=resource_object["id"]
+            )
+            data.append(resource_object)
+
+        # Put everything together.
+        self.response.headers["content-type"] = "application/vnd.api+json"
+        self.response.status_code = 201
+        self.response.body = self.api.dump_json(OrderedDict([
+            ("data", data),
+            ("jsonapi", self.api.jsonapi_object)
+        ]))
+        return None
+
+    @asyncio.coroutine
+    def patch(self):
+        """
+        Handles a PATCH request. The *data* must be an array of resource
+        objects. All resources are updated in one transaction. The resources
+        and their new relatives are loaded with only two database queries.
+
+        The update is only atomic, if the database adapter supports
+        transactions. Otherwise, the resources, which have been written
+        before a write failed, stay updated.
+        """
+        resource_objects = self.request.json.get("data")
+        if not isinstance(resource_objects, list):
+            raise errors.InvalidDocument(
+                detail="The 'data' must be an array of resource objects.",
+                source_pointer="/data/"
+            )
+
+        for i, resource_object in enumerate(resource_objects):
+            validators.assert_resource_object(
+                resource_object, source_pointer="/data/{}/".format(i)
+            )
+
+            # Check if the *type* is supported by this collection endpoint.
+            if resource_object["type"] != self.typename:
+                raise errors.Conflict()
+
+            if not "id" in resource_object:
+                raise errors.InvalidDocument(
+                    detail="The 'id' of the resource object is missing.",
+                    source_pointer="/data/{}/".format(i)
+                )
+
+        # Load all resources, which are updated.
+        identifiers = [
+            (self.typename, resource_object["id"])\
+            for resource_object in resource_objects
+        ]
+        resources = yield from self.db.get_many(identifiers, required=True)
+        resources = [resources[identifier] for identifier in identifiers]
+
+        # Update them.
+        unserializer = self.api.get_unserializer(self.typename)
+        yield from unserializer.update_resources(
+            self.db, resources, resource_objects
+        )
+
+        # Save the resources.
+        self.db.save(resources)
+        yield from self.db.commit()
+
+        # Create the response.
+        data = serialize_many(resources, fields=self.request.japi_fields)
+
+        self.response.headers["content-type"] = "application/vnd.api+json"
+        self.response.status_code = 200
+        self.response.body = self.api.dump_json(OrderedDict([
+            ("data", data),
+            ("jsonapi", self.api.jsonapi_object)
+        ]))
+        return None
+
+    @asyncio.coroutine
+    def delete(self):
+        """
+        Handles a DELETE request. All resources, which match the *filter*
+        query parameters and (optionally) the resource identifiers in the
+        request body, are deleted in the database without loading them:
+
+        .. code-block:: none
+
+            DELETE /api/Post?filter[created]=lt:"2015-01-01"
+
+            DELETE /api/Post
+            {"data": [{"type": "Post", "id": "1"}, {"type": "Post", "id": "2"}]}
+
+        At least a filter or a list of identifiers must be given, so that a
+        collection can not be deleted by accident.
+
+        :seealso: :meth:`jsonapi.base.database.Session.delete_where`
+        """
+        filters = self.request.japi_filters
+
+        # Get the ids from the resource identifiers in the body.
+        ids = None
+        if self.request.body and self.request.has_json:
+            data = self.request.json.get("data")
+            validators.assert_resource_linkage(data, source_pointer="/data/")
+            if not isinstance(data, list):
+                raise errors.InvalidDocument(
+                    detail="The 'data' must be an array of resource "\
+                        "identifier objects.",
+                    source_pointer="/data/"
+                )
+            if any(item["type"] != self.typename for item in data):
+                raise errors.Conflict()
+            ids = [item["id"] for item in data]
+
+        if not filters and ids is None:
+            raise errors.BadRequest(
+                detail="A filter or a list of resource identifiers is "\
+                    "required to delete resources in a collection."
+            )
+
+        deleted = yield from self.db.delete_where(
+            self.typename, filters=filters, ids=ids
+        )
+        yield from self.db.commit()
+
+        # Create the response.
+        meta = OrderedDict()
+        meta["deleted-resources"] = deleted
+
+        self.response.headers["content-type"] = "application/vnd.api+json"
+        self.response.status_code = 200
+        self.response.body = self.api.dump_json(OrderedDict([
+            ("meta", meta),
+            ("jsonapi", self.api.jsonapi_object)
+        ]))
+        return None
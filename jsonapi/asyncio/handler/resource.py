@@ -34,7 +34,6 @@ from collections import OrderedDict
 # local
 from jsonapi.base import errors
 from jsonapi.base import validators
-from jsonapi.base.serializer import serialize_many
 from .base import BaseHandler
 
 
@@ -94,7 +93,7 @@ class ResourceHandler(BaseHandler):
             self.resource, fields=self.request.japi_fields.get(self.typename)
         )
 
-        included = serialize_many(
+        included = yield from self.api.serialize_many(
             included_resources.values(), self.request.japi_fields
         )
 
@@ -104,13 +103,16 @@ class ResourceHandler(BaseHandler):
         # Put all together
         self.response.headers["content-type"] = "application/vnd.api+json"
         self.response.status_code = 200
-        self.response.body = self.api.dump_json(OrderedDict([
-            ("data", data),
-            ("included", included),
-            ("meta", meta),
-            ("links", links),
-            ("jsonapi", self.api.jsonapi_object)
-        ]))
+        self.response.body = yield from self.api.dump_document(
+            OrderedDict([
+                ("data", data),
+                ("included", included),
+                ("meta", meta),
+                ("links", links),
+                ("jsonapi", self.api.jsonapi_object)
+            ]),
+            size=1 + len(included)
+        )
         return None
 
     @asyncio.coroutine
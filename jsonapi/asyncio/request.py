@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2016 Benedikt Schmitt
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+jsonapi.asyncio.request
+=======================
+
+The asynchronous API uses the :class:`jsonapi.base.request.Request`, but the
+body of a request may also be a :class:`BodyStream`, which is fed by the web
+framework while the request is already handled.
+"""
+
+# std
+import asyncio
+
+
+__all__ = [
+    "BodyStream"
+]
+
+
+class BodyStream(object):
+    """
+    A request body, which is received in chunks.
+
+    The web framework *feeds* the chunks as soon as they arrive and the
+    handler *reads* them. At most *max_chunks* chunks are buffered, so that
+    :meth:`feed` blocks, if the handler can not keep up with the client.
+
+    .. code-block:: python3
+
+        >>> body = BodyStream()
+        >>> request = jsonapi.base.Request(uri, method, headers, body)
+        >>> response = asyncio.ensure_future(api.handle_request(request))
+
+        >>> # Whenever a chunk has been received:
+        >>> yield from body.feed(chunk)
+
+        >>> # After the last chunk:
+        >>> yield from body.feed_eof()
+        >>> response = yield from response
+
+    :arg int max_chunks:
+        The maximum number of buffered chunks. If 0, the buffer is unbounded.
+    """
+
+    def __init__(self, max_chunks=16):
+        self._chunks = asyncio.Queue(maxsize=max_chunks)
+        self._closed = False
+        return None
+
+    @classmethod
+    @asyncio.coroutine
+    def from_bytes(cls, body):
+        """
+        Returns a new stream, which contains only the *body*.
+
+        :arg bytes body:
+        """
+        stream = cls(max_chunks=0)
+        yield from stream.feed(body)
+        yield from stream.feed_eof()
+        return stream
+
+    @asyncio.coroutine
+    def feed(self, chunk):
+        """
+        Adds the *chunk* to the stream. Empty chunks are ignored.
+
+        :arg bytes chunk:
+        """
+        if chunk and not self._closed:
+            yield from self._chunks.put(chunk)
+        return None
+
+    @asyncio.coroutine
+    def feed_eof(self):
+        """
+        Marks the end of the stream.
+        """
+        if not self._closed:
+            yield from self._chunks.put(b"")
+        return None
+
+    @asyncio.coroutine
+    def read(self):
+        """
+        Returns the next chunk or an empty bytes object, if the end of the
+        stream has been reached.
+        """
+        return (yield from self._chunks.get())
+
+    def close(self):
+        """
+        Discards the buffered and all following chunks. This should be called,
+        if the handler finished before the whole body has been read.
+        """
+        self._closed = True
+        while not self._chunks.empty():
+            self._chunks.get_nowait()
+        return None
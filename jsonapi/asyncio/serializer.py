@@ -120,6 +120,26 @@ class Unserializer(jsonapi.base.serializer.Unserializer):
         resource = self.schema.constructor.create(**fields)
         return resource
 
+    @asyncio.coroutine
+    def create_resources(self, db, resource_objects):
+        """
+        The same as the base class method, but calls *db* async.
+        """
+        # Load the relatives of all resources at once.
+        identifiers = set()
+        for resource_object in resource_objects:
+            identifiers.update(self._collect_relationships_identifiers(
+                resource_object.get("relationships", dict())
+            ))
+        relatives = yield from db.get_many(identifiers, required=True)
+
+        # Create the new resources.
+        fields_list = [
+            self._build_fields(resource_object, relatives)\
+            for resource_object in resource_objects
+        ]
+        return self.schema.constructor.create_many(fields_list)
+
     @asyncio.coroutine
     def update_resource(self, db, resource, resource_object):
         """
@@ -139,6 +159,52 @@ class Unserializer(jsonapi.base.serializer.Unserializer):
                 yield from self.update_relationship(db, resource, rel_name, rel_object)
         return None
 
+    @asyncio.coroutine
+    def update_resources(self, db, resources, resource_objects):
+        """
+        The same as the base class method, but calls *db* async.
+        """
+        # Load the new relatives of all resources at once.
+        load = set()
+        check = set()
+        for resource, resource_object in zip(resources, resource_objects):
+            load_, check_ = self._collect_update_identifiers(
+                resource, resource_object.get("relationships", dict())
+            )
+            load.update(load_)
+            check.update(check_)
+
+        relatives = yield from db.get_many(load, required=True)
+        if check:
+            yield from db.check_existence(check)
+
+        # Update the resources.
+        for resource, resource_object in zip(resources, resource_objects):
+            assert resource_object["id"] \
+                == self.schema.id_attribute.get(resource)
+            assert resource_object["type"] == self.schema.typename
+
+            if "attributes" in resource_object:
+                self.update_attributes(resource, resource_object["attributes"])
+            if "relationships" in resource_object:
+                self._update_relationships(
+                    resource, resource_object["relationships"], relatives
+                )
+        return None
+
+    @asyncio.coroutine
+    def _load_new_relatives(self, db, relationship, identifiers):
+        """
+        The same as the base class method, but calls the *db* async.
+        """
+        if relationship.accepts_identifiers:
+            if relationship.check_existence:
+                yield from db.check_existence(identifiers)
+            return identifiers
+
+        relatives = yield from db.get_many(identifiers, required=True)
+        return [relatives[identifier] for identifier in identifiers]
+
     @asyncio.coroutine
     def update_relationship(
         self, db, resource, relationship_name, relationship_object
@@ -167,10 +233,18 @@ class Unserializer(jsonapi.base.serializer.Unserializer):
             identifiers = relationship_object["data"]
             identifiers = [(item["type"], item["id"]) for item in identifiers]
 
-            relatives = yield from db.get_many(identifiers, required=True)
-            relatives = list(relatives.values())
-
-            relationship.set(resource, relatives)
+            # Only the difference to the current relatives is loaded and
+            # changed.
+            added, removed = self._diff_relationship(
+                resource, relationship, identifiers
+            )
+            if removed:
+                relationship.remove_many(resource, removed)
+            if added:
+                relatives = yield from self._load_new_relatives(
+                    db, relationship, added
+                )
+                relationship.extend(resource, relatives)
         return None
 
     @asyncio.coroutine
@@ -188,9 +262,13 @@ class Unserializer(jsonapi.base.serializer.Unserializer):
             identifiers = relationship_object["data"]
             identifiers = [(item["type"], item["id"]) for item in identifiers]
 
-            # Load the new relatives.
-            relatives = yield from db.get_many(identifiers, required=True)
-            relatives = list(relatives.values())
-
-            relationship.extend(resource, relatives)
+            # Load only the relatives, which are not yet in the relationship.
+            added, removed = self._diff_relationship(
+                resource, relationship, identifiers
+            )
+            if added:
+                relatives = yield from self._load_new_relatives(
+                    db, relationship, added
+                )
+                relationship.extend(resource, relatives)
         return None
@@ -49,10 +49,13 @@ from .. import version
 from . import errors
 from . import handler
 from . import serializer
+from . import validators
 
 
 __all__ = [
     "build_uris",
+    "dump_json",
+    "iter_lines",
     "API"
 ]
 
@@ -66,7 +69,7 @@ ARG_DEFAULT = []
 def build_uris(base_uri):
     """
     Returns a dictionary with the uri re(s) for each endpoint type (collection,
-    resource, related and relationships).
+    resource, related, relationships and batch).
 
     :arg str base_uri:
     """
@@ -76,8 +79,10 @@ def build_uris(base_uri):
     resource = collection + "/(?P<id>[A-z0-9]+)"
     relationships = resource + "/relationships/(?P<relname>[A-z][A-z0-9]*)"
     related = resource + "/(?P<relname>[A-z][A-z0-9]*)"
+    batch = base_url + "/batch"
 
     # Make the rules insensitive against a trailing "/"
+    batch = re.compile(batch + "/?")
     collection = re.compile(collection + "/?")
     resource = re.compile(resource + "/?")
     relationships = re.compile(relationships + "/?")
@@ -85,10 +90,50 @@ def build_uris(base_uri):
 
     return {
         "collection": collection, "resource": resource,
-        "relationships": relationships, "related": related
+        "relationships": relationships, "related": related, "batch": batch
     }
 
 
+def iter_lines(chunks):
+    """
+    Returns a generator, which yields the lines of the text, which is
+    received in *chunks* of bytes. The line breaks are removed.
+
+    Only the current line must be kept in memory, so that this function can
+    be used to read large newline delimited JSON documents.
+
+    :arg chunks:
+        An iterable, which yields bytes.
+    """
+    rest = b""
+    for chunk in chunks:
+        lines = (rest + chunk).split(b"\n")
+        rest = lines.pop()
+        yield from lines
+
+    if rest:
+        yield rest
+    return None
+
+
+def dump_json(d, indent=None):
+    """
+    Encodes the object *d* as JSON string using the :mod:`json` module of the
+    standard library and (if available) the :mod:`bson` json utils.
+
+    This is the default implementation of :meth:`API.dump_json`. It is a
+    module level function, so that it can also be sent to a process pool.
+
+    :arg d:
+    :arg int indent:
+    :rtype: str
+    """
+    if bson:
+        return json.dumps(d, default=bson.json_util.default, indent=indent)
+    else:
+        return json.dumps(d, indent=indent)
+
+
 class API(object):
     """
     This class is responsible for the request dispatching. It knows all
@@ -176,6 +221,9 @@ class API(object):
         """
         uris = build_uris(self._uri)
         self._routes.extend([
+            # The batch endpoint must be tested before the collection
+            # endpoint.
+            (uris["batch"], handler.BatchHandler),
             (uris["collection"], handler.CollectionHandler),
             (uris["related"], handler.RelatedHandler),
             (uris["resource"], handler.ResourceHandler),
@@ -300,10 +348,89 @@ class API(object):
         :rtype: str
         """
         indent = 1 if self.debug else None
-        if bson:
-            return json.dumps(d, default=bson.json_util.default, indent=indent)
-        else:
-            return json.dumps(d, indent=indent)
+        return dump_json(d, indent=indent)
+
+    def dump_json_chunks(self, d, stream_key="data", chunk_size=2**16):
+        """
+        Encodes the JSON document *d* like :meth:`dump_json`, but returns a
+        generator, which yields the document in chunks of bytes.
+
+        The value of *stream_key* in *d* must be an iterable. Its items are
+        encoded one by one, when the chunk is requested. So if the iterable
+        is a generator, only about one chunk of the document must be kept in
+        memory.
+
+        .. code-block:: python3
+
+            >>> d = OrderedDict([
+            ...     ("data", iter_serialize_many(resources, fields)),
+            ...     ("jsonapi", api.jsonapi_object)
+            ... ])
+            >>> for chunk in api.dump_json_chunks(d):
+            ...     send(chunk)
+
+        :arg dict d:
+        :arg str stream_key:
+            The key of the item in *d*, which is streamed.
+        :arg int chunk_size:
+            The minimum size of a chunk (except the last one).
+        """
+        buffer = ["{"]
+        buffer_size = 0
+
+        for i, (key, value) in enumerate(d.items()):
+            if i > 0:
+                buffer.append(", ")
+            buffer.append(self.dump_json(key) + ": ")
+
+            if key != stream_key:
+                buffer.append(self.dump_json(value))
+                continue
+
+            buffer.append("[")
+            for k, item in enumerate(value):
+                item = self.dump_json(item)
+                buffer.append(", " + item if k > 0 else item)
+                buffer_size += len(item)
+
+                if buffer_size >= chunk_size:
+                    yield "".join(buffer).encode()
+                    buffer = list()
+                    buffer_size = 0
+            buffer.append("]")
+
+        yield ("".join(buffer) + "}").encode()
+        return None
+
+    def dump_ndjson_chunks(self, items, chunk_size=2**16):
+        """
+        Encodes each item in *items* as JSON and returns a generator, which
+        yields the newline delimited JSON (NDJSON) in chunks of bytes.
+
+        :arg items:
+            An iterable of JSON serializable objects.
+        :arg int chunk_size:
+            The minimum size of a chunk (except the last one).
+
+        :seealso: http://ndjson.org
+        """
+        buffer = list()
+        buffer_size = 0
+        for item in items:
+            # JSON strings can not contain raw line breaks, so this only
+            # removes the indentation added in debug mode.
+            line = self.dump_json(item).replace("\n", "") + "\n"
+            buffer.append(line)
+            buffer_size += len(line)
+
+            if buffer_size >= chunk_size:
+                yield "".join(buffer).encode()
+                buffer = list()
+                buffer_size = 0
+
+        if buffer:
+            yield "".join(buffer).encode()
+        return None
 
     def load_json(self, s):
         """
@@ -322,6 +449,169 @@ class API(object):
         else:
             return json.loads(s)
 
+    def import_ndjson(self, chunks, typename=None, batch_size=None):
+        """
+        Creates a new resource for each JSONapi resource object in the
+        newline delimited JSON (NDJSON) document, which is read from
+        *chunks*. The document is parsed incrementally, so that only one
+        batch must be kept in memory.
+
+        .. code-block:: python3
+
+            >>> with open("posts.ndjson", "rb") as file:
+            ...     reports = api.import_ndjson(file, typename="Post")
+
+        The resources are created in batches of *batch_size* objects. The
+        relatives of a batch are loaded with one
+        :meth:`~jsonapi.base.database.Session.get_many` call per type and
+        each batch is saved and committed in its own session. If a batch
+        can not be created, because a resource object is invalid or the
+        database rejects the batch (e.g. a violated constraint), the session
+        is rolled back and the error is recorded in the report of the batch.
+        The import continues with the next batch then. Database adapters
+        without transactions may have saved a part of the failed batch.
+
+        A report is returned for each batch:
+
+        .. code-block:: python3
+
+            {
+                "batch": 0,
+                "lines": [1, 1000],
+                "created": 999,
+                "errors": [
+                    {"line": 17, "status": 400, "title": "InvalidDocument"}
+                ]
+            }
+
+        :arg chunks:
+            An iterable, which yields the document in chunks of bytes.
+        :arg str typename:
+            If given, all resources must have this type.
+        :arg int batch_size:
+            The number of resource objects in a batch. Defaults to the API
+            setting ``import_batch_size`` (default: 1000).
+        :rtype: list
+
+        :seealso: http://ndjson.org
+        """
+        if batch_size is None:
+            batch_size = self.settings.get("import_batch_size", 1000)
+
+        reports = list()
+        batch = list()
+        for lineno, line in enumerate(iter_lines(chunks), 1):
+            if not line.strip():
+                continue
+
+            batch.append((lineno, line))
+            if len(batch) >= batch_size:
+                reports.append(
+                    self._import_batch(len(reports), batch, typename)
+                )
+                batch = list()
+
+        if batch:
+            reports.append(self._import_batch(len(reports), batch, typename))
+        return reports
+
+    def _load_import_batch(self, batch, typename=None):
+        """
+        Decodes and validates the lines of the *batch*.
+
+        Returns a dictionary, which maps the typenames to the valid resource
+        objects, and a list with the line numbers and errors of the invalid
+        ones.
+
+        :arg list batch:
+            A list of tuples ``(line number, line)``.
+        :arg str typename:
+        """
+        resource_objects = OrderedDict()
+        errors_ = list()
+        for lineno, line in batch:
+            try:
+                try:
+                    resource_object = self.load_json(line.decode())
+                except (UnicodeDecodeError, ValueError):
+                    raise errors.InvalidDocument(
+                        detail="The line is not a valid JSON document."
+                    )
+
+                validators.assert_resource_object(resource_object)
+                if not self.has_type(resource_object["type"]):
+                    raise errors.NotFound(
+                        detail="The type '{}' does not exist."\
+                            .format(resource_object["type"])
+                    )
+                if typename is not None \
+                    and resource_object["type"] != typename:
+                    raise errors.Conflict()
+            except errors.Error as err:
+                errors_.append((lineno, err))
+            else:
+                resource_objects.setdefault(resource_object["type"], list())\
+                    .append(resource_object)
+        return (resource_objects, errors_)
+
+    def _import_report(self, index, batch, created, errors_):
+        """
+        Returns the report for the *index*-th batch.
+
+        :arg int index:
+        :arg list batch:
+        :arg int created:
+            The number of created resources.
+        :arg list errors_:
+            A list of tuples ``(line number, error)``. The line number is
+            None, if the error affected the whole batch.
+        """
+        report = OrderedDict()
+        report["batch"] = index
+        report["lines"] = [batch[0][0], batch[-1][0]]
+        report["created"] = created
+        report["errors"] = list()
+        for lineno, err in errors_:
+            error = OrderedDict([("line", lineno)])
+            error.update(err.json)
+            report["errors"].append(error)
+        return report
+
+    def _import_batch(self, index, batch, typename=None):
+        """
+        Creates the resources of the *index*-th batch in a new session and
+        returns the report.
+
+        :arg int index:
+        :arg list batch:
+            A list of tuples ``(line number, line)``.
+        :arg str typename:
+        """
+        resource_objects, errors_ = self._load_import_batch(batch, typename)
+
+        db = self._db.session()
+        resources = list()
+        try:
+            for typename_, objects in resource_objects.items():
+                unserializer = self.get_unserializer(typename_)
+                resources.extend(unserializer.create_resources(db, objects))
+
+            db.save(resources)
+            db.commit()
+        except errors.Error as err:
+            # The session is not committed, so the batch is skipped.
+            db.rollback()
+            errors_.append((None, err))
+            resources = list()
+        except Exception as err:
+            # The database adapter rejected the batch.
+            LOG.error(err, exc_info=True)
+            db.rollback()
+            errors_.append((None, errors.InternalServerError(
+                detail="The batch could not be saved in the database."
+            )))
+            resources = list()
+        return self._import_report(index, batch, len(resources), errors_)
 
     @property
     def uri(self):
@@ -450,6 +740,15 @@ class API(object):
 
             handler.prepare()
             handler.handle()
+
+            # The chunks of a stream are created lazily. The first one is
+            # created here, so that an error raised by the first query is
+            # still converted into an error response.
+            response = handler.response
+            if response.is_stream:
+                chunks = iter(response.chunks)
+                first_chunk = next(chunks, None)
+                response.chunks = self._iter_stream(first_chunk, chunks)
         except (errors.Error, errors.ErrorList) as err:
             LOG.debug(err, exc_info=False)
             if not self.debug:
@@ -460,4 +759,24 @@ class API(object):
             LOG.critical(err, exc_info=True)
             raise
         else:
-            return handler.response
+            return response
+
+    def _iter_stream(self, first_chunk, chunks):
+        """
+        Yields the *first_chunk* and the remaining *chunks* of a streamed
+        response.
+
+        An error raised while the remaining chunks are created can not be
+        converted into an error response anymore, because the status and
+        the first part of the body may already have been sent. The error is
+        logged and re-raised, so that the web framework aborts the response
+        and the client receives an incomplete (invalid) document.
+        """
+        if first_chunk is not None:
+            yield first_chunk
+        try:
+            yield from chunks
+        except Exception as err:
+            LOG.critical(err, exc_info=True)
+            raise
+        return None
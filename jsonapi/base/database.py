@@ -36,7 +36,8 @@ can take a look at the existing database adapters, if you need an example.
 
 # local
 from . import errors
-from .utilities import relative_identifiers
+from .serializer import serialize_many
+from .utilities import relative_identifiers, aggregate_resources
 
 
 __all__ = [
@@ -45,6 +46,13 @@ __all__ = [
 ]
 
 
+#: The sort key, which orders the resources by their relevance for the
+#: ``search`` filters of the query. The most relevant resources come first,
+#: the sort direction is ignored. An attribute with the same name takes
+#: precedence.
+RELEVANCE = "relevance"
+
+
 class Database(object):
     """
     This class defines the base for a database adapter.
@@ -155,6 +163,29 @@ class Session(object):
         """
         raise NotImplementedError()
 
+    def query_iter(self, typename,
+        *, order=None, limit=None, offset=None, filters=None, batch_size=1000
+        ):
+        """
+        **May be overridden** for performance reasons.
+
+        The same as :meth:`query`, but returns an iterator over the resources.
+        Database adapters should override this method and load the resources
+        from a server side cursor in batches of *batch_size*, so that the
+        whole result must never be kept in memory.
+
+        The default implementation simply returns an iterator over the result
+        of :meth:`query`.
+
+        :arg int batch_size:
+            A hint, how many resources should be loaded from the database at
+            once.
+        """
+        resources = self.query(
+            typename, order=order, limit=limit, offset=offset, filters=filters
+        )
+        return iter(resources)
+
     def query_size(self, typename,
         *, sorting=None, limit=None, offset=None, filters=None
         ):
@@ -166,6 +197,126 @@ class Session(object):
         """
         raise NotImplementedError()
 
+    def query_serialized(self, typename,
+        *, order=None, limit=None, offset=None, filters=None, fields=None
+        ):
+        """
+        **May be overridden** for performance reasons.
+
+        The same as :meth:`query`, but returns the JSONapi resource objects
+        of the resources. Database adapters may override this method and
+        build the resource objects directly from the rows in the database,
+        without creating the resources.
+
+        The default implementation serializes the result of :meth:`query`.
+
+        :arg dict fields:
+            A dictionary, mapping the typename to the fields, which should be
+            included in the resource objects.
+
+        :seealso: :func:`jsonapi.base.serializer.serialize_many`
+        """
+        resources = self.query(
+            typename, order=order, limit=limit, offset=offset, filters=filters
+        )
+        return serialize_many(resources, fields=fields or dict())
+
+    def aggregate(self, typename, aggregates, *, group=None, filters=None):
+        """
+        **May be overridden** for performance reasons.
+
+        Computes the *aggregates* over the resources, which match the
+        *filters*, grouped by the values of the fields in *group*. Returns a
+        list with one :func:`~jsonapi.base.utilities.aggregate_result` per
+        group. Database adapters should override this method and compute the
+        aggregates in the database, so that no resource must be loaded.
+
+        The default implementation loads the resources with :meth:`query`
+        and computes the aggregates in Python.
+
+        :arg list aggregates:
+            A list of tuples ``(function, fieldname)``
+            (see :attr:`jsonapi.base.request.Request.japi_aggregate`)
+        :arg list group:
+            The names of the attributes and *to-one* relationships, by which
+            the resources are grouped
+            (see :attr:`jsonapi.base.request.Request.japi_group`)
+        :arg filters:
+            The same as the *filters* argument of :meth:`query`
+
+        :raises errors.UnaggregatableField:
+        :raises errors.UnfilterableField:
+        """
+        resources = self.query(typename, filters=filters)
+        return aggregate_resources(
+            self.api.get_schema(typename), resources, aggregates, group or []
+        )
+
+    def query_relatives(self, resource, relname,
+        *, order=None, limit=None, offset=None, filters=None
+        ):
+        """
+        **May be overridden** for performance reasons.
+
+        Returns the relatives in the *to-many* relationship *relname* of the
+        *resource*. The arguments *order*, *limit*, *offset* and *filters*
+        are the same as for :meth:`query`. Database adapters should override
+        this method and query only the requested relatives in the database,
+        so that a large relationship must never be loaded as a whole.
+
+        The default implementation loads all relatives with
+        :meth:`get_relatives` and returns the requested slice. *order* and
+        *filters* are ignored.
+
+        :arg resource:
+        :arg str relname:
+        """
+        relatives = self.get_relatives([resource], [[relname]])
+        relatives = list(relatives.values())
+
+        offset = offset or 0
+        if limit is None:
+            return relatives[offset:]
+        return relatives[offset:offset + limit]
+
+    def query_relatives_size(self, resource, relname, *, filters=None):
+        """
+        **May be overridden** for performance reasons.
+
+        Returns the number of relatives in the *to-many* relationship
+        *relname* of the *resource*, which match the *filters*.
+
+        The default implementation loads all relatives with
+        :meth:`get_relatives` and ignores the *filters*.
+        """
+        return len(self.get_relatives([resource], [[relname]]))
+
+    def count_relatives(self, typename, ids, relname):
+        """
+        **May be overridden** for performance reasons.
+
+        Returns a dictionary, which maps the ids of the resources to the
+        number of their relatives in the *to-many* relationship *relname*.
+        Database adapters should override this method and count the
+        relatives of all resources with a single grouped query, so that no
+        relative is loaded.
+
+        The default implementation loads the resources with :meth:`get_many`
+        and counts the identifiers of their relatives.
+
+        :arg str typename:
+        :arg list ids:
+            The ids of the resources
+        :arg str relname:
+        """
+        resources = self.get_many([(typename, id_) for id_ in ids])
+
+        counts = dict()
+        for (typename_, id_), resource in resources.items():
+            if resource is not None:
+                counts[id_] = len(relative_identifiers(relname, resource))
+        return counts
+
     def get(self, identifier, required=False):
         """
         **Must be overridden**
@@ -208,6 +359,21 @@ class Session(object):
         """
         raise NotImplementedError()
 
+    def check_existence(self, identifiers):
+        """
+        **May be overridden** for performance reasons.
+
+        Raises :exc:`~jsonapi.base.errors.ResourceNotFound`, if one of the
+        resources with the *identifiers* does not exist.
+
+        The default implementation loads the resources with :meth:`get_many`.
+
+        :arg list identifiers:
+            A list of identifier tuples ``(typename, id)``.
+        """
+        self.get_many(identifiers, required=True)
+        return None
+
     def save(self, resources):
         """
         **Must be overridden**
@@ -232,6 +398,48 @@ class Session(object):
         """
         raise NotImplementedError()
 
+    def delete_where(self, typename, *, filters=None, ids=None):
+        """
+        **May be overridden** for performance reasons.
+
+        Deletes all resources of the type *typename*, which match the
+        *filters* and whose id is in *ids* (if given). Database adapters
+        should override this method and delete the resources directly in
+        the database, without loading them first.
+
+        The default implementation loads the resources with :meth:`query` or
+        :meth:`get_many` and schedules them for deletion with :meth:`delete`.
+
+        :arg str typename:
+        :arg filters:
+            The same as the *filters* argument of :meth:`query`
+        :arg list ids:
+            A list with the ids of the resources, which should be deleted.
+
+        :rtype: int
+        :returns:
+            The number of deleted resources.
+
+        :raises errors.UnfilterableField:
+        """
+        if ids is not None and not filters:
+            identifiers = [(typename, resource_id) for resource_id in ids]
+            resources = self.get_many(identifiers).values()
+            resources = [resource for resource in resources if resource]
+        else:
+            resources = self.query(typename, filters=filters)
+
+            if ids is not None:
+                ids = set(ids)
+                id_attribute = self.api.get_schema(typename).id_attribute
+                resources = [
+                    resource for resource in resources\
+                    if id_attribute.get(resource) in ids
+                ]
+
+        self.delete(resources)
+        return len(resources)
+
     def commit(self):
         """
         **Must be overridden**
@@ -240,6 +448,19 @@ class Session(object):
         """
         raise NotImplementedError()
 
+    def rollback(self):
+        """
+        **Can be overridden**
+
+        Discards all changes, which have not been committed yet. The API
+        calls this method, if an error occurred before the session could be
+        committed. Database adapters, which save the changes immediately,
+        can not undo them.
+
+        The default implementation does nothing.
+        """
+        return None
+
     def get_relatives(self, resources, paths):
         """
         **May be overridden** for performance reasons.
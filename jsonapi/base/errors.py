@@ -56,6 +56,7 @@ __all__ = [
     "ReadOnlyRelationship",
     "UnsortableField",
     "UnfilterableField",
+    "UnaggregatableField",
     "RelationshipNotFound",
     "ResourceNotFound"
 ]
@@ -366,8 +367,25 @@ class UnfilterableField(BadRequest):
         self.filtername = filtername
         self.fieldname = fieldname
 
-        detail = "The filter '{}' is not supported on the '{}' field of '{}.'"\
-            .format(filtername, fieldname)
+        detail = "The filter '{}' is not supported on the '{}' field of '{}'."\
+            .format(filtername, fieldname, typename)
+        super().__init__(detail=detail, **kargs)
+        return None
+
+
+class UnaggregatableField(BadRequest):
+    """
+    If a field is aggregated or used to group the resources, but does not
+    support it.
+    """
+
+    def __init__(self, typename, function, fieldname, **kargs):
+        self.typename = typename
+        self.function = function
+        self.fieldname = fieldname
+
+        detail = "The aggregate '{}' is not supported on the '{}' field of "\
+            "'{}'.".format(function, fieldname, typename)
         super().__init__(detail=detail, **kargs)
         return None
 
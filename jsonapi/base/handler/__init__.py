@@ -27,6 +27,7 @@ jsonapi.base.handler
 ====================
 
 .. automodule:: jsonapi.base.handler.base
+.. automodule:: jsonapi.base.handler.batch
 .. automodule:: jsonapi.base.handler.collection
 .. automodule:: jsonapi.base.handler.related
 .. automodule:: jsonapi.base.handler.relationship
@@ -35,6 +36,7 @@ jsonapi.base.handler
 
 # local
 from .base import BaseHandler
+from .batch import BatchHandler
 from .collection import CollectionHandler
 from .related import RelatedHandler
 from .relationship import RelationshipHandler
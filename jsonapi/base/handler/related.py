@@ -32,6 +32,7 @@ from collections import OrderedDict
 
 # local
 from .. import errors
+from ..pagination import Pagination
 from ..serializer import serialize_many
 from .base import BaseHandler
 
@@ -39,6 +40,10 @@ from .base import BaseHandler
 class RelatedHandler(BaseHandler):
     """
     Returns the related resources for the resource.
+
+    The relatives in a *to-many* relationship are queried with
+    :meth:`~jsonapi.base.database.Session.query_relatives`, so that the
+    *sort*, *filter* and *page* parameters are applied in the database.
     """
 
     def __init__(self, api, db, request):
@@ -70,6 +75,13 @@ class RelatedHandler(BaseHandler):
             raise errors.NotFound()
 
         self.real_typename = self.api.get_typename(self.resource)
+
+        # Check if the relationship exists.
+        schema = self.api.get_schema(self.real_typename)
+        if not self.relname in schema.relationships:
+            raise errors.NotFound()
+
+        self.relationship = schema.relationships[self.relname]
         return None
 
     def get(self):
@@ -78,8 +90,37 @@ class RelatedHandler(BaseHandler):
 
         http://jsonapi.org/format/#fetching-relationships
         """
-        resources = self.db.get_relatives([self.resource], [[self.relname]])
-        resources = resources.values()
+        meta = OrderedDict()
+        links = OrderedDict()
+
+        if self.relationship.to_many:
+            if self.request.japi_paginate:
+                offset = self.request.japi_page_offset
+                limit = self.request.japi_page_limit
+            else:
+                offset = self.request.japi_offset
+                limit = self.request.japi_limit
+
+            resources = self.db.query_relatives(
+                self.resource, self.relname, order=self.request.japi_sort,
+                limit=limit, offset=offset, filters=self.request.japi_filters
+            )
+
+            # Add the pagination links, if necessairy.
+            if self.request.japi_paginate:
+                total_resources = self.db.query_relatives_size(
+                    self.resource, self.relname,
+                    filters=self.request.japi_filters
+                )
+
+                pagination = Pagination(self.request, total_resources)
+                meta.update(pagination.json_meta)
+                links.update(pagination.json_links)
+        else:
+            resources = self.db.get_relatives(
+                [self.resource], [[self.relname]]
+            )
+            resources = list(resources.values())
 
         included_resources = self.db.get_relatives(
             resources, self.request.japi_include
@@ -90,8 +131,6 @@ class RelatedHandler(BaseHandler):
         included = serialize_many(
             included_resources.values(), fields=self.request.japi_fields
         )
-        meta = OrderedDict()
-        links = OrderedDict()
 
         # Create the response
         self.response.headers["content-type"] = "application/vnd.api+json"
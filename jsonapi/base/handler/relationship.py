@@ -33,13 +33,19 @@ from collections import OrderedDict
 # local
 from .. import errors
 from .. import validators
+from ..pagination import Pagination
 from ..serializer import serialize_many
+from ..utilities import ensure_identifier_object
 from .base import BaseHandler
 
 
 class RelationshipHandler(BaseHandler):
     """
     Handles the relationship endpoint.
+
+    If the *sort*, *filter*, *page*, *limit* or *offset* parameters are given
+    for a *to-many* relationship, only the matching part of the linkage is
+    queried with :meth:`~jsonapi.base.database.Session.query_relatives`.
     """
 
     def __init__(self, api, db, request):
@@ -80,14 +86,19 @@ class RelationshipHandler(BaseHandler):
         self.relationship = schema.relationships[self.relname]
         return None
 
-    def build_body(self):
+    def build_body(self, document=None):
         """
         Serializes the relationship and creates the JSONapi body.
+
+        :arg dict document:
+            The relationship object. If not given, the whole relationship is
+            serialized.
         """
-        serializer = self.api.get_serializer(self.real_typename)
-        document = serializer.serialize_relationship(
-            self.resource, self.relname
-        )
+        if document is None:
+            serializer = self.api.get_serializer(self.real_typename)
+            document = serializer.serialize_relationship(
+                self.resource, self.relname
+            )
 
         links = document.setdefault("links", OrderedDict())
         links["self"] = self.api.reverse_url(
@@ -104,15 +115,59 @@ class RelationshipHandler(BaseHandler):
         body = self.api.dump_json(document)
         return body
 
+    def query_linkage(self):
+        """
+        Queries only the part of the *to-many* linkage, which matches the
+        *sort*, *filter* and *page* parameters, and returns the relationship
+        object.
+        """
+        if self.request.japi_paginate:
+            offset = self.request.japi_page_offset
+            limit = self.request.japi_page_limit
+        else:
+            offset = self.request.japi_offset
+            limit = self.request.japi_limit
+
+        relatives = self.db.query_relatives(
+            self.resource, self.relname, order=self.request.japi_sort,
+            limit=limit, offset=offset, filters=self.request.japi_filters
+        )
+
+        document = OrderedDict()
+        document["data"] = [
+            ensure_identifier_object(relative) for relative in relatives
+        ]
+
+        # Add the pagination links, if necessairy.
+        if self.request.japi_paginate:
+            total_relatives = self.db.query_relatives_size(
+                self.resource, self.relname,
+                filters=self.request.japi_filters
+            )
+
+            pagination = Pagination(self.request, total_relatives)
+            document["meta"] = pagination.json_meta
+            document["links"] = pagination.json_links
+        return document
+
     def get(self):
         """
         Handles a GET request.
 
         http://jsonapi.org/format/#fetching-relationships
         """
+        query_linkage = self.relationship.to_many and (
+            self.request.japi_paginate
+            or self.request.japi_limit is not None
+            or self.request.japi_offset
+            or self.request.japi_filters
+            or self.request.japi_sort
+        )
+        document = self.query_linkage() if query_linkage else None
+
         self.response.headers["content-type"] = "application/vnd.api+json"
         self.response.status_code = 200
-        self.response.body = self.build_body()
+        self.response.body = self.build_body(document)
         return None
 
     def post(self):
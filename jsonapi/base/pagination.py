@@ -88,10 +88,18 @@ class Pagination(object):
 
     def _page_link(self, page_number, page_size):
         parsed_uri = self.request.parsed_uri
-        query = urllib.parse.urlencode({
-            "page[number]": page_number,
-            "page[size]": page_size
-        })
+
+        # Keep the other query parameters (filter, sort, include, ...), so
+        # that the links point to pages of the same result.
+        query = [
+            (key, value)\
+            for key, values in sorted(self.request.query.items())\
+            for value in values\
+            if not key in ("page[number]", "page[size]")
+        ]
+        query.append(("page[number]", page_number))
+        query.append(("page[size]", page_size))
+        query = urllib.parse.urlencode(query)
         uri = "{scheme}://{netloc}{path}?{query}".format(
             scheme=parsed_uri.scheme,
             netloc=parsed_uri.netloc,
@@ -54,7 +54,9 @@ class Request(object):
     :arg str uri:
     :arg str method:
     :arg dict headers:
-    :arg bytes body:
+    :arg body:
+        The body as bytes or a stream of chunks (e.g. an iterable, which
+        yields bytes), which has not been received yet.
     :arg jsonapi.base.api.API api:
         The api, which handles this request. If None, the api will set the
         attribute in :meth:`jsonapi.base.api.API.handle_request`.
@@ -75,6 +77,16 @@ class Request(object):
         self.japi_uri_arguments = dict()
         return None
 
+    @property
+    def is_stream(self):
+        """
+        True, if the :attr:`body` is a stream of chunks and has not been
+        received yet.
+
+        :seealso: :meth:`jsonapi.base.api.API.import_ndjson`
+        """
+        return not isinstance(self.body, (bytes, str, type(None)))
+
     @cached_property
     def parsed_uri(self):
         """
@@ -323,6 +335,7 @@ class Request(object):
         *   `endswith`
         *   `iendswith`
         *   `match`
+        *   `search`
 
         .. code-block:: python3
 
@@ -338,6 +351,29 @@ class Request(object):
             >>> request.japi_filters
             ... [("email", "startswith", "lisa"), ("age", "lt", 20)]
 
+        The field may also be a relationship, which is compared with the ids
+        of the relatives, or a dotted path through relationships:
+
+        .. code-block:: python3
+
+            >>> # /api/Post/?filter[author]=eq:"42"
+            >>> request.japi_filters
+            ... [("author", "eq", "42")]
+
+            >>> # /api/Post/?filter[author.name]=startswith:"A"
+            >>> request.japi_filters
+            ... [("author.name", "startswith", "A")]
+
+        The `search` filter is a full text search, which uses the full text
+        index of the database. The results can be sorted by their relevance
+        (see :attr:`japi_sort`):
+
+        .. code-block:: python3
+
+            >>> # /api/Post/?filter[title]=search:"jsonapi"&sort=relevance
+            >>> request.japi_filters
+            ... [("title", "search", "jsonapi")]
+
         :raises jsonapi.base.errors.BadRequest:
             If a filtername is used, which does not exist.
         :raises jsonapi.base.errors.BadRequest:
@@ -345,13 +381,13 @@ class Request(object):
         """
         filters = list()
 
-        KEY_RE = re.compile(r"filter\[([A-z0-9_]+)\]")
+        KEY_RE = re.compile(r"filter\[([A-z0-9_.]+)\]")
 
         # The first group captures the filters, the second captures the value.
         VALUE_RE = re.compile(
             r"(eq:|ne:|lt:|lte:|gt:|gte:|in:|nin:|all:|exists:|iexact:"\
             r"|contains:|icontains:|startswith:|istartswith:|endswith:"\
-            r"|iendswith:)(.*)"
+            r"|iendswith:|search:)(.*)"
         )
 
         for key, values in self.query.items():
@@ -361,8 +397,7 @@ class Request(object):
             # If the key indicates a filter, but the filtername does not exist,
             # throw a BadRequest exception.
             if key_match and not value_match:
-                filtername = value_match.group(1)
-                filtername = filtername[:-1]
+                filtername = values[0].split(":")[0]
                 raise errors.BadRequest(
                     detail="The filter '{}' does not exist.".format(filtername),
                     source_parameter=key
@@ -439,6 +474,25 @@ class Request(object):
         include = [path.split(".") for path in include.split(",") if path]
         return include
 
+    @cached_property
+    def japi_counts(self):
+        """
+        Returns the names of the *to-many* relationships, whose number of
+        relatives should be added to the *meta* object of the relationships
+        in the primary data.
+
+        Query parameter: ``meta[counts]``
+
+        .. code-block:: python3
+
+            >>> # /api/Post?meta[counts]=comments,tags
+            >>> request.japi_counts
+            ... ["comments", "tags"]
+        """
+        counts = self.get_query_argument("meta[counts]", "")
+        counts = [item.strip() for item in counts.split(",") if item.strip()]
+        return counts
+
     @cached_property
     def japi_sort(self):
         """
@@ -450,6 +504,17 @@ class Request(object):
             >>> # /api/Post?sort=name,-age
             ... [("+", "name"), ("-", "age")]
 
+        A field may be a dotted path through *to-one* relationships, which
+        sorts by an attribute of the related resource:
+
+        .. code-block:: python3
+
+            >>> # /api/Post?sort=-author.name,created
+            ... [("-", "author.name"), ("+", "created")]
+
+        The key ``relevance`` (:data:`jsonapi.base.database.RELEVANCE`)
+        sorts by the relevance for the `search` filters of the request.
+
         :seealso: http://jsonapi.org/format/#fetching-sorting
         """
         tmp = self.get_query_argument("sort")
@@ -466,6 +531,100 @@ class Request(object):
                 sort.append(("+", field))
         return sort
 
+    @cached_property
+    def japi_aggregate(self):
+        """
+        Returns a list with the tuples ``(function, field)``, which should be
+        computed over the collection instead of returning the resources.
+
+        The supported functions are `count`, `sum`, `avg`, `min` and `max`.
+        The field ``*`` counts the resources.
+
+        .. code-block:: python3
+
+            >>> # /api/Order?aggregate[count]=*&aggregate[sum]=amount,tax
+            >>> request.japi_aggregate
+            ... [("count", "*"), ("sum", "amount"), ("sum", "tax")]
+
+        :raises jsonapi.base.errors.BadRequest:
+            If the function does not exist or ``*`` is used with another
+            function than `count`.
+        """
+        AGGREGATE_RE = re.compile(r"aggregate\[([A-z0-9_]+)\]")
+        FUNCTIONS = ("count", "sum", "avg", "min", "max")
+
+        aggregates = list()
+        for key, value in self.query.items():
+            match = re.fullmatch(AGGREGATE_RE, key)
+            if not match:
+                continue
+
+            function = match.group(1)
+            if not function in FUNCTIONS:
+                raise errors.BadRequest(
+                    detail="The aggregate '{}' does not exist."\
+                        .format(function),
+                    source_parameter=key
+                )
+
+            fields = [item.strip() for item in value[0].split(",")]
+            for field in fields:
+                if not field:
+                    continue
+                if field == "*" and function != "count":
+                    raise errors.BadRequest(
+                        detail="Only 'count' can be used with '*'.",
+                        source_parameter=key
+                    )
+                aggregates.append((function, field))
+        return aggregates
+
+    @cached_property
+    def japi_group(self):
+        """
+        Returns the names of the fields, by which the resources are grouped,
+        when the aggregates (:attr:`japi_aggregate`) are computed.
+
+        Query parameter: ``group[by]``
+
+        .. code-block:: python3
+
+            >>> # /api/Order?aggregate[sum]=amount&group[by]=status,customer
+            >>> request.japi_group
+            ... ["status", "customer"]
+        """
+        group = self.get_query_argument("group[by]", "")
+        group = [item.strip() for item in group.split(",") if item.strip()]
+        return group
+
+    @cached_property
+    def japi_export(self):
+        """
+        Returns the format, in which a whole collection should be exported or
+        None, if the collection should not be exported.
+
+        Query parameter: ``export``
+
+        .. code-block:: python3
+
+            >>> # /api/Post?export=ndjson
+            >>> request.japi_export
+            ... "ndjson"
+
+        Currently, only ``ndjson`` (newline delimited JSON) is supported.
+
+        :raises jsonapi.base.errors.BadRequest:
+            If the export format is not supported.
+        """
+        export = self.get_query_argument("export")
+        if export is not None and export != "ndjson":
+            raise errors.BadRequest(
+                detail="The export format '{}' is not supported."\
+                    .format(export),
+                source_parameter="export"
+            )
+        return export
+
     @cached_property
     def json(self):
         """
@@ -477,7 +636,9 @@ class Request(object):
             *   :meth:`jsonapi.base.api.API.load_json`
         """
         try:
-            if not isinstance(self.body, str):
+            if self.is_stream:
+                text = b"".join(self.body).decode()
+            elif not isinstance(self.body, str):
                 text = self.body.decode()
             else:
                 text = self.body
@@ -44,13 +44,23 @@ class Response(object):
         The body of the http response as bytes. This attribute maybe None.
     :arg file:
         If not None, this is a file like object or a filename.
+    :arg chunks:
+        If not None, this is an iterator, which yields the body of the http
+        response in chunks of bytes. The web framework should send each chunk
+        to the client, as soon as it is available. If the iterator raises an
+        exception, the web framework should abort the response. The chunks
+        of an asynchronous API may also be coroutines
+        (see :mod:`jsonapi.asyncio.api`).
     """
 
-    def __init__(self, status=200, headers=None, body=None, file=None):
+    def __init__(self, status=200, headers=None, body=None, file=None,
+        chunks=None
+        ):
         self.status = status
         self.headers = headers if headers is not None else dict()
         self.body = body
         self.file = file
+        self.chunks = chunks
         return None
 
     @property
@@ -67,3 +77,11 @@ class Response(object):
         client.
         """
         return self.file is not None
+
+    @property
+    def is_stream(self):
+        """
+        Returns true, if the body is available as iterator of chunks
+        (:attr:`chunks`).
+        """
+        return self.chunks is not None
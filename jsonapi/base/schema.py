@@ -38,6 +38,9 @@ class, this schema is **not** implemented as meta class.
     *   :mod:`jsonapi.marker.property` to decorate properties
 """
 
+# local
+from .utilities import ensure_identifier
+
 
 __all__ = [
     "Attribute",
@@ -147,6 +150,25 @@ class ToOneRelationship(BaseRelationship):
     to_one = True
     to_many = False
 
+    def get_identifier(self, resource):
+        """
+        **Can be overridden** for performance reasons.
+
+        Returns the identifier tuple ``(typename, id)`` of the relative or
+        None. The serializer uses this method, if only the linkage is needed.
+        Overriding it allows to read the id of the relative without loading
+        the relative.
+
+        The default implementation is equal to:
+
+        .. code-block:: python3
+
+            relative = self.get(resource)
+            return ensure_identifier(relative) if relative is not None else None
+        """
+        relative = self.get(resource)
+        return ensure_identifier(relative) if relative is not None else None
+
     def clear(self, resource):
         """
         **Can be overridden**
@@ -169,6 +191,34 @@ class ToManyRelationship(BaseRelationship):
     to_one = False
     to_many = True
 
+    #: True, if :meth:`extend` and :meth:`remove_many` also accept the
+    #: identifier tuples ``(typename, id)`` of the relatives. The
+    #: unserializer does not load the new or removed relatives then.
+    accepts_identifiers = False
+
+    #: If :attr:`accepts_identifiers` is true, the unserializer checks with
+    #: :meth:`jsonapi.base.database.Session.check_existence`, that the new
+    #: relatives exist, before their identifiers are added.
+    check_existence = True
+
+    def get_identifiers(self, resource):
+        """
+        **Can be overridden** for performance reasons.
+
+        Returns the list with the identifier tuples ``(typename, id)`` of the
+        relatives. The serializer uses this method, if only the linkage is
+        needed. Overriding it allows to read the ids of the relatives without
+        loading the relatives.
+
+        The default implementation is equal to:
+
+        .. code-block:: python3
+
+            return [ensure_identifier(item) for item in self.get(resource)]
+        """
+        relatives = self.get(resource) or list()
+        return [ensure_identifier(relative) for relative in relatives]
+
     def add(self, resource, relative):
         """
         **Must be overridden**
@@ -187,6 +237,41 @@ class ToManyRelationship(BaseRelationship):
             self.add(resource, relative)
         return None
 
+    def remove(self, resource, relative):
+        """
+        **Can be overridden**
+
+        Removes the *relative* from the relationship. The *relative* is an
+        item of the list returned by :meth:`get`.
+
+        Default implementation is equal to:
+
+        .. code-block:: python3
+
+            self.remove_many(resource, [relative])
+        """
+        self.remove_many(resource, [relative])
+        return None
+
+    def remove_many(self, resource, relatives):
+        """
+        **Can be overridden** for performance reasons.
+
+        Removes all *relatives* from the relationship. The *relatives* are
+        items of the list returned by :meth:`get` or identifier tuples, if
+        :attr:`accepts_identifiers` is true.
+
+        The default implementation replaces the relatives with the remaining
+        ones using :meth:`set`.
+        """
+        removed = set(id(relative) for relative in relatives)
+        remaining = [
+            relative for relative in self.get(resource)\
+            if not id(relative) in removed
+        ]
+        self.set(resource, remaining)
+        return None
+
     def clear(self, resource):
         """
         **Can be overridden**
@@ -219,6 +304,21 @@ class Constructor(object):
         """
         raise NotImplementedError()
 
+    def create_many(self, fields_list):
+        """
+        **Can be overridden** for performance reasons.
+
+        Creates one new resource for each dictionary in *fields_list* and
+        returns them in the same order. Each dictionary maps the fields of
+        the resource to their initial value (like the keyword arguments of
+        :meth:`create`).
+
+        The default implementation calls :meth:`create` for each item.
+
+        :arg list fields_list:
+        """
+        return [self.create(**fields) for fields in fields_list]
+
 
 class InitConstructor(Constructor):
     """
@@ -35,12 +35,14 @@ from collections import OrderedDict
 import logging
 
 # local
-from .utilities import ensure_identifier_object
+from .utilities import ensure_identifier, ensure_identifier_object
 
 
 __all__ = [
     "Unserializer",
-    "Serializer"
+    "Serializer",
+    "serialize_many",
+    "iter_serialize_many"
 ]
 
 
@@ -61,20 +63,14 @@ class Unserializer(object):
         self.schema = schema
         return None
 
-    def _load_relationships_object(self, db, relationships_object):
+    def _collect_relationships_identifiers(self, relationships_object):
         """
-        Loads all resources referenced in the JSONapi relationships object
-        *relationships_object* and returns a dictionary, which maps the
-        relationship names to the related resources.
+        Returns a set with the identifiers of all resources referenced in
+        the JSONapi relationships object *relationships_object*.
 
-        :arg jsonapi.base.database.Session db:
-            The database session used to query the related resources.
         :arg dict relationships_object:
             A JSONapi relationships object
-
-        :seealso: http://jsonapi.org/format/#document-resource-object-relationships
         """
-        # Collect the identifiers.
         identifiers = set()
         for relname, relobj in relationships_object.items():
             reldata = relobj.get("data")
@@ -90,11 +86,20 @@ class Unserializer(object):
                 identifiers.update(
                     (item["type"], item["id"]) for item in reldata
                 )
+        return identifiers
 
-        # Load the resources
-        relatives = db.get_many(identifiers, required=True)
+    def _map_relationships_object(self, relationships_object, relatives):
+        """
+        Returns a dictionary, which maps the relationship names in the JSONapi
+        relationships object *relationships_object* to the related resources.
 
-        # Map the relationship names back to the related resources.
+        :arg dict relationships_object:
+            A JSONapi relationships object
+        :arg dict relatives:
+            A dictionary, which maps the identifiers to the loaded resources.
+            It must contain all identifiers referenced in the
+            *relationships_object*.
+        """
         result = dict()
         for relname, relobj in relationships_object.items():
             if "data" in relobj:
@@ -117,6 +122,47 @@ class Unserializer(object):
                     ]
         return result
 
+    def _load_relationships_object(self, db, relationships_object):
+        """
+        Loads all resources referenced in the JSONapi relationships object
+        *relationships_object* and returns a dictionary, which maps the
+        relationship names to the related resources.
+
+        :arg jsonapi.base.database.Session db:
+            The database session used to query the related resources.
+        :arg dict relationships_object:
+            A JSONapi relationships object
+
+        :seealso: http://jsonapi.org/format/#document-resource-object-relationships
+        """
+        identifiers = self._collect_relationships_identifiers(
+            relationships_object
+        )
+        relatives = db.get_many(identifiers, required=True)
+        return self._map_relationships_object(relationships_object, relatives)
+
+    def _build_fields(self, resource_object, relatives):
+        """
+        Returns the dictionary with the initial field values for a new
+        resource, which is described by the JSONapi resource object
+        *resource_object*.
+
+        :arg dict resource_object:
+        :arg dict relatives:
+            A dictionary, which maps the identifiers to the loaded resources.
+        """
+        assert resource_object["type"] == self.schema.typename
+
+        relationships = resource_object.get("relationships", dict())
+        relationships = self._map_relationships_object(relationships, relatives)
+
+        attributes = resource_object.get("attributes", dict())
+
+        fields = dict()
+        fields.update(attributes)
+        fields.update(relationships)
+        return fields
+
     def create_resource(self, db, resource_object):
         """
         Creates a new resource using the JSONapi resource object
@@ -146,6 +192,37 @@ class Unserializer(object):
         resource = self.schema.constructor.create(**fields)
         return resource
 
+    def create_resources(self, db, resource_objects):
+        """
+        Creates a new resource for each JSONapi resource object in
+        *resource_objects*. The relatives of all resources are loaded with
+        only one :meth:`~jsonapi.base.database.Session.get_many` call and the
+        resources are created with
+        :meth:`~jsonapi.base.schema.Constructor.create_many`.
+
+        :arg jsonapi.base.database.Session db:
+            The database session used to query related resources.
+        :arg list resource_objects:
+            A list of JSONapi resource objects.
+        :rtype: list
+        :returns:
+            The new resources in the same order as *resource_objects*.
+        """
+        # Load the relatives of all resources at once.
+        identifiers = set()
+        for resource_object in resource_objects:
+            identifiers.update(self._collect_relationships_identifiers(
+                resource_object.get("relationships", dict())
+            ))
+        relatives = db.get_many(identifiers, required=True)
+
+        # Create the new resources.
+        fields_list = [
+            self._build_fields(resource_object, relatives)\
+            for resource_object in resource_objects
+        ]
+        return self.schema.constructor.create_many(fields_list)
+
     def update_resource(self, db, resource, resource_object):
         """
         Updates the resource *resource* using the JSONapi resource object
@@ -176,6 +253,131 @@ class Unserializer(object):
                 self.update_relationship(db, resource, rel_name, rel_object)
         return None
 
+    def _collect_update_identifiers(self, resource, relationships_object):
+        """
+        Returns the identifiers of the relatives, which must be loaded to
+        update the relationships of the *resource* with the JSONapi
+        relationships object *relationships_object*, and the identifiers,
+        whose existence must only be checked.
+
+        These are the targets of the *to-one* relationships and the new
+        relatives of the *to-many* relationships. The relatives, which are
+        already in a *to-many* relationship, are neither loaded nor checked.
+
+        :arg resource:
+        :arg dict relationships_object:
+        """
+        load = set()
+        check = set()
+        for relname, relobj in relationships_object.items():
+            if not "data" in relobj:
+                continue
+
+            relationship = self.schema.relationships[relname]
+            reldata = relobj["data"]
+            if relationship.to_one:
+                if reldata is not None:
+                    load.add((reldata["type"], reldata["id"]))
+                continue
+
+            identifiers = [(item["type"], item["id"]) for item in reldata]
+            added, removed = self._diff_relationship(
+                resource, relationship, identifiers
+            )
+            if not relationship.accepts_identifiers:
+                load.update(added)
+            elif relationship.check_existence:
+                check.update(added)
+        return (load, check)
+
+    def _update_relationships(self, resource, relationships_object, relatives):
+        """
+        Updates the relationships of the resource *resource* using the JSONapi
+        relationships object *relationships_object*. The relatives must have
+        already been loaded.
+
+        Like in :meth:`update_relationship`, a *to-many* relationship is not
+        replaced as a whole, but only the difference is removed and added.
+
+        :arg resource:
+        :arg dict relationships_object:
+        :arg dict relatives:
+            A dictionary, which maps the identifiers to the loaded resources.
+            It must contain the identifiers returned by
+            :meth:`_collect_update_identifiers`.
+        """
+        for relname, relobj in relationships_object.items():
+            if not "data" in relobj:
+                continue
+
+            relationship = self.schema.relationships[relname]
+            reldata = relobj["data"]
+
+            # Update a *to-one* relationship
+            if relationship.to_one:
+                relative = None if reldata is None \
+                    else relatives[(reldata["type"], reldata["id"])]
+                relationship.set(resource, relative)
+                continue
+
+            # Update a *to-many* relationship
+            identifiers = [(item["type"], item["id"]) for item in reldata]
+            added, removed = self._diff_relationship(
+                resource, relationship, identifiers
+            )
+            if removed:
+                relationship.remove_many(resource, removed)
+            if added:
+                if not relationship.accepts_identifiers:
+                    added = [relatives[identifier] for identifier in added]
+                relationship.extend(resource, added)
+        return None
+
+    def update_resources(self, db, resources, resource_objects):
+        """
+        Updates each resource in *resources* with the JSONapi resource object
+        at the same position in *resource_objects*. The new relatives
+        referenced in all resource objects are loaded with only one
+        :meth:`~jsonapi.base.database.Session.get_many` call.
+
+        :arg jsonapi.base.database.Session db:
+            The database session used to query related resources.
+        :arg list resources:
+            The resources, which are updated
+        :arg list resource_objects:
+            A list of JSONapi resource objects containing the new attribute
+            and relationship values.
+
+        :seealso: :meth:`update_resource`
+        """
+        # Load the new relatives of all resources at once.
+        load = set()
+        check = set()
+        for resource, resource_object in zip(resources, resource_objects):
+            load_, check_ = self._collect_update_identifiers(
+                resource, resource_object.get("relationships", dict())
+            )
+            load.update(load_)
+            check.update(check_)
+
+        relatives = db.get_many(load, required=True)
+        if check:
+            db.check_existence(check)
+
+        # Update the resources.
+        for resource, resource_object in zip(resources, resource_objects):
+            assert resource_object["id"] \
+                == self.schema.id_attribute.get(resource)
+            assert resource_object["type"] == self.schema.typename
+
+            if "attributes" in resource_object:
+                self.update_attributes(resource, resource_object["attributes"])
+            if "relationships" in resource_object:
+                self._update_relationships(
+                    resource, resource_object["relationships"], relatives
+                )
+        return None
+
     def update_attributes(self, resource, attributes_object):
         """
         Updates the attributes of the resource *resource* using the JSONapi
@@ -211,6 +413,10 @@ class Unserializer(object):
             A JSONapi relationship object, containing the new relationship
             values.
 
+        A *to-many* relationship is not replaced as a whole. Only the new
+        relatives are loaded and added, and only the relatives, which are
+        not referenced anymore, are removed.
+
         :seealso: http://jsonapi.org/format/#document-resource-object-relationships
         :seealso: http://jsonapi.org/format/#crud-updating-relationships
         """
@@ -235,10 +441,16 @@ class Unserializer(object):
             identifiers = relationship_object["data"]
             identifiers = [(item["type"], item["id"]) for item in identifiers]
 
-            relatives = db.get_many(identifiers, required=True)
-            relatives = list(relatives.values())
-
-            relationship.set(resource, relatives)
+            # Only the difference to the current relatives is loaded and
+            # changed.
+            added, removed = self._diff_relationship(
+                resource, relationship, identifiers
+            )
+            if removed:
+                relationship.remove_many(resource, removed)
+            if added:
+                relatives = self._load_new_relatives(db, relationship, added)
+                relationship.extend(resource, relatives)
         return None
 
     def extend_relationship(
@@ -259,6 +471,9 @@ class Unserializer(object):
             A JSONapi relationship object, containing identifiers of the new
             relatives.
 
+        Relatives, which are already in the relationship, are neither loaded
+        nor added again.
+
         :seealso: http://jsonapi.org/format/#document-resource-object-relationships
         :seealso: http://jsonapi.org/format/#crud-updating-relationships
         """
@@ -270,13 +485,131 @@ class Unserializer(object):
             identifiers = relationship_object["data"]
             identifiers = [(item["type"], item["id"]) for item in identifiers]
 
-            # Load the new relatives.
-            relatives = db.get_many(identifiers, required=True)
-            relatives = list(relatives.values())
+            # Load only the relatives, which are not yet in the relationship.
+            added, removed = self._diff_relationship(
+                resource, relationship, identifiers
+            )
+            if added:
+                relatives = self._load_new_relatives(db, relationship, added)
+                relationship.extend(resource, relatives)
+        return None
+
+    def shrink_relationship(
+        self, resource, relationship_name, relationship_object
+        ):
+        """
+        Removes the relatives in the JSONapi relationship object
+        *relationship_object* from the **to-many** relationship with the
+        name *relationship_name* of the resource *resource*.
 
-            relationship.extend(resource, relatives)
+        :arg resource:
+            The resource, whichs relationship is shrinked
+        :arg str relationship_name:
+            The name of the relationship, which is shrinked
+        :arg dict relationship_object:
+            A JSONapi relationship object, containing identifiers of the
+            relatives, which are removed.
+
+        Identifiers, which are not in the relationship, are ignored. The
+        relatives are not loaded, only the removed ones are materialized
+        (unless the relationship accepts identifiers).
+
+        :seealso: http://jsonapi.org/format/#crud-updating-to-many-relationships
+        """
+        relationship = self.schema.relationships[relationship_name]
+        assert relationship.to_many
+
+        if "data" in relationship_object:
+            identifiers = relationship_object["data"]
+            identifiers = set(
+                (item["type"], item["id"]) for item in identifiers
+            )
+
+            # The remaining relatives are the new linkage of the relationship.
+            current = relationship.get_identifiers(resource) or list()
+            remaining = [
+                identifier for identifier in current\
+                if not identifier in identifiers
+            ]
+            added, removed = self._diff_relationship(
+                resource, relationship, remaining
+            )
+            if removed:
+                relationship.remove_many(resource, removed)
         return None
 
+    def _load_new_relatives(self, db, relationship, identifiers):
+        """
+        Returns the new relatives with the *identifiers* of the *to-many*
+        *relationship* in the same order.
+
+        If the *relationship* accepts identifiers, the relatives are not
+        loaded and the *identifiers* are returned. Their existence is only
+        checked with :meth:`~jsonapi.base.database.Session.check_existence`.
+
+        :arg jsonapi.base.database.Session db:
+        :arg jsonapi.base.schema.ToManyRelationship relationship:
+        :arg list identifiers:
+            A list of identifier tuples ``(typename, id)``.
+        """
+        if relationship.accepts_identifiers:
+            if relationship.check_existence:
+                db.check_existence(identifiers)
+            return identifiers
+
+        relatives = db.get_many(identifiers, required=True)
+        return [relatives[identifier] for identifier in identifiers]
+
+    def _diff_relationship(self, resource, relationship, identifiers):
+        """
+        Compares the current relatives in the *to-many* relationship of the
+        *resource* with the *identifiers* of the new relatives.
+
+        Returns the identifiers, which are not yet in the relationship, and
+        the current relatives, which are not referenced in *identifiers*. The
+        order of the relatives is not taken into account.
+
+        The current linkage is read with
+        :meth:`~jsonapi.base.schema.ToManyRelationship.get_identifiers`, so
+        the relatives are not loaded for the comparison. If the relationship
+        accepts identifiers, the identifiers of the removed relatives are
+        returned. Otherwise, the items returned by
+        :meth:`~jsonapi.base.schema.ToManyRelationship.get` are picked at
+        the positions of the removed identifiers.
+
+        :arg resource:
+        :arg jsonapi.base.schema.ToManyRelationship relationship:
+        :arg list identifiers:
+            A list of identifier tuples ``(typename, id)``.
+        """
+        current = relationship.get_identifiers(resource) or list()
+
+        identifiers = list(OrderedDict.fromkeys(identifiers))
+        current_set = set(current)
+        added = [
+            identifier for identifier in identifiers\
+            if not identifier in current_set
+        ]
+
+        # Materialize only the relatives, which are removed.
+        removed_set = current_set.difference(identifiers)
+        if not removed_set:
+            return (added, list())
+
+        if relationship.accepts_identifiers:
+            removed = [
+                identifier for identifier in current\
+                if identifier in removed_set
+            ]
+            return (added, removed)
+
+        relatives = relationship.get(resource) or list()
+        removed = [
+            relative for identifier, relative in zip(current, relatives)\
+            if identifier in removed_set
+        ]
+        return (added, removed)
+
     def clear_relationship(self, resource, relationship_name):
         """
         Removes all relatives from the relationship with the name
@@ -391,19 +724,18 @@ class Serializer(object):
 
         # Serialize a to-one relationship.
         if rel.to_one:
-            relative = rel.get(resource)
-            if relative is None:
+            identifier = rel.get_identifier(resource)
+            if identifier is None:
                 d["data"] = None
             else:
-                d["data"] = ensure_identifier_object(relative)
+                d["data"] = ensure_identifier_object(identifier)
 
         # Serialize a to many relationship.
         else:
-            relatives = rel.get(resource)
-            relatives = [
-                ensure_identifier_object(item) for item in relatives
+            identifiers = rel.get_identifiers(resource)
+            d["data"] = [
+                ensure_identifier_object(item) for item in identifiers
             ]
-            d["data"] = relatives
         return d
 
 
@@ -420,11 +752,21 @@ def serialize_many(resources, fields):
     :seealso: :meth:`Serializer.serialize_resource`
     :seealso: :meth:`jsonapi.base.request.Request.japi_fields`
     """
-    data = list()
+    return list(iter_serialize_many(resources, fields))
+
+
+def iter_serialize_many(resources, fields):
+    """
+    The same as :func:`serialize_many`, but returns a generator, which
+    serializes the *resources* one by one.
+
+    :arg resources:
+        An iterable of resources
+    :arg dict fields:
+    """
     for resource in resources:
         serializer = resource._jsonapi["serializer"]
         typename = resource._jsonapi["typename"]
-        data.append(
-            serializer.serialize_resource(resource, fields=fields.get(typename))
+        yield serializer.serialize_resource(
+            resource, fields=fields.get(typename)
         )
-    return data
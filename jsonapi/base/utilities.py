@@ -34,7 +34,7 @@ modules.
 from collections import OrderedDict
 
 # local
-from .errors import RelationshipNotFound
+from .errors import RelationshipNotFound, UnaggregatableField
 
 
 __all__ = [
@@ -42,6 +42,8 @@ __all__ = [
     "ensure_identifier",
     "collect_identifiers",
     "relative_identifiers",
+    "aggregate_result",
+    "aggregate_resources"
 ]
 
 
@@ -173,10 +175,116 @@ def relative_identifiers(relname, resource):
     if relationship is None:
         raise RelationshipNotFound(schema.typename, relname)
     elif relationship.to_one:
-        relative = relationship.get(resource)
-        relatives = [relative] if relative else []
+        identifier = relationship.get_identifier(resource)
+        return [identifier] if identifier else []
     else:
-        relatives = relationship.get(resource)
+        return relationship.get_identifiers(resource)
 
-    relatives = [ensure_identifier(relative) for relative in relatives]
-    return relatives
+
+def aggregate_result(group, group_values, aggregates, values):
+    """
+    Returns the result of an aggregation for a single group:
+
+    .. code-block:: python3
+
+        >>> aggregate_result(
+        ...     ["status"], ["open"],
+        ...     [("count", "*"), ("sum", "amount")], [12, 340]
+        ... )
+        {
+            "group": {"status": "open"},
+            "count": {"*": 12},
+            "sum": {"amount": 340}
+        }
+
+    :arg list group:
+        The names of the fields, by which the resources are grouped
+    :arg list group_values:
+        The values of the *group* fields in this group
+    :arg list aggregates:
+        A list of tuples ``(function, fieldname)``
+    :arg list values:
+        The aggregated values in the same order as the *aggregates*
+    """
+    result = OrderedDict()
+    result["group"] = OrderedDict(zip(group, group_values))
+    for (function, fieldname), value in zip(aggregates, values):
+        result.setdefault(function, OrderedDict())[fieldname] = value
+    return result
+
+
+def aggregate_resources(schema, resources, aggregates, group):
+    """
+    Computes the *aggregates* over the *resources* in Python and returns
+    a list with one :func:`aggregate_result` per group. This is the fallback
+    for databases, which can not aggregate the resources themselves.
+
+    The resources can be grouped by attributes and *to-one* relationships
+    (by the id of the relative).
+
+    :arg schema:
+        The schema of the *resources*
+    :arg resources:
+    :arg list aggregates:
+        A list of tuples ``(function, fieldname)``
+    :arg list group:
+        The names of the fields, by which the resources are grouped
+
+    :raises UnaggregatableField:
+    """
+    def group_getter(fieldname):
+        attribute = schema.attributes.get(fieldname)
+        relationship = schema.relationships.get(fieldname)
+        if attribute is not None:
+            return attribute.get
+        elif relationship is not None and relationship.to_one:
+            return lambda resource: \
+                (relationship.get_identifier(resource) or (None, None))[1]
+        raise UnaggregatableField(schema.typename, "group", fieldname)
+
+    def value_getter(function, fieldname):
+        if function == "count" and fieldname == "*":
+            return None
+        attribute = schema.attributes.get(fieldname)
+        if attribute is None:
+            raise UnaggregatableField(schema.typename, function, fieldname)
+        return attribute.get
+
+    group_getters = [group_getter(fieldname) for fieldname in group]
+    value_getters = [
+        value_getter(function, fieldname) for function, fieldname in aggregates
+    ]
+
+    groups = OrderedDict()
+    for resource in resources:
+        key = tuple(getter(resource) for getter in group_getters)
+        groups.setdefault(key, list()).append(resource)
+
+    # Without grouping, there is always exactly one result.
+    if not group and not groups:
+        groups[()] = list()
+
+    results = list()
+    for key, members in groups.items():
+        values = list()
+        for (function, fieldname), getter in zip(aggregates, value_getters):
+            if getter is None:
+                values.append(len(members))
+                continue
+
+            items = [getter(member) for member in members]
+            items = [item for item in items if item is not None]
+            if function == "count":
+                values.append(len(items))
+            elif not items:
+                values.append(None)
+            elif function == "sum":
+                values.append(sum(items))
+            elif function == "avg":
+                values.append(sum(items)/len(items))
+            elif function == "min":
+                values.append(min(items))
+            elif function == "max":
+                values.append(max(items))
+        results.append(aggregate_result(group, key, aggregates, values))
+    return results
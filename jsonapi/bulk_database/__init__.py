@@ -54,11 +54,42 @@ models to the JSONapi, you can use the bulk database:
     bulk_db.add_type(user_schema, sql_db)
     bulk_db.add_type(session_schema, redis_db)
 
+Concurrency
+-----------
+
+If a request needs resources from more than one database, the bulk database
+talks to the databases **concurrently** using worker threads. Each database
+session is bound to one thread. The number of workers can be set:
+
+.. code-block:: python3
+
+    bulk_db = jsonapi.bulk_database.Database(max_workers=4)
+
+The sessions are committed one after another, so if a database rejects the
+changes, the databases after it are not committed. The time spent in each
+database is recorded in the session's *timings* attribute.
+
+asyncio
+-------
+
+If you use an asynchronous API (e.g. :mod:`jsonapi.tornado`), you must use the
+asynchronous bulk database in :mod:`jsonapi.bulk_database.asyncio`. It works
+exactly like the synchronous version, but requires asynchronous database
+adapters and queries them concurrently with :func:`asyncio.gather`:
+
+.. code-block:: python3
+
+    bulk_db = jsonapi.bulk_database.asyncio.Database()
+    bulk_db.add_type("User", motorengine_db)
+    bulk_db.add_type("Session", async_redis_db)
+
 API
 ---
 
 .. autoclass:: jsonapi.bulk_database.database.Database
+.. autoclass:: jsonapi.bulk_database.asyncio.Database
 """
 
 # local
 from . database import Database
+from . import asyncio
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2016 Benedikt Schmitt
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+jsonapi.bulk_database.asyncio
+=============================
+
+The *asynchronous* version of the bulk database. It can be used with
+:mod:`jsonapi.asyncio` APIs (e.g. :mod:`jsonapi.tornado`) and routes each
+type to an asynchronous database adapter like :mod:`jsonapi.motorengine`.
+"""
+
+# std
+import asyncio
+from collections import defaultdict
+
+# local
+import jsonapi
+from jsonapi.base import errors
+from jsonapi.base.utilities import relative_identifiers
+
+
+__all__ = [
+    "Database",
+    "Session"
+]
+
+
+class Database(jsonapi.asyncio.database.Database):
+    """
+    This adapter is only a *proxy*. You must associate each type with an
+    **asynchronous** database adapter, on setup.
+
+    :arg jsonapi.base.api.API api:
+    """
+
+    def __init__(self, api=None):
+        super().__init__(api)
+
+        # typename to database adapter
+        self._dbs = dict()
+        return None
+
+    def session(self):
+        return Session(api=self.api, db=self)
+
+    def get_db(self, typename):
+        """
+        Returns the database adapter associated with the type *typename*.
+
+        :arg str typename:
+        :raises KeyError: If the typename is no associated with a database.
+        """
+        return self._dbs[typename]
+
+    def add_type(self, typename, db):
+        """
+        Associates the type *typename* with the database adapter *db*.
+
+        :arg str typename:
+        :arg jsonapi.asyncio.database.Database db:
+
+        :seealso: :meth:`add_schema`
+        """
+        self._dbs[typename] = db
+        return None
+
+    def add_schema(self, schema, db):
+        """
+        Associates the *schema* with the database adapter *db*.
+        """
+        self._dbs[schema.typename] = db
+        return None
+
+
+class Session(jsonapi.asyncio.database.Session):
+    """
+    Works like the :class:`synchronous bulk session
+    <jsonapi.bulk_database.database.Session>`, but forwards the calls to
+    asynchronous sessions. Calls, which affect more than one database adapter,
+    are sent to all adapters at once with :func:`asyncio.gather`.
+
+    :arg jsonapi.base.api.API api:
+    :arg jsonapi.bulk_database.asyncio.Database db:
+    """
+
+    def __init__(self, api, db):
+        """
+        """
+        self.api = api
+        self.db = db
+
+        # Maps the database adapter to the database session.
+        self._sessions = dict()
+        return None
+
+    def session(self, typename):
+        """
+        Returns the database session, which must be used for resources of the
+        type *typename*. If no session for the database has been created yet,
+        it will be done now.
+
+        :arg str typename:
+        :rtype: jsonapi.asyncio.database.Session
+        """
+        return self.session_by_db(self.db.get_db(typename))
+
+    def session_by_db(self, db):
+        """
+        If a session for the database adapter *db* already exists, it is
+        returned. Otherwise, a new session is created.
+
+        :arg jsonapi.asyncio.database.Database db:
+        :rtype: jsonapi.asyncio.database.Session
+        """
+        if not db in self._sessions:
+            self._sessions[db] = db.session()
+        return self._sessions[db]
+
+    def _group_by_session(self, items, key):
+        """
+        Buckets the *items* by the session, which is responsible for them.
+        The typename of an item is computed with *key*.
+
+        :arg items:
+        :arg key:
+            A function, which returns the typename of an item.
+        :rtype: dict
+        """
+        buckets = defaultdict(list)
+        for item in items:
+            buckets[self.session(key(item))].append(item)
+        return buckets
+
+    def query(self, typename,
+        *, order=None, limit=None, offset=None, filters=None
+        ):
+        """
+        """
+        session = self.session(typename)
+        return session.query(
+            typename, order=order, limit=limit, offset=offset, filters=filters
+        )
+
+    def query_iter(self, typename,
+        *, order=None, limit=None, offset=None, filters=None, batch_size=1000
+        ):
+        """
+        """
+        session = self.session(typename)
+        return session.query_iter(
+            typename, order=order, limit=limit, offset=offset,
+            filters=filters, batch_size=batch_size
+        )
+
+    def query_size(self, typename,
+        *, order=None, limit=None, offset=None, filters=None
+        ):
+        """
+        """
+        session = self.session(typename)
+        return session.query_size(
+            typename, order=order, limit=limit, offset=offset, filters=filters
+        )
+
+    def query_serialized(self, typename,
+        *, order=None, limit=None, offset=None, filters=None, fields=None
+        ):
+        """
+        """
+        session = self.session(typename)
+        return session.query_serialized(
+            typename, order=order, limit=limit, offset=offset,
+            filters=filters, fields=fields
+        )
+
+    def aggregate(self, typename, aggregates, *, group=None, filters=None):
+        """
+        """
+        session = self.session(typename)
+        return session.aggregate(
+            typename, aggregates, group=group, filters=filters
+        )
+
+    def count_relatives(self, typename, ids, relname):
+        """
+        The relatives are counted in the database of the resources.
+        """
+        session = self.session(typename)
+        return session.count_relatives(typename, ids, relname)
+
+    def query_relatives(self, resource, relname,
+        *, order=None, limit=None, offset=None, filters=None
+        ):
+        """
+        The relatives are queried in the database of the *resource*.
+        """
+        session = self.session(self.api.get_typename(resource))
+        return session.query_relatives(
+            resource, relname,
+            order=order, limit=limit, offset=offset, filters=filters
+        )
+
+    def query_relatives_size(self, resource, relname, *, filters=None):
+        """
+        """
+        session = self.session(self.api.get_typename(resource))
+        return session.query_relatives_size(resource, relname, filters=filters)
+
+    def get(self, identifier, required=False):
+        """
+        """
+        typename, resource_id = identifier
+        session = self.session(typename)
+        return session.get(identifier, required)
+
+    @asyncio.coroutine
+    def get_many(self, identifiers, required=False):
+        """
+        Loads the resources with one :meth:`get_many` call per database
+        adapter. The adapters are queried concurrently.
+        """
+        group_key = lambda identifier: identifier[0]
+        buckets = self._group_by_session(identifiers, group_key)
+
+        results = yield from asyncio.gather(*[
+            session.get_many(identifiers, required)\
+            for session, identifiers in buckets.items()
+        ])
+
+        all_resources = dict()
+        for resources in results:
+            all_resources.update(resources)
+        return all_resources
+
+    @asyncio.coroutine
+    def _get_path_relatives(self, resources, path):
+        """
+        Returns all resources on the include *path*, starting at *resources*.
+
+        :seealso: :meth:`get_relatives`
+        """
+        all_relatives = dict()
+        for relname in path:
+            # Collect the ids of all related resources.
+            relids = set()
+            for resource in resources:
+                try:
+                    tmp = relative_identifiers(relname, resource)
+                except errors.RelationshipNotFound:
+                    raise errors.UnresolvableIncludePath(path)
+                else:
+                    relids.update(tmp)
+
+            # Query the relatives from the database.
+            relatives = yield from self.get_many(relids, required=True)
+            all_relatives.update(relatives)
+
+            # The next relationship name in the path is defined on the
+            # previously fetched relatives.
+            resources = relatives.values()
+        return all_relatives
+
+    @asyncio.coroutine
+    def get_relatives(self, resources, paths):
+        """
+        The same as :meth:`jsonapi.asyncio.database.Session.get_relatives`,
+        but the different *paths* are resolved concurrently.
+        """
+        results = yield from asyncio.gather(*[
+            self._get_path_relatives(resources, path) for path in paths
+        ])
+
+        all_relatives = dict()
+        for relatives in results:
+            all_relatives.update(relatives)
+        return all_relatives
+
+    def save(self, resources):
+        """
+        """
+        buckets = self._group_by_session(resources, self.api.get_typename)
+        for session, resources in buckets.items():
+            session.save(resources)
+        return None
+
+    def delete(self, resources):
+        """
+        """
+        buckets = self._group_by_session(resources, self.api.get_typename)
+        for session, resources in buckets.items():
+            session.delete(resources)
+        return None
+
+    def delete_where(self, typename, *, filters=None, ids=None):
+        """
+        """
+        session = self.session(typename)
+        return session.delete_where(typename, filters=filters, ids=ids)
+
+    @asyncio.coroutine
+    def commit(self):
+        """
+        Commits the sessions of all database adapters concurrently.
+        """
+        yield from asyncio.gather(*[
+            session.commit() for session in self._sessions.values()
+        ])
+        return None
+
+    @asyncio.coroutine
+    def rollback(self):
+        """
+        Rolls back the sessions of all database adapters concurrently.
+        """
+        yield from asyncio.gather(*[
+            session.rollback() for session in self._sessions.values()
+        ])
+        return None
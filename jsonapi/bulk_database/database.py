@@ -28,30 +28,84 @@ jsonapi.bulk_database.database
 """
 
 # std
-from itertools import groupby
+from collections import defaultdict, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import itertools
+import logging
+import threading
+import time
 
 # local
 import jsonapi
 
 
 __all__ = [
-    "Database"
+    "Database",
+    "Session"
 ]
 
 
+LOG = logging.getLogger(__file__)
+
+
 class Database(jsonapi.base.database.Database):
     """
     This adapter is only a *proxy*. You must associate each type with a database
     adapter, on setup.
+
+    If a request touches more than one database adapter, the calls to the
+    adapters are dispatched concurrently to worker threads. So an *include*
+    over types stored in different databases costs about as much as the
+    slowest database and not the sum of all.
+
+    Like in :class:`jsonapi.asyncio.database.ExecutorDatabase`, each
+    database session is bound to **one** thread (session affinity), because
+    most drivers (e.g. sqlalchemy sessions) must not be used from different
+    threads.
+
+    :arg jsonapi.base.api.API api:
+    :arg int max_workers:
+        The number of worker threads.
     """
 
-    def __init__(self, api):
+    def __init__(self, api=None, max_workers=4):
         super().__init__(api)
 
         # typename to database adapter
         self._dbs = dict()
+
+        # The workers are created lazy, when they are needed the first time.
+        self.max_workers = max_workers
+        self._workers = None
+        self._next_worker = itertools.count()
+        self._lock = threading.Lock()
         return None
 
+    @property
+    def workers(self):
+        """
+        The list with the worker threads. Each worker is a
+        :class:`~concurrent.futures.ThreadPoolExecutor` with exactly one
+        thread, so that all calls of a session are run in the same thread.
+        """
+        with self._lock:
+            if self._workers is None:
+                self._workers = [
+                    ThreadPoolExecutor(max_workers=1)\
+                    for i in range(self.max_workers)
+                ]
+            return self._workers
+
+    def select_worker(self):
+        """
+        Returns the next worker thread (round robin), which is bound to a
+        new database session.
+
+        :rtype: concurrent.futures.ThreadPoolExecutor
+        """
+        workers = self.workers
+        return workers[next(self._next_worker) % len(workers)]
+
     def session(self):
         return Session(api=self.api, db=self)
 
@@ -100,6 +154,18 @@ class Session(jsonapi.base.database.Session):
     Works like the normal session object, but selects for each type the
     correct database adapter and forwards the query to it.
 
+    The sessions of the database adapters are created in the calling thread.
+    The session created first is also used in the calling thread, so a
+    request, which touches only one database adapter, does not need a worker
+    thread. Each other session is bound to a worker thread of the
+    :attr:`bulk database <db>` and all its calls are run in this thread.
+
+    .. hint::
+
+        The resources are serialized in the calling thread. So make sure,
+        that your ORM does not lazy load relationships, which are
+        serialized.
+
     :arg jsonapi.base.api.API api:
     :arg jsonapi.bulk_database.database.Database db:
     """
@@ -112,6 +178,18 @@ class Session(jsonapi.base.database.Session):
 
         # Maps the database adapter to the database session.
         self._sessions = dict()
+
+        # Maps the database adapter to the worker thread of its session or
+        # None, if the session is used in the calling thread.
+        self._workers = dict()
+
+        #: Maps each database adapter to a dictionary, which contains the
+        #: accumulated time (in seconds) spent in each session method:
+        #:
+        #: .. code-block:: python3
+        #:
+        #:      {sql_db: {"get_many": 0.012, "commit": 0.003}}
+        self.timings = defaultdict(lambda: defaultdict(float))
         return None
 
     def session(self, typename):
@@ -123,92 +201,278 @@ class Session(jsonapi.base.database.Session):
         :arg str typename:
         :rtype: jsonapi.base.database.Session
         """
-        db = self.db.get_db(typename)
-        if not db in self._sessions:
-            self._sessions[db] = db.session()
-        return self._sessions[db]
+        return self.session_by_db(self.db.get_db(typename))
 
     def session_by_db(self, db):
         """
         If a session for the database adapter *db* already exists, it is
-        returned. Otherwise, a new session is created.
+        returned. Otherwise, a new session is created and bound to a thread.
 
         :arg jsonapi.base.database.Database db:
         :rtype: jsonapi.base.database.Session
         """
         if not db in self._sessions:
+            self._workers[db] = self.db.select_worker() \
+                if self._sessions else None
             self._sessions[db] = db.session()
         return self._sessions[db]
 
+    def _run(self, db, method, *args, **kargs):
+        """
+        Calls the *method* of the session for the database adapter *db* in
+        the current thread and adds the elapsed time to :attr:`timings`.
+
+        :arg jsonapi.base.database.Database db:
+        :arg str method:
+            The name of the session method
+        """
+        session = self._sessions[db]
+
+        start = time.perf_counter()
+        try:
+            return getattr(session, method)(*args, **kargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings[db][method] += elapsed
+            LOG.debug("%s.%s() took %.4fs", db, method, elapsed)
+
+    def _call(self, db, method, *args, **kargs):
+        """
+        Calls the *method* of the session for the database adapter *db* in
+        the thread of the session and returns the result.
+
+        :arg jsonapi.base.database.Database db:
+        :arg str method:
+            The name of the session method
+        """
+        self.session_by_db(db)
+        worker = self._workers[db]
+        if worker is None:
+            return self._run(db, method, *args, **kargs)
+
+        future = worker.submit(self._run, db, method, *args, **kargs)
+        return future.result()
+
+    def _fan_out(self, calls):
+        """
+        Dispatches the *calls* concurrently to the threads of the sessions
+        and waits until all calls are done.
+
+        :arg list calls:
+            A list of tuples ``(db, method, args)``
+        :rtype: list
+        :returns:
+            The results in the same order as *calls*.
+        """
+        # The sessions are created in the calling thread.
+        for db, method, args in calls:
+            self.session_by_db(db)
+
+        # Start the calls in the worker threads first, so that they run
+        # concurrently to the call in the calling thread.
+        futures = dict()
+        for i, (db, method, args) in enumerate(calls):
+            worker = self._workers[db]
+            if worker is not None:
+                futures[i] = worker.submit(self._run, db, method, *args)
+
+        results = [None for call in calls]
+        for i, (db, method, args) in enumerate(calls):
+            if not i in futures:
+                results[i] = self._run(db, method, *args)
+        for i, future in futures.items():
+            results[i] = future.result()
+        return results
+
+    def _iter_in_worker(self, db, iterator, batch_size):
+        """
+        Pulls the items of the *iterator* in batches of *batch_size* in the
+        thread of the session for the database adapter *db*, so that a
+        cursor is never used in the calling thread.
+        """
+        worker = self._workers[db]
+        while True:
+            batch = worker.submit(
+                list, itertools.islice(iterator, batch_size)
+            ).result()
+            if not batch:
+                break
+            yield from batch
+        return None
+
+    def _group_by_db(self, items, key):
+        """
+        Buckets the *items* by the database adapter, which is responsible for
+        them. The typename of an item is computed with *key*. The order of the
+        items within a bucket is preserved.
+
+        Unlike :func:`itertools.groupby`, this does not require the *items*
+        to be sorted, so interleaved types like ``[(A, 1), (B, 2), (A, 3)]``
+        still result in only one bucket per backend.
+
+        :arg items:
+        :arg key:
+            A function, which returns the typename of an item.
+        :rtype: dict
+        :returns:
+            A dictionary, which maps a database adapter to its items.
+        """
+        buckets = defaultdict(list)
+        for item in items:
+            buckets[self.db.get_db(key(item))].append(item)
+        return buckets
+
     def query(self, typename,
         *, order=None, limit=None, offset=None, filters=None
         ):
         """
         """
-        session = self.session(typename)
-        return session.query(
-            typename, order=order, limit=limit, offset=offset, filters=filters
+        db = self.db.get_db(typename)
+        return self._call(
+            db, "query", typename,
+            order=order, limit=limit, offset=offset, filters=filters
         )
 
+    def query_iter(self, typename,
+        *, order=None, limit=None, offset=None, filters=None, batch_size=1000
+        ):
+        """
+        """
+        db = self.db.get_db(typename)
+        resources = self._call(
+            db, "query_iter", typename,
+            order=order, limit=limit, offset=offset, filters=filters,
+            batch_size=batch_size
+        )
+        if self._workers[db] is None:
+            return resources
+        return self._iter_in_worker(db, resources, batch_size)
+
     def query_size(self, typename,
         *, order=None, limit=None, offset=None, filters=None
         ):
         """
         """
-        session = self.session(typename)
-        return session.query_size(
-            typename, order=order, limit=limit, offset=offset, filters=filters
+        db = self.db.get_db(typename)
+        return self._call(
+            db, "query_size", typename,
+            order=order, limit=limit, offset=offset, filters=filters
         )
 
-    def get(self, identifier):
+    def query_serialized(self, typename,
+        *, order=None, limit=None, offset=None, filters=None, fields=None
+        ):
         """
         """
-        typename, resource_id = identifier
-        session = self.session(typename)
-        return session.get(identifier)
+        db = self.db.get_db(typename)
+        return self._call(
+            db, "query_serialized", typename, order=order, limit=limit,
+            offset=offset, filters=filters, fields=fields
+        )
 
-    def get_many(self, identifiers):
+    def aggregate(self, typename, aggregates, *, group=None, filters=None):
         """
-        :seealso: :meth:`Session.get_many`
         """
-        result = dict()
+        db = self.db.get_db(typename)
+        return self._call(
+            db, "aggregate", typename, aggregates, group=group, filters=filters
+        )
 
-        # Group the resources by the typenames
+    def count_relatives(self, typename, ids, relname):
+        """
+        The relatives are counted in the database of the resources.
+        """
+        db = self.db.get_db(typename)
+        return self._call(db, "count_relatives", typename, ids, relname)
+
+    def query_relatives(self, resource, relname,
+        *, order=None, limit=None, offset=None, filters=None
+        ):
+        """
+        The relatives are queried in the database of the *resource*.
+        """
+        db = self.db.get_db(self.api.get_typename(resource))
+        return self._call(
+            db, "query_relatives", resource, relname,
+            order=order, limit=limit, offset=offset, filters=filters
+        )
+
+    def query_relatives_size(self, resource, relname, *, filters=None):
+        """
+        """
+        db = self.db.get_db(self.api.get_typename(resource))
+        return self._call(
+            db, "query_relatives_size", resource, relname, filters=filters
+        )
+
+    def get(self, identifier, required=False):
+        """
+        """
+        typename, resource_id = identifier
+        db = self.db.get_db(typename)
+        return self._call(db, "get", identifier, required)
+
+    def get_many(self, identifiers, required=False):
+        """
+        Loads all resources with one :meth:`get_many` call per database
+        adapter. The database adapters are queried concurrently.
+
+        :seealso: :meth:`jsonapi.base.database.Session.get_many`
+        """
         group_key = lambda identifier: identifier[0]
-        for typename, identifiers in groupby(identifiers, group_key):
-            # We need to *list()* the identifiers, because groupby() allows
-            # us to only iterate once over them.
-            identifiers = list(identifiers)
-            session = self.session(typename)
-            resources = session.get_many(identifiers)
+        buckets = self._group_by_db(identifiers, group_key)
+
+        calls = [
+            (db, "get_many", (identifiers, required))\
+            for db, identifiers in buckets.items()
+        ]
+
+        result = dict()
+        for resources in self._fan_out(calls):
             result.update(resources)
         return result
 
     def save(self, resources):
         """
         """
-        for typename, resources in groupby(resources, self.api.get_typename):
-            # We need to *list()* the resources, because groupby() allows
-            # us to only iterate once over them.
-            resources = list(resources)
-            session = self.session(typename)
-            session.save(resources)
+        buckets = self._group_by_db(resources, self.api.get_typename)
+        for db, resources in buckets.items():
+            self._call(db, "save", resources)
         return None
 
     def delete(self, resources):
         """
         """
-        for typename, resources in groupby(resources, self.api.get_typename):
-            # We need to *list()* the resources, because groupby() allows
-            # us to only iterate once over them.
-            resources = list(resources)
-            session = self.session(typename)
-            session.delete(resources)
+        buckets = self._group_by_db(resources, self.api.get_typename)
+        for db, resources in buckets.items():
+            self._call(db, "delete", resources)
         return None
 
+    def delete_where(self, typename, *, filters=None, ids=None):
+        """
+        """
+        db = self.db.get_db(typename)
+        return self._call(
+            db, "delete_where", typename, filters=filters, ids=ids
+        )
+
     def commit(self):
         """
+        Commits the sessions of all database adapters one after another in
+        the order, in which the adapters have been added to the
+        :attr:`bulk database <db>`. If a commit fails, the following sessions
+        are not committed.
+        """
+        dbs = OrderedDict.fromkeys(self.db._dbs.values())
+        for db in dbs:
+            if db in self._sessions:
+                self._call(db, "commit")
+        return None
+
+    def rollback(self):
+        """
+        Rolls back the sessions of all database adapters concurrently.
         """
-        for session in self._sessions.values():
-            session.commit()
+        calls = [(db, "rollback", tuple()) for db in self._sessions]
+        self._fan_out(calls)
         return None
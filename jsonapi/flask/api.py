@@ -28,6 +28,7 @@ jsonapi.flask.api
 """
 
 # std
+import functools
 import logging
 
 # third party
@@ -57,7 +58,13 @@ def get_request():
 
     method = flask.request.method
     headers = dict(flask.request.headers)
-    body = flask.request.get_data()
+
+    # Newline delimited JSON (an import) is read incrementally from the
+    # input stream.
+    if flask.request.mimetype == "application/x-ndjson":
+        body = iter(functools.partial(flask.request.stream.read, 2**16), b"")
+    else:
+        body = flask.request.get_data()
     return jsonapi.base.Request(uri, method, headers, body)
 
 
@@ -67,6 +74,9 @@ def to_response(japi_response):
     """
     if japi_response.is_file:
         flask_response = flask.send_file(japi_response.file)
+    elif japi_response.is_stream:
+        # Werkzeug sends each chunk returned by the generator to the client.
+        flask_response = flask.Response(japi_response.chunks)
     elif japi_response.has_body:
         flask_response = flask.Response(japi_response.body)
     else:
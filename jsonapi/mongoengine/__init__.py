@@ -35,11 +35,26 @@ Using mongoengine models with *py-jsonapi* is quite straightforward:
 .. literalinclude:: ../../examples/mongoengine/example.py
     :linenos:
 
+Raw documents
+~~~~~~~~~~~~~
+
+If the API setting ``mongoengine_raw_documents`` is true, collection
+requests without included resources load only the requested fields with
+``as_pymongo()``. The JSONapi resource objects are created directly from the
+raw documents with the :class:`~jsonapi.mongoengine.serializer.RawSerializer`
+and the references are read as ids, so neither documents nor relatives are
+loaded:
+
+.. code-block:: python3
+
+    api.settings["mongoengine_raw_documents"] = True
+
 API
 ---
 
 .. autoclass:: jsonapi.mongoengine.schema.Schema
 .. autoclass:: jsonapi.mongoengine.database.Database
+.. autoclass:: jsonapi.mongoengine.serializer.RawSerializer
 """
 
 # local
@@ -30,15 +30,19 @@ The database adapter for mongoengine documents.
 """
 
 # std
-from itertools import groupby
+from collections import defaultdict, OrderedDict
 
 # third party
 import mongoengine
+import pymongo
 from bson.objectid import ObjectId
+from bson.son import SON
 
 # local
 import jsonapi
+from jsonapi.base.utilities import relative_identifiers, aggregate_result
 from . import schema
+from .serializer import RawSerializer
 
 
 __all__ = [
@@ -47,6 +51,10 @@ __all__ = [
 ]
 
 
+# The prefix of the fields, which contain the results of a ``$lookup`` stage.
+LOOKUP_PREFIX = "__jsonapi_"
+
+
 class Database(jsonapi.base.database.Database):
     """
     This adapter must be chosen for mongoengine models. We assume that the
@@ -64,99 +72,372 @@ class Session(jsonapi.base.database.Session):
     Loads mongoengine documents from the database.
     """
 
+    def __init__(self, api):
+        super().__init__(api)
+
+        # We cache the saved and deleted documents. The changes are sent to
+        # the database, when *commit()* is called. The keys are the *id()*
+        # of the documents, so that the order of the calls is kept.
+        self._saved_resources = OrderedDict()
+        self._deleted_resources = OrderedDict()
+        return None
+
     def _build_filter_criterion(self, schema_, filters):
         """
         Builds a dictionary, which can be used inside a document's *objects()*
         method to filter the resources by the *japi_filters* dictionary.
 
+        A filter on a relationship compares the ids of the relatives, which
+        are stored in the document, so no relative is loaded.
+
         :arg jsonapi.mongoengine.schema.Schema schema_:
         :arg filters:
         """
         d = dict()
         for fieldname, filtername, value in filters:
 
-            # We only allow filtering for mongoengine attributes.
             attribute = schema_.attributes.get(fieldname)
-            if not isinstance(attribute, schema.Attribute):
-                raise errors.UnfilterableField(filtername, fieldname)
+            relationship = schema_.relationships.get(fieldname)
+
+            # We allow filtering for mongoengine attributes and the ids of
+            # the relatives in simple references.
+            if isinstance(attribute, schema.Attribute):
+                key = attribute.name
+            elif self._include_field(relationship) is not None \
+                and filtername in ("eq", "ne", "in", "nin", "exists"):
+                key = relationship.name
+                value = self._to_object_ids(fieldname, filtername, value)
+            else:
+                raise jsonapi.base.errors.UnfilterableField(
+                    schema_.typename, filtername, fieldname
+                )
 
             if filtername == "eq":
-                d[attribute.name] = value
+                d[key] = value
             elif filtername == "ne":
-                d[attribute.name + "__ne"] = value
+                d[key + "__ne"] = value
             elif filtername == "lt":
-                d[attribute.name + "__lt"] = value
+                d[key + "__lt"] = value
             elif filtername == "lte":
-                d[attribute.name + "__lte"] = value
+                d[key + "__lte"] = value
             elif filtername == "gt":
-                d[attribute.name + "__gt"] = value
+                d[key + "__gt"] = value
             elif filtername == "gte":
-                d[attribute.name + "__gte"] = value
+                d[key + "__gte"] = value
             elif filtername == "in":
-                d[attribute.name + "__in"] = value
+                d[key + "__in"] = value
             elif filtername == "nin":
-                d[attribute.name + "__nin"] = value
+                d[key + "__nin"] = value
             elif filtername == "all":
-                d[attribute.name + "__all"] = value
+                d[key + "__all"] = value
             elif filtername == "size":
-                d[attribute.name + "__size"] = value
+                d[key + "__size"] = value
             elif filtername == "exists":
-                d[attribute.name + "__exists"] = value
+                d[key + "__exists"] = value
             elif filtername == "iexact":
-                d[attribute.name + "__iexact"] = value
+                d[key + "__iexact"] = value
             elif filtername == "contains":
-                d[attribute.name + "__contains"] = value
+                d[key + "__contains"] = value
             elif filtername == "icontains":
-                d[attribute.name + "__icontains"] = value
+                d[key + "__icontains"] = value
             elif filtername == "startswith":
-                d[attribute.name + "__startswith"] = value
+                d[key + "__startswith"] = value
             elif filtername == "istartswith":
-                d[attribute.name + "__istartswith"] = value
+                d[key + "__istartswith"] = value
             elif filtername == "endswith":
-                d[attribute.name + "__endswith"] = value
+                d[key + "__endswith"] = value
             elif filtername == "iendswith":
-                d[attribute.name + "__iendswith"] = value
+                d[key + "__iendswith"] = value
             elif filtername == "match":
-                d[attribute.name + "__match"] = value
+                d[key + "__match"] = value
             else:
-                raise errors.UnfilterableField(filtername, fieldname)
+                raise jsonapi.base.errors.UnfilterableField(
+                    schema_.typename, filtername, fieldname
+                )
         return d
 
-    def _build_order_criterion(self, schema_, order):
+    def _to_object_ids(self, fieldname, filtername, value):
+        """
+        Converts the ids in the *value* of a relationship filter to
+        ObjectIds.
+
+        :raises jsonapi.base.errors.BadRequest:
+            If an id is not a valid ObjectId.
+        """
+        if filtername == "exists":
+            return value
+
+        ids = value if filtername in ("in", "nin") else [value]
+        if not isinstance(ids, list) \
+            or not all(ObjectId.is_valid(id_) for id_ in ids):
+            raise jsonapi.base.errors.BadRequest(
+                detail="The value of the filter must contain valid ids.",
+                source_parameter="filter[{}]".format(fieldname)
+            )
+
+        ids = [ObjectId(id_) for id_ in ids]
+        return ids if filtername in ("in", "nin") else ids[0]
+
+    def _is_path_filter(self, filters):
+        """
+        Returns True, if the *filters* contain a filter on a dotted field
+        path like ``author.name``, which can not be applied with a queryset.
+        """
+        return any(
+            "." in fieldname for fieldname, filtername, value in filters or ()
+        )
+
+    def _build_path_filter_stages(self, schema_, filters):
+        """
+        Returns the aggregation stages, which apply the *filters* on dotted
+        field paths (e.g. ``author.name``), and the names of the temporary
+        fields added by these stages.
+
+        Each relationship on a path is joined once with a ``$lookup`` on the
+        ``_id`` index of the related collection. The filter is applied with
+        an ``$elemMatch`` on the joined relatives, so a document matches, if
+        at least one of its relatives matches. The relatives are joined in
+        the database and never transferred.
+
+        :raises UnfilterableField:
+            If a relationship on the path can not be joined.
+        """
+        stages = list()
+        aliases = list()
+        for fieldname, filtername, value in filters:
+            if filtername == "search":
+                raise jsonapi.base.errors.UnfilterableField(
+                    schema_.typename, filtername, fieldname
+                )
+
+            path = fieldname.split(".")
+
+            # Join the relatives on the path.
+            current_schema = schema_
+            prefix = ""
+            for i, relname in enumerate(path[:-1]):
+                relationship = current_schema.relationships.get(relname)
+                include_field = self._include_field(relationship)
+                if include_field is None:
+                    raise jsonapi.base.errors.UnfilterableField(
+                        schema_.typename, filtername, fieldname
+                    )
+
+                db_field, typename = include_field
+                alias = LOOKUP_PREFIX + "filter__" + "__".join(path[:i + 1])
+                if not alias in aliases:
+                    resource_class = self.api.get_resource_class(typename)
+                    stages.append({
+                        "$lookup": {
+                            "from": resource_class._get_collection_name(),
+                            "localField": prefix + db_field,
+                            "foreignField": "_id",
+                            "as": alias
+                        }
+                    })
+                    aliases.append(alias)
+
+                prefix = alias + "."
+                current_schema = self.api.get_schema(typename)
+
+            query = self._build_query(
+                current_schema.typename, filters=[(path[-1], filtername, value)]
+            )
+            stages.append({"$match": {alias: {"$elemMatch": query._query}}})
+        return (stages, aliases)
+
+    def _split_search_filter(self, schema_, filters):
+        """
+        Removes the *search* filter from the *filters* and returns the
+        searched text (or None) and the remaining filters.
+
+        A search uses the ``$text`` operator, which searches all fields in
+        the text index of the collection. So the filtered attribute must be
+        part of a text index declared in the document's *meta*, e.g.
+        ``meta = {"indexes": ["$title"]}``.
+
+        :raises UnfilterableField:
+            If the attribute is not in a text index or the query contains
+            more than one *search* filter.
+        """
+        text_fields = set()
+        for index_spec in schema_.resource_class._meta.get("index_specs", ()):
+            text_fields.update(
+                name for name, kind in index_spec["fields"] \
+                if kind == pymongo.TEXT
+            )
+
+        text = None
+        remaining = list()
+        for fieldname, filtername, value in filters:
+            if filtername != "search":
+                remaining.append((fieldname, filtername, value))
+                continue
+
+            attribute = schema_.attributes.get(fieldname)
+            if not isinstance(attribute, schema.Attribute) \
+                or not attribute.me_field.db_field in text_fields \
+                or text is not None:
+                raise jsonapi.base.errors.UnfilterableField(
+                    schema_.typename, filtername, fieldname
+                )
+            text = value
+        return (text, remaining)
+
+    def _has_search_filter(self, filters):
+        """
+        Returns True, if the *filters* contain a *search* filter.
+        """
+        return any(
+            filtername == "search" for fieldname, filtername, value \
+            in filters or ()
+        )
+
+    def _build_order_criterion(self, schema_, order, filters=None):
         """
         Converts the *order* list into a representation, which can be used with
         mongoengine's queryset *order_by()* method.
 
+        The key :data:`~jsonapi.base.database.RELEVANCE` sorts by the text
+        score of the *search* filter in *filters*.
+
         :arg jsonapi.mongoengine.schema.Schema schema_:
         :arg order:
+        :arg filters:
         """
         criterion = list()
         for direction, fieldname in order:
+            if fieldname == jsonapi.base.database.RELEVANCE \
+                and not fieldname in schema_.attributes:
+                if not self._has_search_filter(filters):
+                    raise jsonapi.base.errors.UnsortableField(
+                        schema_.typename, fieldname
+                    )
+                criterion.append("$text_score")
+                continue
 
             # We only support sorting for attributes at the moment.
             attribute = schema_.attributes.get(fieldname)
             if not isinstance(attribute, schema.Attribute):
-                raise errors.UnsortableField(schema_.typename, fieldname)
+                raise jsonapi.base.errors.UnsortableField(
+                    schema_.typename, fieldname
+                )
 
             criterion.append(direction + attribute.name)
         return criterion
 
+    def _is_path_order(self, order):
+        """
+        Returns True, if the *order* contains a dotted field path like
+        ``author.name``, which can not be sorted with a queryset.
+        """
+        return any("." in fieldname for direction, fieldname in order or ())
+
+    def _build_sort_stages(self, schema_, order, filters=None):
+        """
+        Returns the aggregation stages, which sort the documents by the
+        *order*, and the names of the temporary fields added by these
+        stages.
+
+        A dotted field path like ``author.name`` sorts by a field of the
+        related document. Each *to-one* relationship on the path is joined
+        once with a ``$lookup`` on the ``_id`` index of the related
+        collection.
+
+        :raises UnsortableField:
+        """
+        stages = list()
+        aliases = list()
+        sort = SON()
+        for direction, fieldname in order:
+            if fieldname == jsonapi.base.database.RELEVANCE \
+                and not fieldname in schema_.attributes:
+                if not self._has_search_filter(filters):
+                    raise jsonapi.base.errors.UnsortableField(
+                        schema_.typename, fieldname
+                    )
+                sort["_text_score"] = {"$meta": "textScore"}
+                continue
+
+            path = fieldname.split(".")
+
+            # Join the relatives on the path.
+            current_schema = schema_
+            prefix = ""
+            for i, relname in enumerate(path[:-1]):
+                relationship = current_schema.relationships.get(relname)
+
+                # Sorting by a *to-many* relationship is ambiguous.
+                include_field = None
+                if isinstance(relationship, schema.ToOneRelationship):
+                    include_field = self._include_field(relationship)
+                if include_field is None:
+                    raise jsonapi.base.errors.UnsortableField(
+                        schema_.typename, fieldname
+                    )
+
+                db_field, typename = include_field
+                alias = LOOKUP_PREFIX + "__".join(path[:i + 1])
+                if not alias in aliases:
+                    resource_class = self.api.get_resource_class(typename)
+                    stages.append({
+                        "$lookup": {
+                            "from": resource_class._get_collection_name(),
+                            "localField": prefix + db_field,
+                            "foreignField": "_id",
+                            "as": alias
+                        }
+                    })
+                    stages.append({
+                        "$unwind": {
+                            "path": "$" + alias,
+                            "preserveNullAndEmptyArrays": True
+                        }
+                    })
+                    aliases.append(alias)
+
+                prefix = alias + "."
+                current_schema = self.api.get_schema(typename)
+
+            attribute = current_schema.attributes.get(path[-1])
+            if not isinstance(attribute, schema.Attribute):
+                raise jsonapi.base.errors.UnsortableField(
+                    schema_.typename, fieldname
+                )
+
+            key = prefix + attribute.me_field.db_field
+            sort[key] = pymongo.ASCENDING if direction == "+" \
+                else pymongo.DESCENDING
+
+        stages.append({"$sort": sort})
+        return (stages, aliases)
+
     def _build_query(self, typename,
-        *, order=None, limit=None, offset=None, filters=None
+        *, order=None, limit=None, offset=None, filters=None, ids=None
         ):
         """
+        :arg list ids:
+            If given, only the documents with these ids are queried.
         """
         resource_class = self.api.get_resource_class(typename)
         schema_ = self.api.get_schema(typename)
 
         if filters:
-            filters = self._build_filter_criterion(schema_, filters)
-            query = resource_class.objects(**filters)
+            text, criterion = self._split_search_filter(schema_, filters)
+            criterion = self._build_filter_criterion(schema_, criterion)
+            query = resource_class.objects(**criterion)
+            if text is not None:
+                query = query.search_text(text)
         else:
             query = resource_class.objects()
 
+        if ids is not None:
+            # An invalid id can not match any document.
+            ids = [ObjectId(id_) for id_ in ids if ObjectId.is_valid(id_)]
+            query = query.filter(id__in=ids)
+
         if order:
-            order = self._build_order_criterion(schema_, order)
+            order = self._build_order_criterion(schema_, order, filters)
             query = query.order_by(*order)
 
         if offset:
@@ -166,26 +447,370 @@ class Session(jsonapi.base.database.Session):
             query = query.limit(limit)
         return query
 
+    def _build_pipeline(self, typename,
+        *, order=None, limit=None, offset=None, filters=None, ids=None
+        ):
+        """
+        Returns the aggregation pipeline, which queries the documents.
+
+        The filters on the fields of the document are applied first in a
+        ``$match`` stage, so that the indexes of the collection are used.
+        Only the matching documents are joined with their relatives then,
+        to apply the filters on dotted field paths and to sort them by
+        dotted field paths.
+        """
+        schema_ = self.api.get_schema(typename)
+        filters = filters or list()
+        path_filters = [item for item in filters if "." in item[0]]
+        filters = [item for item in filters if not "." in item[0]]
+
+        query = self._build_query(typename, filters=filters, ids=ids)
+        pipeline = [{"$match": query._query}]
+
+        if path_filters:
+            filter_stages, aliases = self._build_path_filter_stages(
+                schema_, path_filters
+            )
+            pipeline.extend(filter_stages)
+            pipeline.append({"$project": {alias: 0 for alias in aliases}})
+
+        aliases = list()
+        if order:
+            sort_stages, aliases = self._build_sort_stages(
+                schema_, order, filters
+            )
+            pipeline.extend(sort_stages)
+        if offset:
+            pipeline.append({"$skip": offset})
+        if limit:
+            pipeline.append({"$limit": limit})
+        if aliases:
+            pipeline.append({"$project": {alias: 0 for alias in aliases}})
+        return pipeline
+
+    def _query_documents(self, typename,
+        *, order=None, limit=None, offset=None, filters=None, ids=None,
+        batch_size=None
+        ):
+        """
+        Returns an iterable over the documents, which match the query.
+
+        If the *order* or the *filters* contain a dotted field path, the
+        documents are queried with the pipeline returned by
+        :meth:`_build_pipeline`.
+        """
+        if not self._is_path_order(order) \
+            and not self._is_path_filter(filters):
+            query = self._build_query(
+                typename, order=order, limit=limit, offset=offset,
+                filters=filters, ids=ids
+            )
+            if batch_size:
+                query = query.batch_size(batch_size)
+            return query
+
+        resource_class = self.api.get_resource_class(typename)
+        pipeline = self._build_pipeline(
+            typename, order=order, limit=limit, offset=offset,
+            filters=filters, ids=ids
+        )
+
+        kargs = {"batchSize": batch_size} if batch_size else dict()
+        cursor = resource_class._get_collection().aggregate(
+            pipeline, allowDiskUse=True, **kargs
+        )
+        return (resource_class._from_son(document) for document in cursor)
+
+    def _count_documents(self, typename, *, filters=None, ids=None):
+        """
+        Returns the number of documents, which match the *filters* and
+        *ids*. Filters on dotted field paths are counted with an aggregation
+        pipeline.
+        """
+        if not self._is_path_filter(filters):
+            query = self._build_query(typename, filters=filters, ids=ids)
+            return query.count()
+
+        resource_class = self.api.get_resource_class(typename)
+        pipeline = self._build_pipeline(typename, filters=filters, ids=ids)
+        pipeline.append({"$count": "count"})
+
+        documents = list(resource_class._get_collection().aggregate(pipeline))
+        return documents[0]["count"] if documents else 0
+
     def query(self, typename,
         *, order=None, limit=None, offset=None, filters=None
         ):
         """
         """
-        query = self._build_query(
+        resources = self._query_documents(
             typename, order=order, limit=limit, offset=offset, filters=filters
         )
-        resources = list(query)
-        return resources
+        return list(resources)
+
+    def query_iter(self, typename,
+        *, order=None, limit=None, offset=None, filters=None, batch_size=1000
+        ):
+        """
+        Iterates over the mongodb cursor, which loads *batch_size* documents
+        per round trip.
+        """
+        resources = self._query_documents(
+            typename, order=order, limit=limit, offset=offset,
+            filters=filters, batch_size=batch_size
+        )
+        return iter(resources)
 
     def query_size(self, typename,
         *, order=None, limit=None, offset=None, filters=None
         ):
         """
         """
-        query = self._build_query(
-            typename, order=order, limit=limit, offset=offset, filters=filters
+        return self._count_documents(typename, filters=filters)
+
+    def query_serialized(self, typename,
+        *, order=None, limit=None, offset=None, filters=None, fields=None
+        ):
+        """
+        If the API setting ``mongoengine_raw_documents`` is true, only the
+        requested fields are loaded with ``as_pymongo()`` and the resource
+        objects are created from the raw documents with a
+        :class:`~jsonapi.mongoengine.serializer.RawSerializer`. The
+        mongoengine documents are only created, if the raw serializer can not
+        handle the fields.
+        """
+        fields = fields or dict()
+        if self.api.settings.get("mongoengine_raw_documents", False) \
+            and not self._is_path_order(order) \
+            and not self._is_path_filter(filters):
+            serializer = RawSerializer(self.api, typename)
+            names = serializer.select(fields.get(typename))
+            if names is not None:
+                query = self._build_query(
+                    typename, order=order, limit=limit, offset=offset,
+                    filters=filters
+                )
+                query = query.only(*names).as_pymongo()
+                return serializer.serialize_documents(
+                    query, fields.get(typename)
+                )
+
+        return super().query_serialized(
+            typename, order=order, limit=limit, offset=offset,
+            filters=filters, fields=fields
         )
-        return query.count()
+
+    def _relatives_ids(self, resource, relname):
+        """
+        Returns the typename and the ids of the relatives of the *resource*
+        in the relationship *relname*. The ids of the relatives are read
+        from the *resource* without dereferencing them, so that only the
+        requested relatives are loaded.
+
+        Returns None, if the references are generic and the type of the
+        relatives is not known.
+        """
+        schema_ = self.api.get_schema(self.api.get_typename(resource))
+        relationship = schema_.relationships[relname]
+
+        field = relationship.me_field.field
+        document_type = getattr(field, "document_type", None)
+        if document_type is None:
+            return None
+
+        # The references are DBRefs, ObjectIds or (already loaded) documents.
+        relative_ids = [
+            getattr(reference, "id", reference)\
+            for reference in relationship.get(resource) or list()
+        ]
+
+        return (self.api.get_typename(document_type), relative_ids)
+
+    def _query_ids(self, typename, *, filters=None, ids=None):
+        """
+        Returns the set with the ids of the documents, which match the
+        *filters* and *ids*. Only the ids are loaded.
+        """
+        if not self._is_path_filter(filters):
+            query = self._build_query(typename, filters=filters, ids=ids)
+            return set(query.scalar("id"))
+
+        resource_class = self.api.get_resource_class(typename)
+        pipeline = self._build_pipeline(typename, filters=filters, ids=ids)
+        pipeline.append({"$project": {"_id": 1}})
+
+        documents = resource_class._get_collection().aggregate(pipeline)
+        return set(document["_id"] for document in documents)
+
+    def query_relatives(self, resource, relname,
+        *, order=None, limit=None, offset=None, filters=None
+        ):
+        """
+        Without an *order*, the relatives are returned in the order of the
+        references, so that the pages match the linkage of the relationship.
+        Only the ids of the relatives, which match the *filters*, are
+        queried then and the page is cut out of the references, so that
+        only the relatives on the page are loaded.
+        """
+        relatives_ids = self._relatives_ids(resource, relname)
+        if relatives_ids is None:
+            return super().query_relatives(
+                resource, relname,
+                order=order, limit=limit, offset=offset, filters=filters
+            )
+
+        typename, ids = relatives_ids
+        if order:
+            relatives = self._query_documents(
+                typename, order=order, limit=limit, offset=offset,
+                filters=filters, ids=ids
+            )
+            return list(relatives)
+
+        if filters:
+            matching = self._query_ids(typename, filters=filters, ids=ids)
+            ids = [id_ for id_ in ids if id_ in matching]
+
+        offset = offset or 0
+        ids = ids[offset:offset + limit] if limit else ids[offset:]
+
+        resource_class = self.api.get_resource_class(typename)
+        relatives = resource_class.objects.in_bulk(ids)
+        return [relatives[id_] for id_ in ids if id_ in relatives]
+
+    def query_relatives_size(self, resource, relname, *, filters=None):
+        """
+        """
+        relatives_ids = self._relatives_ids(resource, relname)
+        if relatives_ids is None:
+            return super().query_relatives_size(
+                resource, relname, filters=filters
+            )
+
+        typename, ids = relatives_ids
+        return self._count_documents(typename, filters=filters, ids=ids)
+
+    def _build_group_stage(self, schema_, aggregates, group):
+        """
+        Returns the ``$group`` stage, which computes the *aggregates* grouped
+        by the fields in *group*. The values of the grouped fields are
+        stored in ``_id.g<index>``, the aggregated values in ``a<index>``.
+
+        :raises UnaggregatableField:
+        """
+        group_id = SON()
+        for i, fieldname in enumerate(group):
+            attribute = schema_.attributes.get(fieldname)
+            relationship = schema_.relationships.get(fieldname)
+
+            # A *to-one* relationship is grouped by the stored ObjectId.
+            if isinstance(attribute, schema.Attribute):
+                db_field = attribute.me_field.db_field
+            elif isinstance(relationship, schema.ToOneRelationship) \
+                and self._include_field(relationship) is not None:
+                db_field = self._include_field(relationship)[0]
+            else:
+                raise jsonapi.base.errors.UnaggregatableField(
+                    schema_.typename, "group", fieldname
+                )
+            group_id["g{}".format(i)] = "$" + db_field
+
+        stage = SON([("_id", group_id or None)])
+        for i, (function, fieldname) in enumerate(aggregates):
+            key = "a{}".format(i)
+            if function == "count" and fieldname == "*":
+                stage[key] = {"$sum": 1}
+                continue
+
+            attribute = schema_.attributes.get(fieldname)
+            if not isinstance(attribute, schema.Attribute) \
+                or not function in ("count", "sum", "avg", "min", "max"):
+                raise jsonapi.base.errors.UnaggregatableField(
+                    schema_.typename, function, fieldname
+                )
+
+            field = "$" + attribute.me_field.db_field
+            if function == "count":
+                is_null = {"$eq": [{"$ifNull": [field, None]}, None]}
+                stage[key] = {"$sum": {"$cond": [is_null, 0, 1]}}
+            else:
+                stage[key] = {"$" + function: field}
+        return {"$group": stage}
+
+    def _load_group_results(self, aggregates, group, documents):
+        """
+        Converts the *documents* returned by the ``$group`` stage into
+        aggregate results.
+
+        :seealso: :func:`jsonapi.base.utilities.aggregate_result`
+        """
+        results = list()
+        for document in documents:
+            group_id = document["_id"] or dict()
+            group_values = list()
+            for i, fieldname in enumerate(group):
+                value = group_id.get("g{}".format(i))
+                if isinstance(value, ObjectId):
+                    value = str(value)
+                group_values.append(value)
+
+            values = [
+                document.get("a{}".format(i)) for i in range(len(aggregates))
+            ]
+            results.append(
+                aggregate_result(group, group_values, aggregates, values)
+            )
+
+        # ``$group`` returns no document for an empty collection, but
+        # without grouping, there is always exactly one result.
+        if not group and not results:
+            values = [
+                0 if function == "count" else None \
+                for function, fieldname in aggregates
+            ]
+            results.append(aggregate_result(group, [], aggregates, values))
+        return results
+
+    def count_relatives(self, typename, ids, relname):
+        """
+        Counts the references stored in the documents with ``$size``, so
+        neither the relatives nor the lists of references are transferred.
+        """
+        schema_ = self.api.get_schema(typename)
+        relationship = schema_.relationships[relname]
+        if type(relationship) is not schema.ToManyRelationship:
+            return super().count_relatives(typename, ids, relname)
+
+        field = "$" + relationship.me_field.db_field
+        pipeline = [
+            {"$match": {"_id": {"$in": [ObjectId(id_) for id_ in ids]}}},
+            {"$project": {"count": {"$size": {"$ifNull": [field, []]}}}}
+        ]
+
+        resource_class = self.api.get_resource_class(typename)
+        documents = resource_class._get_collection().aggregate(pipeline)
+        return {
+            str(document["_id"]): document["count"] for document in documents
+        }
+
+    def aggregate(self, typename, aggregates, *, group=None, filters=None):
+        """
+        Computes the aggregates with a ``$match`` and a ``$group`` stage, so
+        only the aggregated values are transferred.
+        """
+        resource_class = self.api.get_resource_class(typename)
+        schema_ = self.api.get_schema(typename)
+        group = group or list()
+
+        group_stage = self._build_group_stage(schema_, aggregates, group)
+        pipeline = self._build_pipeline(typename, filters=filters)
+        pipeline.append(group_stage)
+        pipeline.append({"$sort": {"_id": pymongo.ASCENDING}})
+
+        documents = resource_class._get_collection().aggregate(
+            pipeline, allowDiskUse=True
+        )
+        return self._load_group_results(aggregates, group, documents)
 
     def get(self, identifier, required=False):
         """
@@ -202,11 +827,15 @@ class Session(jsonapi.base.database.Session):
         """
         results = dict()
 
-        # Group the identifiers by the typenames.
-        group_key = lambda identifier: identifier[0]
-        for typename, identifiers in groupby(identifiers, group_key):
+        # Group the identifiers by the typenames. The identifiers are not
+        # sorted, so we must bucket them ourselves to make sure, that only
+        # one query per type is sent to the database.
+        resource_ids_by_type = defaultdict(set)
+        for typename, resource_id in identifiers:
+            resource_ids_by_type[typename].add(resource_id)
+
+        for typename, resource_ids in resource_ids_by_type.items():
             resource_class = self.api.get_resource_class(typename)
-            schema_ = self.api.get_schema(typename)
 
             # Extract the resource ids, fetch the resources and add them
             # to the result.
@@ -215,14 +844,21 @@ class Session(jsonapi.base.database.Session):
             #
             #   mongoengine requires an explicit ObjectId object here.
             #   Remove the conversion, when it is no longer needed.
-            resource_ids = [ObjectId(e[1]) for e in identifiers]
+            #
+            # An invalid id can not match any document.
+            not_found = set(
+                id_ for id_ in resource_ids if not ObjectId.is_valid(id_)
+            )
+            resource_ids = [
+                ObjectId(id_) for id_ in resource_ids if not id_ in not_found
+            ]
             resources = resource_class.objects().in_bulk(resource_ids)
 
             # Break, if a resource does not exist.
-            not_found = resources.keys() - resource_ids
+            not_found.update(set(resource_ids) - resources.keys())
             if required and not_found:
                 raise jsonapi.base.errors.ResourceNotFound(
-                    identifier=(typename, not_found.pop())
+                    identifier=(typename, str(not_found.pop()))
                 )
 
             results.update({
@@ -231,37 +867,282 @@ class Session(jsonapi.base.database.Session):
             })
         return results
 
-    def save(self, resources):
+    def _include_field(self, relationship):
+        """
+        Returns the name of the database field, which contains the ObjectIds
+        of the relatives, and the typename of the relatives or None, if the
+        *relationship* can not be resolved with a ``$lookup`` stage.
         """
-        .. todo::
+        if type(relationship) not in (
+            schema.ToOneRelationship, schema.ToManyRelationship
+            ):
+            return None
 
-            Don't save the resources instantly. Wait until :meth:`commit`
-            is called.
+        field = relationship.me_field
+        if relationship.to_many:
+            field = field.field
 
-        .. todo::
+        # Generic references and DBRefs can not be looked up and the
+        # relatives of a document, which allows inheritance, may have other
+        # typenames.
+        if type(field) is not mongoengine.ReferenceField or field.dbref:
+            return None
+        if field.document_type._meta.get("allow_inheritance"):
+            return None
 
-            Is there something like *bulk_save()* ?
+        typename = self.api.get_typename(field.document_type, None)
+        if typename is None:
+            return None
+        return (relationship.me_field.db_field, typename)
+
+    def _build_include_tree(self, typename, paths):
         """
-        for resource in resources:
-            resource.save()
+        Merges the include *paths*, which start on the type *typename*, into
+        a tree. Each node maps a relationship name to the tuple
+        ``(db_field, typename, subtree)``.
+
+        Returns None, if a relationship can not be resolved with a
+        ``$lookup`` stage.
+
+        :raises UnresolvableIncludePath:
+        """
+        tree = dict()
+        for path in paths:
+            node_typename = typename
+            node = tree
+            for relname in path:
+                schema_ = self.api.get_schema(node_typename)
+                relationship = schema_.relationships.get(relname)
+                if relationship is None:
+                    raise jsonapi.base.errors.UnresolvableIncludePath(path)
+
+                if not relname in node:
+                    include_field = self._include_field(relationship)
+                    if include_field is None:
+                        return None
+                    node[relname] = include_field + (dict(),)
+
+                db_field, node_typename, node = node[relname]
+        return tree
+
+    def _build_lookup_stages(self, tree):
+        """
+        Returns the ``$lookup`` stages, which add the relatives in the *tree*
+        to the documents of an aggregation pipeline.
+        """
+        stages = list()
+        for relname, (db_field, typename, subtree) in tree.items():
+            resource_class = self.api.get_resource_class(typename)
+
+            # The equality match on *_id* uses the index of the relatives.
+            # *db_field* contains a single ObjectId or a list of ObjectIds.
+            lookup = {
+                "from": resource_class._get_collection_name(),
+                "localField": db_field,
+                "foreignField": "_id",
+                "as": LOOKUP_PREFIX + relname
+            }
+
+            # The nested lookups run on the matched relatives
+            # (concise correlated subquery, MongoDB 5.0+).
+            if subtree:
+                lookup["pipeline"] = self._build_lookup_stages(subtree)
+            stages.append({"$lookup": lookup})
+        return stages
+
+    def _check_lookup(self, typename, ids, documents):
+        """
+        Raises :exc:`~jsonapi.base.errors.ResourceNotFound`, if a document
+        with one of the *ids* is not in *documents*.
+        """
+        found = set(document["_id"] for document in documents)
+        for id_ in ids:
+            if id_ is not None and not id_ in found:
+                raise jsonapi.base.errors.ResourceNotFound((typename, str(id_)))
         return None
 
-    def delete(self, resources):
+    def _load_lookup_results(self, typename, tree, documents, relatives):
         """
-        .. todo::
+        Creates the mongoengine documents from the raw *documents* returned
+        by the aggregation pipeline and adds them and their relatives in the
+        *tree* to the *relatives* dictionary.
+        """
+        resource_class = self.api.get_resource_class(typename)
+        for document in documents:
+            for relname, (db_field, typename_, subtree) in tree.items():
+                children = document.pop(LOOKUP_PREFIX + relname)
 
-            Don't save the resources instantly. Wait until :meth:`commit`
-            is called.
+                ids = document.get(db_field)
+                ids = ids if isinstance(ids, list) else [ids]
+                self._check_lookup(typename_, ids, children)
 
-        .. todo::
+                self._load_lookup_results(
+                    typename_, subtree, children, relatives
+                )
 
-            Is there something like *bulk_delete()* ?
+            # A relative may be returned once per document referencing it.
+            # It is converted only once.
+            identifier = (typename, str(document["_id"]))
+            if not identifier in relatives:
+                relatives[identifier] = resource_class._from_son(document)
+        return None
+
+    def get_relatives(self, resources, paths):
+        """
+        Resolves the include *paths* with aggregation pipelines. The
+        relatives in a relationship of the *resources* and all relatives on
+        the paths, which start with this relationship, are loaded with a
+        single pipeline of nested ``$lookup`` stages. So an include costs one
+        round trip, independent of its depth.
+
+        The stages join the relatives with *localField* and *foreignField*
+        on their *_id*, so that the index is used. Nested stages (include
+        paths with more than one relationship) require MongoDB 5.0.
+
+        The default implementation is used, if the *resources* have different
+        types or a relationship on the paths is not a simple reference
+        field (e.g. a generic reference).
+        """
+        resources = list(resources)
+        typenames = set(
+            self.api.get_typename(resource) for resource in resources
+        )
+        if len(typenames) != 1:
+            return super().get_relatives(resources, paths)
+
+        tree = self._build_include_tree(typenames.pop(), paths)
+        if tree is None:
+            return super().get_relatives(resources, paths)
+
+        relatives = dict()
+        for relname, (db_field, typename, subtree) in tree.items():
+            ids = set()
+            for resource in resources:
+                ids.update(
+                    ObjectId(id_) for typename_, id_ in \
+                    relative_identifiers(relname, resource)
+                )
+            if not ids:
+                continue
+
+            pipeline = [{"$match": {"_id": {"$in": list(ids)}}}]
+            pipeline.extend(self._build_lookup_stages(subtree))
+
+            resource_class = self.api.get_resource_class(typename)
+            documents = list(resource_class._get_collection().aggregate(
+                pipeline
+            ))
+
+            self._check_lookup(typename, ids, documents)
+            self._load_lookup_results(typename, subtree, documents, relatives)
+        return relatives
+
+    def save(self, resources):
+        """
+        The documents are not saved instantly, but when :meth:`commit` is
+        called. New documents get their id at once, so that they can be
+        referenced by other documents in the same session.
         """
         for resource in resources:
-            resource.delete()
+            if resource.pk is None and self._has_object_id(resource):
+                resource.pk = ObjectId()
+
+            # A document, which is saved again, is moved to the end, so that
+            # it is written after the new documents it may reference.
+            self._saved_resources.pop(id(resource), None)
+            self._saved_resources[id(resource)] = resource
+            self._deleted_resources.pop(id(resource), None)
         return None
 
+    def _has_object_id(self, resource):
+        """
+        Returns True, if the primary key of the *resource* is an
+        :class:`~mongoengine.fields.ObjectIdField`.
+        """
+        id_field = resource._fields[resource._meta["id_field"]]
+        return isinstance(id_field, mongoengine.fields.ObjectIdField)
+
+    def delete(self, resources):
+        """
+        The documents are not deleted instantly, but when :meth:`commit` is
+        called.
+        """
+        for resource in resources:
+            self._saved_resources.pop(id(resource), None)
+
+            # A new document has never been written.
+            if not resource._created:
+                self._deleted_resources[id(resource)] = resource
+        return None
+
+    def delete_where(self, typename, *, filters=None, ids=None):
+        """
+        Deletes the documents with :meth:`mongoengine.queryset.QuerySet.delete`
+        without loading them.
+
+        The ``reverse_delete_rule`` of the reference fields, which point to
+        the documents, are applied in the same way as by
+        :meth:`mongoengine.Document.delete`: The referencing documents are
+        deleted (*CASCADE*), the references are removed (*NULLIFY*, *PULL*)
+        or the documents are not deleted at all (*DENY*).
+
+        :raises jsonapi.base.errors.Conflict:
+            If a *DENY* rule prevents the delete.
+        """
+        # The ids of the documents, which match the filters on dotted field
+        # paths, are queried first with a pipeline, which only returns
+        # the ids.
+        if self._is_path_filter(filters):
+            resource_class = self.api.get_resource_class(typename)
+            pipeline = self._build_pipeline(typename, filters=filters, ids=ids)
+            pipeline.append({"$project": {"_id": 1}})
+
+            documents = resource_class._get_collection().aggregate(pipeline)
+            ids = [document["_id"] for document in documents]
+            filters = None
+
+        query = self._build_query(typename, filters=filters, ids=ids)
+        try:
+            return query.delete()
+        except mongoengine.errors.OperationError as err:
+            raise jsonapi.base.errors.Conflict(detail=str(err))
+
     def commit(self):
         """
+        Writes the cached changes to the database. All documents are
+        validated, before the first one is written, so that an invalid
+        document does not leave the changes half done.
+
+        MongoDB has no transactions (without a replica set). If the database
+        rejects a write, e.g. because of a unique index or a *DENY* delete
+        rule, the previous writes are not undone.
+
+        :raises jsonapi.base.errors.Conflict:
+            If a *DENY* rule prevents a delete.
+
+        .. todo:: Use bulk writes.
+        """
+        saved = list(self._saved_resources.values())
+        deleted = list(self._deleted_resources.values())
+        self.rollback()
+
+        for resource in saved:
+            resource.validate()
+
+        for resource in saved:
+            resource.save(validate=False)
+
+        try:
+            for resource in deleted:
+                resource.delete()
+        except mongoengine.errors.OperationError as err:
+            raise jsonapi.base.errors.Conflict(detail=str(err))
+        return None
+
+    def rollback(self):
+        """
+        Forgets the documents, which are not yet saved or deleted.
         """
+        self._saved_resources.clear()
+        self._deleted_resources.clear()
         return None
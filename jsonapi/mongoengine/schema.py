@@ -37,6 +37,7 @@ import mongoengine
 
 # local
 import jsonapi
+from jsonapi.base.utilities import ensure_identifier
 
 
 LOG = logging.getLogger(__file__)
@@ -45,6 +46,7 @@ LOG = logging.getLogger(__file__)
 __all__ = [
     "is_to_one_relationship",
     "is_to_many_relationship",
+    "reference_identifier",
     "Attribute",
     "IDAttribute",
     "ToOneRelationship",
@@ -89,6 +91,39 @@ def is_to_many_relationship(field):
     return False
 
 
+def reference_identifier(field, reference):
+    """
+    Returns the identifier tuple ``(typename, id)`` for the *reference*
+    without dereferencing it or None, if the type of the referenced document
+    can not be determined without loading it.
+
+    :arg field:
+        The reference field
+    :arg reference:
+        The raw value of the field, as it is stored in the ``_data``
+        dictionary of a document: A document, a DBRef, an ObjectId or a
+        dictionary with the keys *_cls* and *_ref* for generic references.
+    """
+    if isinstance(reference, mongoengine.Document):
+        return ensure_identifier(reference)
+
+    if isinstance(reference, dict):
+        document_type = mongoengine.base.get_document(reference["_cls"])
+        reference = reference["_ref"]
+    else:
+        document_type = getattr(field, "document_type", None)
+
+    # The referenced document may be an instance of a subclass with an other
+    # typename.
+    if document_type is None \
+        or document_type._meta.get("allow_inheritance") \
+        or not hasattr(document_type, "_jsonapi"):
+        return None
+
+    typename = document_type._jsonapi["typename"]
+    return (typename, str(getattr(reference, "id", reference)))
+
+
 class Attribute(jsonapi.base.schema.Attribute):
     """
     Wraps any *mongoengine.BaseField* instance, which does not represent a
@@ -166,6 +201,22 @@ class ToOneRelationship(jsonapi.base.schema.ToOneRelationship):
         with mongoengine.context_managers.no_dereference(self.resource_class):
             return self.me_field.__get__(resource, None)
 
+    def get_identifier(self, resource):
+        """
+        Reads the reference from the ``_data`` dictionary of the *resource*,
+        so that the relative is not loaded.
+        """
+        reference = resource._data.get(self.name)
+        if reference is None:
+            return None
+
+        # The relative must be loaded to find its typename.
+        identifier = reference_identifier(self.me_field, reference)
+        if identifier is None:
+            relative = self.me_field.__get__(resource, None)
+            return ensure_identifier(relative) if relative else None
+        return identifier
+
     def set(self, resource, relative):
         return self.me_field.__set__(resource, relative)
 
@@ -196,6 +247,22 @@ class ToManyRelationship(jsonapi.base.schema.ToManyRelationship):
         with mongoengine.context_managers.no_dereference(self.resource_class):
             return self.me_field.__get__(resource, None)
 
+    def get_identifiers(self, resource):
+        """
+        Reads the references from the ``_data`` dictionary of the
+        *resource*, so that the relatives are not loaded.
+        """
+        identifiers = list()
+        for reference in resource._data.get(self.name) or list():
+            identifier = reference_identifier(self.me_field.field, reference)
+
+            # The relatives must be loaded to find their typenames.
+            if identifier is None:
+                relatives = self.me_field.__get__(resource, None)
+                return [ensure_identifier(relative) for relative in relatives]
+            identifiers.append(identifier)
+        return identifiers
+
     def set(self, resource, relatives):
         return self.me_field.__set__(resource, relatives)
 
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2016 Benedikt Schmitt
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""
+jsonapi.mongoengine.serializer
+==============================
+
+Creates the JSONapi resource objects directly from the raw documents
+returned by pymongo, without creating the mongoengine documents.
+"""
+
+# std
+from collections import OrderedDict
+import logging
+
+# third party
+import mongoengine
+
+# local
+import jsonapi
+from . import schema
+
+
+__all__ = [
+    "RawSerializer"
+]
+
+
+LOG = logging.getLogger(__file__)
+
+
+class RawSerializer(object):
+    """
+    Creates the JSONapi resource objects from the raw documents (dicts) of
+    a query, which loads only the fields returned by :meth:`select`. The
+    references are read as ObjectIds, so no relative is dereferenced.
+
+    This is only possible, if the result is equal to the one of the
+    :class:`~jsonapi.base.serializer.Serializer`. Attributes and
+    relationships defined with a marker, generic or cached references and
+    documents, which allow inheritance, need the mongoengine document. In
+    this case, :meth:`select` returns None.
+
+    :arg jsonapi.base.api.API api:
+    :arg str typename:
+    """
+
+    def __init__(self, api, typename):
+        """
+        """
+        self.api = api
+        self.typename = typename
+        self.schema = api.get_schema(typename)
+        self.resource_class = api.get_resource_class(typename)
+        return None
+
+    def _fieldnames(self, fields=None):
+        """
+        Returns the names of the attributes and relationships, which are
+        included in the resource objects.
+        """
+        attributes = [
+            name for name in sorted(self.schema.attributes)\
+            if fields is None or name in fields
+        ]
+        relationships = [
+            name for name in sorted(self.schema.relationships)\
+            if fields is None or name in fields
+        ]
+        return (attributes, relationships)
+
+    def _relative_typename(self, relationship):
+        """
+        Returns the typename of the relatives in the *relationship* or None,
+        if the identifiers of the relatives can not be created from the
+        references.
+        """
+        field = relationship.me_field
+        if relationship.to_many:
+            field = field.field
+
+        if type(field) is not mongoengine.ReferenceField:
+            return None
+
+        # The referenced document may be an instance of a subclass with an
+        # other typename.
+        if field.document_type._meta.get("allow_inheritance"):
+            return None
+
+        typename = self.api.get_typename(field.document_type, None)
+        if typename is None:
+            return None
+
+        id_attribute = self.api.get_schema(typename).id_attribute
+        if type(id_attribute) is not schema.IDAttribute:
+            return None
+        return typename
+
+    def select(self, fields=None):
+        """
+        Returns the list with the names of the mongoengine fields, which
+        must be loaded to create the resource objects, or None, if the
+        resource objects can not be created from the raw documents.
+
+        :arg list fields:
+            A list with the names of the fields, which should be included.
+        """
+        serializer = self.api.get_serializer(self.typename)
+        if type(serializer) is not jsonapi.base.serializer.Serializer:
+            return None
+
+        if self.resource_class._meta.get("allow_inheritance"):
+            return None
+        if type(self.schema.id_attribute) is not schema.IDAttribute:
+            return None
+
+        names = [self.schema.id_attribute.name]
+        attributes, relationships = self._fieldnames(fields)
+        for name in attributes:
+            if type(self.schema.attributes[name]) is not schema.Attribute:
+                return None
+            names.append(name)
+
+        for name in relationships:
+            rel = self.schema.relationships[name]
+            if type(rel) not in (
+                schema.ToOneRelationship, schema.ToManyRelationship
+                ):
+                return None
+            if self._relative_typename(rel) is None:
+                return None
+            names.append(name)
+        return names
+
+    def _attribute_value(self, document, attribute):
+        """
+        Returns the value of the *attribute* like mongoengine would, when it
+        loads the *document*.
+        """
+        field = attribute.me_field
+        if not field.db_field in document:
+            return field.default() if callable(field.default) \
+                else field.default
+
+        value = document[field.db_field]
+        if value is not None:
+            value = field.to_python(value)
+        return value
+
+    def _identifier_object(self, typename, reference):
+        """
+        Returns the identifier object for the *reference*, which is an
+        ObjectId or a DBRef.
+        """
+        return OrderedDict([
+            ("type", typename),
+            ("id", str(getattr(reference, "id", reference)))
+        ])
+
+    def serialize_documents(self, documents, fields=None):
+        """
+        Creates the resource objects from the raw *documents*.
+
+        :arg documents:
+            An iterable of dictionaries, as returned by pymongo
+        :arg list fields:
+            A list with the names of the fields, which should be included.
+        """
+        attributes, relationships = self._fieldnames(fields)
+        attributes = [self.schema.attributes[name] for name in attributes]
+        relationships = [
+            (
+                self.schema.relationships[name],
+                self._relative_typename(self.schema.relationships[name])
+            )
+            for name in relationships
+        ]
+
+        data = list()
+        for document in documents:
+            d = OrderedDict()
+            d["type"] = self.typename
+            d["id"] = str(document["_id"])
+
+            if attributes:
+                d["attributes"] = OrderedDict(
+                    (attr.name, self._attribute_value(document, attr))\
+                    for attr in attributes
+                )
+
+            if relationships:
+                d["relationships"] = OrderedDict()
+                for rel, typename in relationships:
+                    value = document.get(rel.me_field.db_field)
+
+                    relationship = OrderedDict()
+                    if rel.to_many:
+                        relationship["data"] = [
+                            self._identifier_object(typename, reference)\
+                            for reference in value or list()
+                        ]
+                    elif value is None:
+                        relationship["data"] = None
+                    else:
+                        relationship["data"] = self._identifier_object(
+                            typename, value
+                        )
+                    d["relationships"][rel.name] = relationship
+            data.append(d)
+        return data
@@ -37,9 +37,12 @@ from itertools import groupby
 import motorengine
 from tornado.platform.asyncio import to_asyncio_future
 from bson.objectid import ObjectId
+from bson.son import SON
 
 # local
 import jsonapi
+from jsonapi.base.utilities import ensure_identifier, relative_identifiers
+from jsonapi.base.utilities import aggregate_result
 from . import schema
 
 
@@ -49,6 +52,10 @@ __all__ = [
 ]
 
 
+# The prefix of the fields, which contain the results of a ``$lookup`` stage.
+LOOKUP_PREFIX = "__jsonapi_"
+
+
 class Database(jsonapi.base.database.Database):
     """
     This adapter must be chosen for motorengine models. We assume that the
@@ -81,63 +88,203 @@ class Session(jsonapi.asyncio.database.Session):
     def _add_filter_criterions(self, query, schema_, filters):
         """
         Adds the filter criterions to the *query*.
+
+        A filter on a relationship compares the ids of the relatives, which
+        are stored in the document, so no relative is loaded.
         """
         d = dict()
         for fieldname, filtername, value in filters:
 
-            # We only allow filtering for motorengine attributes.
             attribute = schema_.attributes.get(fieldname)
-            if not isinstance(attribute, schema.Attribute):
-                raise errors.UnfilterableField(
+            relationship = schema_.relationships.get(fieldname)
+
+            # We allow filtering for motorengine attributes and the ids of
+            # the relatives.
+            if isinstance(attribute, schema.Attribute):
+                key = attribute.name
+            elif self._include_field(relationship) is not None \
+                and filtername in ("eq", "ne", "in", "nin", "exists"):
+                key = relationship.name
+                value = self._to_object_ids(fieldname, filtername, value)
+            else:
+                raise jsonapi.base.errors.UnfilterableField(
                     schema_.typename, filtername, fieldname
                 )
 
             if filtername == "eq":
-                d[attribute.name] = value
+                d[key] = value
             elif filtername == "ne":
-                d[attribute.name + "__ne"] = value
+                d[key + "__ne"] = value
             elif filtername == "lt":
-                d[attribute.name + "__lt"] = value
+                d[key + "__lt"] = value
             elif filtername == "lte":
-                d[attribute.name + "__lte"] = value
+                d[key + "__lte"] = value
             elif filtername == "gt":
-                d[attribute.name + "__gt"] = value
+                d[key + "__gt"] = value
             elif filtername == "gte":
-                d[attribute.name + "__gte"] = value
+                d[key + "__gte"] = value
             elif filtername == "in":
-                d[attribute.name + "__in"] = value
+                d[key + "__in"] = value
             elif filtername == "nin":
-                d[attribute.name + "__nin"] = value
+                d[key + "__nin"] = value
             elif filtername == "all":
-                d[attribute.name + "__all"] = value
+                d[key + "__all"] = value
             elif filtername == "size":
-                d[attribute.name + "__size"] = value
+                d[key + "__size"] = value
             elif filtername == "exists":
-                d[attribute.name + "__exists"] = value
+                d[key + "__exists"] = value
             elif filtername == "iexact":
-                d[attribute.name + "__iexact"] = value
+                d[key + "__iexact"] = value
             elif filtername == "contains":
-                d[attribute.name + "__contains"] = value
+                d[key + "__contains"] = value
             elif filtername == "icontains":
-                d[attribute.name + "__icontains"] = value
+                d[key + "__icontains"] = value
             elif filtername == "startswith":
-                d[attribute.name + "__startswith"] = value
+                d[key + "__startswith"] = value
             elif filtername == "istartswith":
-                d[attribute.name + "__istartswith"] = value
+                d[key + "__istartswith"] = value
             elif filtername == "endswith":
-                d[attribute.name + "__endswith"] = value
+                d[key + "__endswith"] = value
             elif filtername == "iendswith":
-                d[attribute.name + "__iendswith"] = value
+                d[key + "__iendswith"] = value
             elif filtername == "match":
-                d[attribute.name + "__match"] = value
+                d[key + "__match"] = value
             else:
-                raise errors.UnfilterableField(
+                raise jsonapi.base.errors.UnfilterableField(
                     schema_.typename, filtername, fieldname
                 )
 
         query = query.filter(**d)
         return query
 
+    def _to_object_ids(self, fieldname, filtername, value):
+        """
+        Converts the ids in the *value* of a relationship filter to
+        ObjectIds.
+
+        :raises jsonapi.base.errors.BadRequest:
+            If an id is not a valid ObjectId.
+        """
+        if filtername == "exists":
+            return value
+
+        ids = value if filtername in ("in", "nin") else [value]
+        if not isinstance(ids, list) \
+            or not all(ObjectId.is_valid(id_) for id_ in ids):
+            raise jsonapi.base.errors.BadRequest(
+                detail="The value of the filter must contain valid ids.",
+                source_parameter="filter[{}]".format(fieldname)
+            )
+
+        ids = [ObjectId(id_) for id_ in ids]
+        return ids if filtername in ("in", "nin") else ids[0]
+
+    def _split_search_filter(self, schema_, filters):
+        """
+        Removes the *search* filter from the *filters* and returns the
+        searched text (or None) and the remaining filters.
+
+        A search uses the ``$text`` operator, which searches all fields in
+        the text index of the collection. motorengine can not declare text
+        indexes, so the index must be created on the collection directly.
+
+        :raises UnfilterableField:
+            If the field is not an attribute or the query contains more than
+            one *search* filter.
+        """
+        text = None
+        remaining = list()
+        for fieldname, filtername, value in filters or list():
+            if filtername != "search":
+                remaining.append((fieldname, filtername, value))
+                continue
+
+            attribute = schema_.attributes.get(fieldname)
+            if not isinstance(attribute, schema.Attribute) \
+                or text is not None:
+                raise jsonapi.base.errors.UnfilterableField(
+                    schema_.typename, filtername, fieldname
+                )
+            text = value
+        return (text, remaining)
+
+    def _has_search_filter(self, filters):
+        """
+        Returns True, if the *filters* contain a *search* filter.
+        """
+        return any(
+            filtername == "search" for fieldname, filtername, value \
+            in filters or ()
+        )
+
+    def _is_path_filter(self, filters):
+        """
+        Returns True, if the *filters* contain a filter on a dotted field
+        path like ``author.name``, which can not be applied with a query.
+        """
+        return any(
+            "." in fieldname for fieldname, filtername, value in filters or ()
+        )
+
+    def _build_path_filter_stages(self, schema_, filters):
+        """
+        Returns the aggregation stages, which apply the *filters* on dotted
+        field paths (e.g. ``author.name``), and the names of the temporary
+        fields added by these stages.
+
+        Each relationship on a path is joined once with a ``$lookup`` on the
+        ``_id`` index of the related collection. The filter is applied with
+        an ``$elemMatch`` on the joined relatives, so a document matches, if
+        at least one of its relatives matches.
+
+        :raises UnfilterableField:
+            If a relationship on the path can not be joined.
+        """
+        stages = list()
+        aliases = list()
+        for fieldname, filtername, value in filters:
+            if filtername == "search":
+                raise jsonapi.base.errors.UnfilterableField(
+                    schema_.typename, filtername, fieldname
+                )
+
+            path = fieldname.split(".")
+
+            # Join the relatives on the path.
+            current_schema = schema_
+            prefix = ""
+            for i, relname in enumerate(path[:-1]):
+                relationship = current_schema.relationships.get(relname)
+                include_field = self._include_field(relationship)
+                if include_field is None:
+                    raise jsonapi.base.errors.UnfilterableField(
+                        schema_.typename, filtername, fieldname
+                    )
+
+                db_field, typename = include_field
+                alias = LOOKUP_PREFIX + "filter__" + "__".join(path[:i + 1])
+                if not alias in aliases:
+                    resource_class = self.api.get_resource_class(typename)
+                    stages.append({
+                        "$lookup": {
+                            "from": resource_class.__collection__,
+                            "localField": prefix + db_field,
+                            "foreignField": "_id",
+                            "as": alias
+                        }
+                    })
+                    aliases.append(alias)
+
+                prefix = alias + "."
+                current_schema = self.api.get_schema(typename)
+
+            query = self._build_query(
+                current_schema.typename, filters=[(path[-1], filtername, value)]
+            )
+            match = query.get_query_from_filters(query._filters)
+            stages.append({"$match": {alias: {"$elemMatch": match}}})
+        return (stages, aliases)
+
     def _add_order_criterion(self, query, schema_, order):
         """
         Adds the order criterions to the motorengine *query*.
@@ -146,7 +293,9 @@ class Session(jsonapi.asyncio.database.Session):
             # We only support sorting for attributes at the moment.
             attribute = schema_.attributes.get(fieldname)
             if not isinstance(attribute, schema.Attribute):
-                raise errors.UnsortableField(schema_.typename, fieldname)
+                raise jsonapi.base.errors.UnsortableField(
+                    schema_.typename, fieldname
+                )
 
             if direction == "+":
                 query.order_by(attribute.name, motorengine.ASCENDING)
@@ -154,16 +303,108 @@ class Session(jsonapi.asyncio.database.Session):
                 query.order_by(attribute.name, motorengine.DESCENDING)
         return query
 
+    def _is_path_order(self, order):
+        """
+        Returns True, if the *order* contains a dotted field path like
+        ``author.name``, which can not be sorted with a queryset.
+        """
+        return any("." in fieldname for direction, fieldname in order or ())
+
+    def _build_sort_stages(self, schema_, order, filters=None):
+        """
+        Returns the aggregation stages, which sort the documents by the
+        *order*, and the names of the temporary fields added by these
+        stages.
+
+        A dotted field path like ``author.name`` sorts by a field of the
+        related document. Each *to-one* relationship on the path is joined
+        once with a ``$lookup`` on the ``_id`` index of the related
+        collection.
+
+        :raises UnsortableField:
+        """
+        stages = list()
+        aliases = list()
+        sort = SON()
+        for direction, fieldname in order:
+            if fieldname == jsonapi.base.database.RELEVANCE \
+                and not fieldname in schema_.attributes:
+                if not self._has_search_filter(filters):
+                    raise jsonapi.base.errors.UnsortableField(
+                        schema_.typename, fieldname
+                    )
+                sort["_text_score"] = {"$meta": "textScore"}
+                continue
+
+            path = fieldname.split(".")
+
+            # Join the relatives on the path.
+            current_schema = schema_
+            prefix = ""
+            for i, relname in enumerate(path[:-1]):
+                relationship = current_schema.relationships.get(relname)
+
+                # Sorting by a *to-many* relationship is ambiguous.
+                include_field = None
+                if isinstance(relationship, schema.ToOneRelationship):
+                    include_field = self._include_field(relationship)
+                if include_field is None:
+                    raise jsonapi.base.errors.UnsortableField(
+                        schema_.typename, fieldname
+                    )
+
+                db_field, typename = include_field
+                alias = LOOKUP_PREFIX + "__".join(path[:i + 1])
+                if not alias in aliases:
+                    resource_class = self.api.get_resource_class(typename)
+                    stages.append({
+                        "$lookup": {
+                            "from": resource_class.__collection__,
+                            "localField": prefix + db_field,
+                            "foreignField": "_id",
+                            "as": alias
+                        }
+                    })
+                    stages.append({
+                        "$unwind": {
+                            "path": "$" + alias,
+                            "preserveNullAndEmptyArrays": True
+                        }
+                    })
+                    aliases.append(alias)
+
+                prefix = alias + "."
+                current_schema = self.api.get_schema(typename)
+
+            attribute = current_schema.attributes.get(path[-1])
+            if not isinstance(attribute, schema.Attribute):
+                raise jsonapi.base.errors.UnsortableField(
+                    schema_.typename, fieldname
+                )
+
+            key = prefix + attribute.me_field.db_field
+            sort[key] = motorengine.ASCENDING if direction == "+" \
+                else motorengine.DESCENDING
+
+        stages.append({"$sort": sort})
+        return (stages, aliases)
+
     def _build_query(self, typename,
-        *, order=None, limit=None, offset=None, filters=None
+        *, order=None, limit=None, offset=None, filters=None, ids=None
         ):
         """
+        :arg list ids:
+            If given, only the documents with these ids are queried.
         """
         resource_class = self.api.get_resource_class(typename)
         schema_ = self.api.get_schema(typename)
         query = resource_class.objects
         if filters:
             query = self._add_filter_criterions(query, schema_, filters)
+        if ids is not None:
+            # An invalid id can not match any document.
+            ids = [ObjectId(id_) for id_ in ids if ObjectId.is_valid(id_)]
+            query = query.filter(_id__in=ids)
         if order:
             query = self._add_order_criterion(query, schema_, order)
         if offset:
@@ -172,25 +413,310 @@ class Session(jsonapi.asyncio.database.Session):
             query = query.limit(limit)
         return query
 
+    def _build_match(self, typename, filters, ids):
+        """
+        Returns the ``$match`` stage for the *filters* and *ids*. Other than
+        a motorengine query, the stage supports the *search* filter.
+        """
+        schema_ = self.api.get_schema(typename)
+        text, filters = self._split_search_filter(schema_, filters)
+
+        query = self._build_query(typename, filters=filters, ids=ids)
+        match = query.get_query_from_filters(query._filters)
+        if text is not None:
+            match["$text"] = {"$search": text}
+        return {"$match": match}
+
+    def _build_pipeline(self, typename,
+        *, order=None, limit=None, offset=None, filters=None, ids=None
+        ):
+        """
+        Returns the aggregation pipeline, which queries the documents.
+
+        The filters on the fields of the document are applied first in a
+        ``$match`` stage, so that the indexes of the collection are used.
+        Only the matching documents are joined with their relatives then,
+        to apply the filters on dotted field paths and to sort them by
+        dotted field paths.
+        """
+        schema_ = self.api.get_schema(typename)
+        filters = filters or list()
+        path_filters = [item for item in filters if "." in item[0]]
+        filters = [item for item in filters if not "." in item[0]]
+
+        pipeline = [self._build_match(typename, filters, ids)]
+
+        if path_filters:
+            filter_stages, aliases = self._build_path_filter_stages(
+                schema_, path_filters
+            )
+            pipeline.extend(filter_stages)
+            pipeline.append({"$project": {alias: 0 for alias in aliases}})
+
+        aliases = list()
+        if order:
+            sort_stages, aliases = self._build_sort_stages(
+                schema_, order, filters
+            )
+            pipeline.extend(sort_stages)
+        if offset:
+            pipeline.append({"$skip": offset})
+        if limit:
+            pipeline.append({"$limit": limit})
+        if aliases:
+            pipeline.append({"$project": {alias: 0 for alias in aliases}})
+        return pipeline
+
+    def _requires_pipeline(self, order, filters):
+        """
+        Returns True, if the *order* or the *filters* can not be expressed
+        with a motorengine query.
+        """
+        return self._is_path_order(order) \
+            or self._is_path_filter(filters) \
+            or self._has_search_filter(filters)
+
+    @asyncio.coroutine
+    def _query_documents(self, typename,
+        *, order=None, limit=None, offset=None, filters=None, ids=None
+        ):
+        """
+        Returns the list with the documents, which match the query.
+
+        If the *order* or the *filters* contain a dotted field path or the
+        *filters* contain a *search* filter, the documents are queried with
+        the pipeline returned by :meth:`_build_pipeline`.
+        """
+        if not self._requires_pipeline(order, filters):
+            query = self._build_query(
+                typename, order=order, limit=limit, offset=offset,
+                filters=filters, ids=ids
+            )
+            return (yield from to_asyncio_future(query.find_all()))
+
+        resource_class = self.api.get_resource_class(typename)
+        pipeline = self._build_pipeline(
+            typename, order=order, limit=limit, offset=offset,
+            filters=filters, ids=ids
+        )
+
+        cursor = resource_class.objects.coll().aggregate(
+            pipeline, allowDiskUse=True
+        )
+        documents = yield from to_asyncio_future(cursor.to_list(None))
+        return [resource_class.from_son(document) for document in documents]
+
+    @asyncio.coroutine
+    def _count_documents(self, typename, *, filters=None, ids=None):
+        """
+        Returns the number of documents, which match the *filters* and
+        *ids*. Filters on dotted field paths and *search* filters are
+        counted with an aggregation pipeline.
+        """
+        if not self._requires_pipeline(None, filters):
+            query = self._build_query(typename, filters=filters, ids=ids)
+            return (yield from to_asyncio_future(query.count()))
+
+        resource_class = self.api.get_resource_class(typename)
+        pipeline = self._build_pipeline(typename, filters=filters, ids=ids)
+        pipeline.append({"$count": "count"})
+
+        cursor = resource_class.objects.coll().aggregate(pipeline)
+        documents = yield from to_asyncio_future(cursor.to_list(None))
+        return documents[0]["count"] if documents else 0
+
+    @asyncio.coroutine
     def query(self, typename,
         *, order=None, limit=None, offset=None, filters=None
         ):
         """
         """
-        query = self._build_query(
+        return (yield from self._query_documents(
             typename, order=order, limit=limit, offset=offset, filters=filters
-        )
-        return to_asyncio_future(query.find_all())
+        ))
 
+    @asyncio.coroutine
     def query_size(self, typename,
         *, order=None, limit=None, offset=None, filters=None
         ):
         """
         """
-        query = self._build_query(
-            typename, order=order, limit=limit, offset=offset, filters=filters
+        return (yield from self._count_documents(typename, filters=filters))
+
+    def _relatives_ids(self, resource, relname):
+        """
+        Returns the typename and the ids of the relatives of the *resource*
+        in the relationship *relname* or None, if the relationship is empty.
+        The ids of the relatives are read from the *resource*, so the
+        references do not need to be loaded.
+        """
+        schema_ = self.api.get_schema(self.api.get_typename(resource))
+        relationship = schema_.relationships[relname]
+
+        identifiers = [
+            ensure_identifier(relative)\
+            for relative in relationship.get(resource) or list()
+        ]
+        if not identifiers:
+            return None
+
+        typename = identifiers[0][0]
+        return (typename, [id_ for typename_, id_ in identifiers])
+
+    @asyncio.coroutine
+    def query_relatives(self, resource, relname,
+        *, order=None, limit=None, offset=None, filters=None
+        ):
+        """
+        """
+        relatives_ids = self._relatives_ids(resource, relname)
+        if relatives_ids is None:
+            return list()
+
+        typename, ids = relatives_ids
+        return (yield from self._query_documents(
+            typename, order=order, limit=limit, offset=offset,
+            filters=filters, ids=ids
+        ))
+
+    @asyncio.coroutine
+    def query_relatives_size(self, resource, relname, *, filters=None):
+        """
+        """
+        relatives_ids = self._relatives_ids(resource, relname)
+        if relatives_ids is None:
+            return 0
+
+        typename, ids = relatives_ids
+        return (yield from self._count_documents(
+            typename, filters=filters, ids=ids
+        ))
+
+    def _build_group_stage(self, schema_, aggregates, group):
+        """
+        Returns the ``$group`` stage, which computes the *aggregates* grouped
+        by the fields in *group*. The values of the grouped fields are
+        stored in ``_id.g<index>``, the aggregated values in ``a<index>``.
+
+        :raises UnaggregatableField:
+        """
+        group_id = SON()
+        for i, fieldname in enumerate(group):
+            attribute = schema_.attributes.get(fieldname)
+            relationship = schema_.relationships.get(fieldname)
+
+            # A *to-one* relationship is grouped by the stored ObjectId.
+            if isinstance(attribute, schema.Attribute):
+                db_field = attribute.me_field.db_field
+            elif isinstance(relationship, schema.ToOneRelationship) \
+                and self._include_field(relationship) is not None:
+                db_field = self._include_field(relationship)[0]
+            else:
+                raise jsonapi.base.errors.UnaggregatableField(
+                    schema_.typename, "group", fieldname
+                )
+            group_id["g{}".format(i)] = "$" + db_field
+
+        stage = SON([("_id", group_id or None)])
+        for i, (function, fieldname) in enumerate(aggregates):
+            key = "a{}".format(i)
+            if function == "count" and fieldname == "*":
+                stage[key] = {"$sum": 1}
+                continue
+
+            attribute = schema_.attributes.get(fieldname)
+            if not isinstance(attribute, schema.Attribute) \
+                or not function in ("count", "sum", "avg", "min", "max"):
+                raise jsonapi.base.errors.UnaggregatableField(
+                    schema_.typename, function, fieldname
+                )
+
+            field = "$" + attribute.me_field.db_field
+            if function == "count":
+                is_null = {"$eq": [{"$ifNull": [field, None]}, None]}
+                stage[key] = {"$sum": {"$cond": [is_null, 0, 1]}}
+            else:
+                stage[key] = {"$" + function: field}
+        return {"$group": stage}
+
+    def _load_group_results(self, aggregates, group, documents):
+        """
+        Converts the *documents* returned by the ``$group`` stage into
+        aggregate results.
+
+        :seealso: :func:`jsonapi.base.utilities.aggregate_result`
+        """
+        results = list()
+        for document in documents:
+            group_id = document["_id"] or dict()
+            group_values = list()
+            for i, fieldname in enumerate(group):
+                value = group_id.get("g{}".format(i))
+                if isinstance(value, ObjectId):
+                    value = str(value)
+                group_values.append(value)
+
+            values = [
+                document.get("a{}".format(i)) for i in range(len(aggregates))
+            ]
+            results.append(
+                aggregate_result(group, group_values, aggregates, values)
+            )
+
+        # ``$group`` returns no document for an empty collection, but
+        # without grouping, there is always exactly one result.
+        if not group and not results:
+            values = [
+                0 if function == "count" else None \
+                for function, fieldname in aggregates
+            ]
+            results.append(aggregate_result(group, [], aggregates, values))
+        return results
+
+    @asyncio.coroutine
+    def count_relatives(self, typename, ids, relname):
+        """
+        Counts the references stored in the documents with ``$size``, so
+        neither the relatives nor the lists of references are transferred.
+        """
+        schema_ = self.api.get_schema(typename)
+        relationship = schema_.relationships[relname]
+        if type(relationship) is not schema.ToManyRelationship:
+            return (yield from super().count_relatives(typename, ids, relname))
+
+        field = "$" + relationship.me_field.db_field
+        pipeline = [
+            {"$match": {"_id": {"$in": [ObjectId(id_) for id_ in ids]}}},
+            {"$project": {"count": {"$size": {"$ifNull": [field, []]}}}}
+        ]
+
+        resource_class = self.api.get_resource_class(typename)
+        cursor = resource_class.objects.coll().aggregate(pipeline)
+        documents = yield from to_asyncio_future(cursor.to_list(None))
+        return {
+            str(document["_id"]): document["count"] for document in documents
+        }
+
+    @asyncio.coroutine
+    def aggregate(self, typename, aggregates, *, group=None, filters=None):
+        """
+        Computes the aggregates with a ``$match`` and a ``$group`` stage, so
+        only the aggregated values are transferred.
+        """
+        resource_class = self.api.get_resource_class(typename)
+        schema_ = self.api.get_schema(typename)
+        group = group or list()
+
+        group_stage = self._build_group_stage(schema_, aggregates, group)
+        pipeline = self._build_pipeline(typename, filters=filters)
+        pipeline.append(group_stage)
+        pipeline.append({"$sort": {"_id": motorengine.ASCENDING}})
+
+        cursor = resource_class.objects.coll().aggregate(
+            pipeline, allowDiskUse=True
         )
-        return to_asyncio_future(query.count())
+        documents = yield from to_asyncio_future(cursor.to_list(None))
+        return self._load_group_results(aggregates, group, documents)
 
     @asyncio.coroutine
     def get(self, identifier, required=False):
@@ -217,6 +743,188 @@ class Session(jsonapi.asyncio.database.Session):
             resources[identifier] = resource
         return resources
 
+    @asyncio.coroutine
+    def check_existence(self, identifiers):
+        """
+        Counts the documents of each type with a single query, so that the
+        documents are not loaded. Only if a document does not exist, they are
+        loaded to find the missing one.
+        """
+        key = lambda identifier: identifier[0]
+        for typename, group in groupby(sorted(identifiers, key=key), key=key):
+            ids = set(resource_id for typename_, resource_id in group)
+
+            if all(ObjectId.is_valid(id_) for id_ in ids):
+                query = self._build_query(typename, ids=list(ids))
+                count = yield from to_asyncio_future(query.count())
+                if count == len(ids):
+                    continue
+
+            yield from super().check_existence(
+                [(typename, id_) for id_ in ids]
+            )
+        return None
+
+    def _include_field(self, relationship):
+        """
+        Returns the name of the database field, which contains the ObjectIds
+        of the relatives, and the typename of the relatives or None, if the
+        *relationship* can not be resolved with a ``$lookup`` stage.
+        """
+        if isinstance(relationship, schema.ToOneRelationship):
+            document_type = relationship.me_field.reference_type
+        elif isinstance(relationship, schema.ToManyRelationship):
+            document_type = relationship.me_field.item_type
+        else:
+            return None
+
+        typename = self.api.get_typename(document_type, None)
+        if typename is None:
+            return None
+        return (relationship.me_field.db_field, typename)
+
+    def _build_include_tree(self, typename, paths):
+        """
+        Merges the include *paths*, which start on the type *typename*, into
+        a tree. Each node maps a relationship name to the tuple
+        ``(db_field, typename, subtree)``.
+
+        Returns None, if a relationship can not be resolved with a
+        ``$lookup`` stage.
+
+        :raises UnresolvableIncludePath:
+        """
+        tree = dict()
+        for path in paths:
+            node_typename = typename
+            node = tree
+            for relname in path:
+                schema_ = self.api.get_schema(node_typename)
+                relationship = schema_.relationships.get(relname)
+                if relationship is None:
+                    raise jsonapi.base.errors.UnresolvableIncludePath(path)
+
+                if not relname in node:
+                    include_field = self._include_field(relationship)
+                    if include_field is None:
+                        return None
+                    node[relname] = include_field + (dict(),)
+
+                db_field, node_typename, node = node[relname]
+        return tree
+
+    def _build_lookup_stages(self, tree):
+        """
+        Returns the ``$lookup`` stages, which add the relatives in the *tree*
+        to the documents of an aggregation pipeline.
+        """
+        stages = list()
+        for relname, (db_field, typename, subtree) in tree.items():
+            resource_class = self.api.get_resource_class(typename)
+
+            # The equality match on *_id* uses the index of the relatives.
+            # *db_field* contains a single ObjectId or a list of ObjectIds.
+            lookup = {
+                "from": resource_class.__collection__,
+                "localField": db_field,
+                "foreignField": "_id",
+                "as": LOOKUP_PREFIX + relname
+            }
+
+            # The nested lookups run on the matched relatives
+            # (concise correlated subquery, MongoDB 5.0+).
+            if subtree:
+                lookup["pipeline"] = self._build_lookup_stages(subtree)
+            stages.append({"$lookup": lookup})
+        return stages
+
+    def _check_lookup(self, typename, ids, documents):
+        """
+        Raises :exc:`~jsonapi.base.errors.ResourceNotFound`, if a document
+        with one of the *ids* is not in *documents*.
+        """
+        found = set(document["_id"] for document in documents)
+        for id_ in ids:
+            if id_ is not None and not id_ in found:
+                raise jsonapi.base.errors.ResourceNotFound((typename, str(id_)))
+        return None
+
+    def _load_lookup_results(self, typename, tree, documents, relatives):
+        """
+        Creates the motorengine documents from the raw *documents* returned
+        by the aggregation pipeline and adds them and their relatives in the
+        *tree* to the *relatives* dictionary.
+        """
+        resource_class = self.api.get_resource_class(typename)
+        for document in documents:
+            for relname, (db_field, typename_, subtree) in tree.items():
+                children = document.pop(LOOKUP_PREFIX + relname)
+
+                ids = document.get(db_field)
+                ids = ids if isinstance(ids, list) else [ids]
+                self._check_lookup(typename_, ids, children)
+
+                self._load_lookup_results(
+                    typename_, subtree, children, relatives
+                )
+
+            # A relative may be returned once per document referencing it.
+            # It is converted only once. *from_son()* removes the *_id* from
+            # the document.
+            identifier = (typename, str(document["_id"]))
+            if not identifier in relatives:
+                relatives[identifier] = resource_class.from_son(document)
+        return None
+
+    @asyncio.coroutine
+    def get_relatives(self, resources, paths):
+        """
+        Resolves the include *paths* with aggregation pipelines. The
+        relatives in a relationship of the *resources* and all relatives on
+        the paths, which start with this relationship, are loaded with a
+        single pipeline of nested ``$lookup`` stages. So an include costs one
+        round trip, independent of its depth.
+
+        The stages join the relatives with *localField* and *foreignField*
+        on their *_id*, so that the index is used. Nested stages (include
+        paths with more than one relationship) require MongoDB 5.0.
+
+        The default implementation is used, if the *resources* have different
+        types.
+        """
+        resources = list(resources)
+        typenames = set(
+            self.api.get_typename(resource) for resource in resources
+        )
+        if len(typenames) != 1:
+            return (yield from super().get_relatives(resources, paths))
+
+        tree = self._build_include_tree(typenames.pop(), paths)
+        if tree is None:
+            return (yield from super().get_relatives(resources, paths))
+
+        relatives = dict()
+        for relname, (db_field, typename, subtree) in tree.items():
+            ids = set()
+            for resource in resources:
+                ids.update(
+                    ObjectId(id_) for typename_, id_ in \
+                    relative_identifiers(relname, resource)
+                )
+            if not ids:
+                continue
+
+            pipeline = [{"$match": {"_id": {"$in": list(ids)}}}]
+            pipeline.extend(self._build_lookup_stages(subtree))
+
+            resource_class = self.api.get_resource_class(typename)
+            cursor = resource_class.objects.coll().aggregate(pipeline)
+            documents = yield from to_asyncio_future(cursor.to_list(None))
+
+            self._check_lookup(typename, ids, documents)
+            self._load_lookup_results(typename, subtree, documents, relatives)
+        return relatives
+
     def save(self, resources):
         """
         """
@@ -245,6 +953,33 @@ class Session(jsonapi.asyncio.database.Session):
                 self._added_resources.discard(resource)
         return None
 
+    @asyncio.coroutine
+    def delete_where(self, typename, *, filters=None, ids=None):
+        """
+        Deletes the documents with a single remove command. The documents
+        are not loaded.
+
+        motorengine has no reverse delete rules, so just like
+        :meth:`motorengine.Document.delete`, the references to the deleted
+        documents are not touched. Unlike :meth:`delete`, the documents are
+        removed immediately and not when the session is committed.
+        """
+        # The ids of the documents, which match the filters on dotted field
+        # paths or the *search* filter, are queried first with a pipeline,
+        # which only returns the ids.
+        if self._requires_pipeline(None, filters):
+            resource_class = self.api.get_resource_class(typename)
+            pipeline = self._build_pipeline(typename, filters=filters, ids=ids)
+            pipeline.append({"$project": {"_id": 1}})
+
+            cursor = resource_class.objects.coll().aggregate(pipeline)
+            documents = yield from to_asyncio_future(cursor.to_list(None))
+            ids = [document["_id"] for document in documents]
+            filters = None
+
+        query = self._build_query(typename, filters=filters, ids=ids)
+        return (yield from to_asyncio_future(query.delete()))
+
     @asyncio.coroutine
     def commit(self):
         """
@@ -259,3 +994,13 @@ class Session(jsonapi.asyncio.database.Session):
         for resource in self._deleted_resources.values():
             yield from to_asyncio_future(resource.delete())
         return None
+
+    @asyncio.coroutine
+    def rollback(self):
+        """
+        Forgets the resources, which are not yet saved or deleted.
+        """
+        self._saved_resources.clear()
+        self._added_resources.clear()
+        self._deleted_resources.clear()
+        return None
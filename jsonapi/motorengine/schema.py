@@ -200,17 +200,57 @@ class ToManyRelationship(jsonapi.base.schema.ToManyRelationship):
         setattr(resource, self.name, list())
         return None
 
+    accepts_identifiers = True
+
     def extend(self, resource, relatives):
         """
-        .. todo::
+        The *relatives* may be documents or identifier tuples. For an
+        identifier, only the ObjectId is added to the list, so neither the
+        references nor the relatives need to be loaded.
+
+        :raises jsonapi.base.errors.Conflict:
+            If the type of an identifier is not the type of the references.
+        :raises jsonapi.base.errors.ResourceNotFound:
+            If the id of an identifier is not a valid ObjectId.
+        """
+        reference_typename = self.me_field.item_type._jsonapi["typename"]
+
+        references = list()
+        for relative in relatives:
+            if not isinstance(relative, tuple):
+                references.append(relative)
+            elif relative[0] != reference_typename:
+                raise jsonapi.base.errors.Conflict(
+                    detail="The relationship '{}' only contains '{}' "\
+                        "resources.".format(self.name, reference_typename)
+                )
+            elif not ObjectId.is_valid(relative[1]):
+                raise jsonapi.base.errors.ResourceNotFound(relative)
+            else:
+                references.append(ObjectId(relative[1]))
 
-            The references must be loaded for this method. We can avoid
-            loading the references, if we simply add the identifiers of
-            the *relatives* to the list. This is acceptable after checking
-            if their type is a subtype of *me_field.reference_type*, since
-            the me attribute is public anyway and has no setter.
+        getattr(resource, self.name).extend(references)
+        return None
+
+    def remove_many(self, resource, relatives):
+        """
+        Removes the *relatives*. They may be documents or the identifier
+        tuples returned by :meth:`get`, so the references do not need to be
+        loaded.
         """
-        getattr(resource, self.name).extend(relatives)
+        removed = set(
+            relative[1] if isinstance(relative, tuple) else str(relative._id)\
+            for relative in relatives
+        )
+
+        remaining = list()
+        for relative in getattr(resource, self.name):
+            relative_id = relative if isinstance(relative, ObjectId) \
+                else relative._id
+            if not str(relative_id) in removed:
+                remaining.append(relative)
+
+        setattr(resource, self.name, remaining)
         return None
 
 
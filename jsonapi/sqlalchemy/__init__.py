@@ -67,11 +67,30 @@ or you use the *settings* dictionary of the API:
 
     api.settings["sqlalchemy_sessionmaker"] = get_session
 
+Raw rows
+~~~~~~~~
+
+If the API setting ``sqlalchemy_raw_rows`` is true, collection requests
+without included resources select only the columns of the requested fields.
+The JSONapi resource objects are created directly from the rows with the
+:class:`~jsonapi.sqlalchemy.serializer.RowSerializer`, so no model instances
+are created. Models with attributes or relationships defined by a marker,
+*to-many* relationships in the requested fields or polymorphic models are
+still loaded with the ORM:
+
+.. code-block:: python3
+
+    api.settings["sqlalchemy_raw_rows"] = True
+
+    # Served from the rows.
+    GET /api/Article?fields[Article]=title,author
+
 API
 ---
 
 .. autoclass:: jsonapi.sqlalchemy.schema.Schema
 .. autoclass:: jsonapi.sqlalchemy.database.Database
+.. autoclass:: jsonapi.sqlalchemy.serializer.RowSerializer
 
 Todo
 ----
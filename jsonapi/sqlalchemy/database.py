@@ -33,9 +33,17 @@ The database adapter for *sqlalchemy*.
 from itertools import groupby
 import logging
 
+# third party
+import sqlalchemy
+import sqlalchemy.orm
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm.interfaces import ONETOMANY
+
 # local
 import jsonapi
+from jsonapi.base.utilities import aggregate_result
 from . import schema
+from .serializer import RowSerializer
 
 
 __all__ = [
@@ -96,107 +104,357 @@ class Session(jsonapi.base.database.Session):
         Builds the argument for the sqlalchemy query method
         :meth:`~sqlalchemy.orm.query.Query.filter`.
 
+        The field name of a filter may also be a relationship or a dotted
+        path through relationships (e.g. ``author.name``). A path is compiled
+        to an ``EXISTS`` subquery with :meth:`has` or :meth:`any`.
+
         .. todo::
 
             Implement the *add*, *size*, .. filters
         """
         criterions = list()
         for fieldname, filtername, value in filters:
+            criterion = self._build_path_criterion(
+                schema_, fieldname.split("."), filtername, value
+            )
+            if criterion is None:
+                raise jsonapi.base.errors.UnfilterableField(
+                    schema_.typename, filtername, fieldname
+                )
+            criterions.append(criterion)
+        return criterions
 
-            # For the moment, we only allow filterting on attributes.
-            attr = schema_.attributes.get(fieldname)
-            if not isinstance(attr, schema.Attribute):
-                raise jsonapi.base.errors.UnfilterableField(filtername, fieldname)
+    def _build_path_criterion(self, schema_, path, filtername, value):
+        """
+        Returns the criterion for the filter on the field *path* or None, if
+        the filter is not supported.
+
+        :arg list path:
+            The names of the relationships on the path, followed by the name
+            of the filtered field.
+        """
+        name = path[0]
+        attribute = schema_.attributes.get(name)
+        relationship = schema_.relationships.get(name)
+
+        if len(path) == 1 and isinstance(attribute, schema.Attribute) \
+            and filtername == "search":
+            return self._build_search_criterion(attribute, value)
+        elif len(path) == 1 and isinstance(attribute, schema.Attribute):
+            return self._build_attribute_criterion(
+                attribute.class_attr, filtername, value
+            )
+
+        if not isinstance(
+            relationship, (schema.ToOneRelationship, schema.ToManyRelationship)
+            ):
+            return None
+
+        if len(path) == 1:
+            return self._build_relationship_criterion(
+                relationship, filtername, value
+            )
+
+        # Filter the relatives.
+        relative_schema = self.api.get_schema(
+            self.api.get_typename(relationship.sqlrel.mapper.class_)
+        )
+        criterion = self._build_path_criterion(
+            relative_schema, path[1:], filtername, value
+        )
+        if criterion is None:
+            return None
+        elif relationship.to_one:
+            return relationship.class_attr.has(criterion)
+        else:
+            return relationship.class_attr.any(criterion)
+
+    def _build_relationship_criterion(self, relationship, filtername, value):
+        """
+        Returns the criterion, which compares the ids of the relatives in the
+        *relationship* with the *value*. For a *to-one* relationship, the
+        foreign key column is compared without a join.
+        """
+        sqlrel = relationship.sqlrel
+        primary_key = sqlalchemy.inspect(sqlrel.mapper).primary_key[0]
+
+        # Compare the foreign key, if it references the primary key of the
+        # relative.
+        if relationship.to_one and len(sqlrel.local_columns) == 1 \
+            and list(sqlrel.remote_side) == [primary_key]:
+            column = list(sqlrel.local_columns)[0]
 
             if filtername == "eq":
-                criterions.append(attr.class_attr == value)
+                return column == value
             elif filtername == "ne":
-                criterions.append(attr.class_attr != value)
-            elif filtername == "lt":
-                criterions.append(attr.class_attr < value)
-            elif filtername == "lte":
-                criterions.append(attr.class_attr <= value)
-            elif filtername == "gt":
-                criterions.append(attr.class_attr > value)
-            elif filtername == "gte":
-                criterions.append(attr.class_attr >= value)
+                return column != value
             elif filtername == "in":
-                criterions.append(attr.class_attr.in_(value))
+                return column.in_(value)
             elif filtername == "nin":
-                criterions.append(attr.class_attr.notin_(value))
-            elif filtername == "all":
-                # .. todo:: Implement it.
-                raise jsonapi.base.errors.UnfilterableField(filtername, fieldname)
-            elif filtername == "size":
-                # .. todo:: Implement it.
-                raise jsonapi.base.errors.UnfilterableField(filtername, fieldname)
+                return column.notin_(value)
             elif filtername == "exists":
-                criterions.append(attr.class_attr != None)
-            elif filtername == "iexact":
-                # .. todo:: Escape *value*
-                criterions.append(attr.class_attr.ilike(value))
-            elif filtername == "contains":
-                criterions.append(attr.class_attr.contains(value))
-            elif filtername == "icontains":
-                # .. todo:: Escape *value*
-                criterions.append(attr.class_attr.ilike("%" + value + "%"))
-            elif filtername == "startswith":
-                criterions.append(attr.class_attr.startswith(value))
-            elif filtername == "istartswith":
-                # .. todo:: Escape *value*
-                criterions.append(attr.class_attr.ilike(value + "%"))
-            elif filtername == "endswith":
-                criterions.append(attr.class_attr.endswith(value))
-            elif filtername == "iendswith":
-                # .. todo:: Escape *value*
-                criterions.append(attr.class_attr.ilike("%" + value))
-            elif filtername == "match":
-                # .. todo:: This only works for MYSQL
-                criterions.append(attr.class_attr.op("regexp")(value))
-            else:
-                raise jsonapi.base.errors.UnfilterableField(filtername, fieldname)
+                return column != None if value else column == None
+            return None
+
+        # Use an *EXISTS* subquery otherwise.
+        if relationship.to_one:
+            exists = relationship.class_attr.has
+        else:
+            exists = relationship.class_attr.any
+
+        if filtername == "eq":
+            return exists(primary_key == value)
+        elif filtername == "ne":
+            return ~exists(primary_key == value)
+        elif filtername == "in":
+            return exists(primary_key.in_(value))
+        elif filtername == "nin":
+            return ~exists(primary_key.in_(value))
+        elif filtername == "exists":
+            return exists() if value else ~exists()
+        return None
+
+    def _build_attribute_criterion(self, column, filtername, value):
+        """
+        Returns the criterion for the filter on the attribute *column* or
+        None, if the filter is not supported.
+        """
+        if filtername == "eq":
+            return column == value
+        elif filtername == "ne":
+            return column != value
+        elif filtername == "lt":
+            return column < value
+        elif filtername == "lte":
+            return column <= value
+        elif filtername == "gt":
+            return column > value
+        elif filtername == "gte":
+            return column >= value
+        elif filtername == "in":
+            return column.in_(value)
+        elif filtername == "nin":
+            return column.notin_(value)
+        elif filtername == "all":
+            # .. todo:: Implement it.
+            return None
+        elif filtername == "size":
+            # .. todo:: Implement it.
+            return None
+        elif filtername == "exists":
+            return column != None
+        elif filtername == "iexact":
+            # .. todo:: Escape *value*
+            return column.ilike(value)
+        elif filtername == "contains":
+            return column.contains(value)
+        elif filtername == "icontains":
+            # .. todo:: Escape *value*
+            return column.ilike("%" + value + "%")
+        elif filtername == "startswith":
+            return column.startswith(value)
+        elif filtername == "istartswith":
+            # .. todo:: Escape *value*
+            return column.ilike(value + "%")
+        elif filtername == "endswith":
+            return column.endswith(value)
+        elif filtername == "iendswith":
+            # .. todo:: Escape *value*
+            return column.ilike("%" + value)
+        elif filtername == "match":
+            # .. todo:: This only works for MYSQL
+            return column.op("regexp")(value)
+        return None
+
+    def _dialect(self, resource_class):
+        """
+        Returns the name of the database dialect used for the
+        *resource_class*.
+        """
+        bind = self.sqla_session.get_bind(mapper=resource_class)
+        return bind.dialect.name
+
+    def _build_search_criterion(self, attribute, value):
+        """
+        Returns the full text search criterion for the *attribute* or None,
+        if the attribute is not declared as searchable
+        (:attr:`~jsonapi.sqlalchemy.schema.Attribute.searchable`) or the
+        database has no full text search.
+
+        The *value* is always searched as plain text, so that the query
+        syntax of the database can not be used to produce an invalid query.
+        """
+        if not attribute.searchable or not isinstance(value, str):
+            return None
+
+        column = attribute.class_attr
+        dialect = self._dialect(attribute.resource_class)
+        if dialect == "sqlite":
+            # Quote each word as FTS5 string, so that the words are matched
+            # (implicit *AND*) and FTS5 operators in *value* are ignored.
+            query = " ".join(
+                '"' + word.replace('"', '""') + '"' for word in value.split()
+            )
+            return column.op("MATCH")(query) if query else None
+        elif dialect == "postgresql":
+            if not isinstance(column.expression.type, TSVECTOR):
+                column = sqlalchemy.func.to_tsvector(column)
+            return column.op("@@")(sqlalchemy.func.plainto_tsquery(value))
+        elif dialect == "mysql":
+            return column.match(value)
+        return None
+
+    def _build_relevance_criterion(self, schema_, filters):
+        """
+        Returns the order criterions, which sort the resources by their
+        relevance for the *search* filters on the attributes of the
+        *schema_*. The most relevant resources come first.
+
+        :raises UnsortableField:
+            If there is no *search* filter on a searchable attribute or the
+            database does not provide a relevance score.
+        """
+        dialect = self._dialect(schema_.resource_class)
+
+        criterions = list()
+        for fieldname, filtername, value in filters or list():
+            attribute = schema_.attributes.get(fieldname)
+            if filtername != "search" \
+                or not isinstance(attribute, schema.Attribute) \
+                or not attribute.searchable:
+                continue
+
+            column = attribute.class_attr
+            if dialect == "sqlite":
+                # The *rank* column of an FTS5 table is the negative bm25
+                # score.
+                table = attribute.sqlattr.columns[0].table
+                rank = sqlalchemy.literal_column(
+                    '"{}".rank'.format(table.name.replace('"', '""'))
+                )
+                criterions.append(rank.asc())
+            elif dialect == "postgresql":
+                if not isinstance(column.expression.type, TSVECTOR):
+                    column = sqlalchemy.func.to_tsvector(column)
+                rank = sqlalchemy.func.ts_rank(
+                    column, sqlalchemy.func.plainto_tsquery(value)
+                )
+                criterions.append(rank.desc())
+            elif dialect == "mysql":
+                criterions.append(column.match(value).desc())
+
+        if not criterions:
+            raise jsonapi.base.errors.UnsortableField(
+                schema_.typename, jsonapi.base.database.RELEVANCE
+            )
         return criterions
 
-    def _build_order_criterion(self, schema_, order):
+    def _build_order_criterion(self, schema_, order, filters=None):
         """
-        Builds the argument for the sqlalchemy query method
-        :meth:`~sqlalchemy.orm.query.Query.order_by`.
+        Builds the arguments for the sqlalchemy query methods
+        :meth:`~sqlalchemy.orm.query.Query.outerjoin` and
+        :meth:`~sqlalchemy.orm.query.Query.order_by` and returns them as
+        tuple ``(joins, criterions)``.
+
+        A dotted field path like ``author.name`` sorts by a column of a
+        related table. Each *to-one* relationship on the path is joined
+        once with a *LEFT OUTER JOIN*, so that the database can use the
+        indexes on the foreign key and the sorted column.
+
+        The key :data:`~jsonapi.base.database.RELEVANCE` sorts by the
+        relevance for the *search* filters in *filters*.
 
         .. todo::
 
-            Support ordering also for relationships and hybrid methods.
+            Support ordering also for hybrid methods.
         """
+        joins = list()
+        aliases = dict()
         criterions = list()
         for direction, fieldname in order:
-
-            # We only support sorting for attributes at the moment.
-            attr = schema_.attributes.get(fieldname)
+            if fieldname == jsonapi.base.database.RELEVANCE \
+                and not fieldname in schema_.attributes:
+                criterions.extend(
+                    self._build_relevance_criterion(schema_, filters)
+                )
+                continue
+
+            path = fieldname.split(".")
+
+            # Join the relatives on the path.
+            current_schema = schema_
+            alias = None
+            for i, relname in enumerate(path[:-1]):
+                relationship = current_schema.relationships.get(relname)
+
+                # Sorting by a *to-many* relationship is ambiguous.
+                if not isinstance(relationship, schema.ToOneRelationship):
+                    raise jsonapi.base.errors.UnsortableField(
+                        schema_.typename, fieldname
+                    )
+
+                key = tuple(path[:i + 1])
+                if not key in aliases:
+                    relative_class = relationship.sqlrel.mapper.class_
+                    if alias is None:
+                        onclause = relationship.class_attr
+                    else:
+                        onclause = getattr(alias, relationship.class_attr.key)
+
+                    aliases[key] = sqlalchemy.orm.aliased(relative_class)
+                    joins.append((aliases[key], onclause))
+
+                alias = aliases[key]
+                current_schema = self.api.get_schema(
+                    self.api.get_typename(relationship.sqlrel.mapper.class_)
+                )
+
+            attr = current_schema.attributes.get(path[-1])
             if not isinstance(attr, schema.Attribute):
-                raise jsonapi.base.errors.UnsortableField(schema_.typename, fieldname)
+                raise jsonapi.base.errors.UnsortableField(
+                    schema_.typename, fieldname
+                )
+
+            if alias is None:
+                column = attr.class_attr
+            else:
+                column = getattr(alias, attr.class_attr.key)
 
             if direction == "+":
-                criterions.append(attr.class_attr.asc())
+                criterions.append(column.asc())
             else:
-                criterions.append(attr.class_attr.desc())
-        return criterions
+                criterions.append(column.desc())
+        return (joins, criterions)
 
     def _build_query(self, typename,
-        *, order=None, limit=None, offset=None, filters=None
+        *, order=None, limit=None, offset=None, filters=None, parent=None
         ):
         """
         Maps the arguments to a sqlalchemy query object and returns it.
+
+        :arg tuple parent:
+            A tuple ``(resource, relationship)``. If given, only the relatives
+            of the resource in the relationship are queried.
         """
         resource_class = self.api.get_resource_class(typename)
         schema_ = self.api.get_schema(typename)
 
         query = self.sqla_session.query(resource_class)
 
+        if parent is not None:
+            resource, relationship = parent
+            query = query.with_parent(resource, relationship.class_attr)
+
         if filters:
             filter_criterion = self._build_filter_criterion(schema_, filters)
             query = query.filter(*filter_criterion)
 
         if order:
-            order_criterion = self._build_order_criterion(schema_, order)
+            joins, order_criterion = self._build_order_criterion(
+                schema_, order, filters
+            )
+            for join in joins:
+                query = query.outerjoin(*join)
             query = query.order_by(*order_criterion)
 
         if offset:
@@ -216,6 +474,20 @@ class Session(jsonapi.base.database.Session):
         )
         return list(query)
 
+    def query_iter(self, typename,
+        *, order=None, limit=None, offset=None, filters=None, batch_size=1000
+        ):
+        """
+        Loads the resources in batches of *batch_size* using a server side
+        cursor (if supported by the DBAPI).
+        """
+        query = self._build_query(
+            typename, order=order, limit=limit, offset=offset, filters=filters
+        )
+        query = query.execution_options(stream_results=True)
+        query = query.yield_per(batch_size)
+        return iter(query)
+
     def query_size(self, typename,
         *, order=None, limit=None, offset=None, filters
         ):
@@ -226,6 +498,187 @@ class Session(jsonapi.base.database.Session):
         )
         return query.count()
 
+    def query_serialized(self, typename,
+        *, order=None, limit=None, offset=None, filters=None, fields=None
+        ):
+        """
+        If the API setting ``sqlalchemy_raw_rows`` is true, only the columns
+        of the requested fields are selected and the resource objects are
+        created from the rows with a
+        :class:`~jsonapi.sqlalchemy.serializer.RowSerializer`. The resources
+        are only loaded, if the row serializer can not handle the fields.
+        """
+        fields = fields or dict()
+        if self.api.settings.get("sqlalchemy_raw_rows", False):
+            serializer = RowSerializer(self.api, typename)
+            columns = serializer.select(fields.get(typename))
+            if columns is not None:
+                query = self._build_query(
+                    typename, order=order, limit=limit, offset=offset,
+                    filters=filters
+                )
+                query = query.with_entities(*columns)
+                return serializer.serialize_rows(query, fields.get(typename))
+
+        return super().query_serialized(
+            typename, order=order, limit=limit, offset=offset,
+            filters=filters, fields=fields
+        )
+
+    def _build_group_column(self, schema_, fieldname):
+        """
+        Returns the column, which contains the values of the field
+        *fieldname* for a *GROUP BY* clause. A *to-one* relationship is
+        grouped by its foreign key column.
+
+        :raises UnaggregatableField:
+        """
+        attribute = schema_.attributes.get(fieldname)
+        relationship = schema_.relationships.get(fieldname)
+
+        if isinstance(attribute, schema.Attribute):
+            return attribute.class_attr
+
+        if isinstance(relationship, schema.ToOneRelationship):
+            sqlrel = relationship.sqlrel
+            primary_key = sqlalchemy.inspect(sqlrel.mapper).primary_key[0]
+            if len(sqlrel.local_columns) == 1 \
+                and list(sqlrel.remote_side) == [primary_key]:
+                return list(sqlrel.local_columns)[0]
+
+        raise jsonapi.base.errors.UnaggregatableField(
+            schema_.typename, "group", fieldname
+        )
+
+    def _build_aggregate_column(self, schema_, function, fieldname):
+        """
+        Returns the SQL aggregate function, which computes the aggregate
+        *function* over the field *fieldname*.
+
+        :raises UnaggregatableField:
+        """
+        if function == "count" and fieldname == "*":
+            return sqlalchemy.func.count()
+
+        attribute = schema_.attributes.get(fieldname)
+        if not isinstance(attribute, schema.Attribute):
+            raise jsonapi.base.errors.UnaggregatableField(
+                schema_.typename, function, fieldname
+            )
+
+        column = attribute.class_attr
+        if function == "count":
+            return sqlalchemy.func.count(column)
+        elif function == "sum":
+            return sqlalchemy.func.sum(column)
+        elif function == "avg":
+            return sqlalchemy.func.avg(column)
+        elif function == "min":
+            return sqlalchemy.func.min(column)
+        elif function == "max":
+            return sqlalchemy.func.max(column)
+        raise jsonapi.base.errors.UnaggregatableField(
+            schema_.typename, function, fieldname
+        )
+
+    def aggregate(self, typename, aggregates, *, group=None, filters=None):
+        """
+        Computes the aggregates with a single *GROUP BY* query, so only the
+        aggregated values are transferred.
+        """
+        schema_ = self.api.get_schema(typename)
+        group = group or list()
+
+        group_columns = [
+            self._build_group_column(schema_, fieldname) for fieldname in group
+        ]
+        aggregate_columns = [
+            self._build_aggregate_column(schema_, function, fieldname)\
+            for function, fieldname in aggregates
+        ]
+
+        query = self._build_query(typename, filters=filters)
+        query = query.with_entities(*(group_columns + aggregate_columns))
+        if group_columns:
+            query = query.group_by(*group_columns).order_by(*group_columns)
+
+        # The ids of the relatives are strings in the API.
+        is_relationship = [
+            fieldname in schema_.relationships for fieldname in group
+        ]
+
+        results = list()
+        for row in query:
+            group_values = [
+                str(value) if relationship and value is not None else value\
+                for value, relationship in zip(row, is_relationship)
+            ]
+            values = row[len(group_columns):]
+            results.append(
+                aggregate_result(group, group_values, aggregates, values)
+            )
+        return results
+
+    def _build_relatives_query(self, resource, relname,
+        *, order=None, limit=None, offset=None, filters=None
+        ):
+        """
+        Returns a query for the relatives of the *resource* in the
+        relationship *relname*. The query is scoped to the parent, so that
+        the relationship is never loaded as a whole.
+        """
+        schema_ = self.api.get_schema(self.api.get_typename(resource))
+        relationship = schema_.relationships[relname]
+        typename = self.api.get_typename(relationship.sqlrel.mapper.class_)
+
+        query = self._build_query(
+            typename, order=order, limit=limit, offset=offset,
+            filters=filters, parent=(resource, relationship)
+        )
+        return query
+
+    def query_relatives(self, resource, relname,
+        *, order=None, limit=None, offset=None, filters=None
+        ):
+        """
+        """
+        query = self._build_relatives_query(
+            resource, relname,
+            order=order, limit=limit, offset=offset, filters=filters
+        )
+        return list(query)
+
+    def query_relatives_size(self, resource, relname, *, filters=None):
+        """
+        """
+        query = self._build_relatives_query(resource, relname, filters=filters)
+        return query.count()
+
+    def count_relatives(self, typename, ids, relname):
+        """
+        Counts the relatives of all resources with a single *GROUP BY* query
+        on the foreign key column, which references the resources. For a
+        *many-to-many* relationship, only the association table is queried.
+        """
+        schema_ = self.api.get_schema(typename)
+        relationship = schema_.relationships[relname]
+        sqlrel = relationship.sqlrel
+
+        # The foreign key in the table of the relatives or in the
+        # association table must reference the primary key of the
+        # resources.
+        primary_key = sqlalchemy.inspect(schema_.resource_class).primary_key
+        pairs = sqlrel.synchronize_pairs
+        if not isinstance(relationship, schema.ToManyRelationship) \
+            or len(primary_key) != 1 or len(pairs) != 1 \
+            or not pairs[0][0] is primary_key[0]:
+            return super().count_relatives(typename, ids, relname)
+
+        foreign_key = pairs[0][1]
+        query = self.sqla_session.query(foreign_key, sqlalchemy.func.count())
+        query = query.filter(foreign_key.in_(ids)).group_by(foreign_key)
+        return {str(id_): count for id_, count in query}
+
     def get(self, identifier, required=False):
         """
         """
@@ -249,6 +702,27 @@ class Session(jsonapi.base.database.Session):
         }
         return resources
 
+    def check_existence(self, identifiers):
+        """
+        Counts the resources of each type with a single query, so that the
+        resources are not loaded. Only if a resource does not exist, they are
+        loaded to find the missing one.
+        """
+        key = lambda identifier: identifier[0]
+        for typename, group in groupby(sorted(identifiers, key=key), key=key):
+            ids = set(resource_id for typename_, resource_id in group)
+
+            resource_class = self.api.get_resource_class(typename)
+            primary_key = sqlalchemy.inspect(resource_class).primary_key
+            if len(primary_key) == 1:
+                query = self.sqla_session.query(resource_class)
+                query = query.filter(primary_key[0].in_(ids))
+                if query.count() == len(ids):
+                    continue
+
+            super().check_existence([(typename, id_) for id_ in ids])
+        return None
+
     def save(self, resources):
         """
         """
@@ -262,8 +736,83 @@ class Session(jsonapi.base.database.Session):
             self.sqla_session.delete(resource)
         return None
 
+    def _requires_orm_delete(self, mapper):
+        """
+        Returns True, if the resources of the *mapper* can not be deleted
+        with a bulk ``DELETE`` statement, because the ORM would cascade the
+        delete to the relatives or update their foreign keys.
+
+        :arg sqlalchemy.orm.Mapper mapper:
+        """
+        # Joined table inheritance
+        if len(mapper.tables) > 1:
+            return True
+
+        for relationship in mapper.relationships:
+            if relationship.viewonly:
+                continue
+            if relationship.cascade.delete:
+                return True
+            # The association rows are removed before the bulk delete.
+            if relationship.secondary is not None:
+                if len(relationship.synchronize_pairs) > 1:
+                    return True
+            # The ORM sets the foreign keys of the relatives to NULL,
+            # unless the database is told to take care of it.
+            elif relationship.direction is ONETOMANY \
+                and not relationship.passive_deletes:
+                return True
+        return False
+
+    def delete_where(self, typename, *, filters=None, ids=None):
+        """
+        If possible, the resources are deleted with a single ``DELETE``
+        statement without loading them.
+
+        The rows of the *many-to-many* relationships in the association
+        tables are deleted first. If the ORM would cascade the delete or
+        update the foreign keys of the relatives (a relationship with the
+        *delete* cascade or a *one-to-many* relationship without
+        ``passive_deletes``), the resources are loaded and deleted one by one
+        with the ORM instead, so that the same rules apply as for
+        :meth:`delete`. Like the ORM, only the relationships defined on the
+        resource class (including backrefs) are taken into account.
+
+        The bulk delete does not synchronize the session, so resources,
+        which have already been loaded, are not expired.
+        """
+        resource_class = self.api.get_resource_class(typename)
+        mapper = sqlalchemy.inspect(resource_class)
+        query = self._build_query(typename, filters=filters)
+
+        if ids is not None:
+            primary_key = mapper.primary_key[0]
+            query = query.filter(primary_key.in_(ids))
+
+        if self._requires_orm_delete(mapper):
+            resources = query.all()
+            self.delete(resources)
+            return len(resources)
+
+        for relationship in mapper.relationships:
+            if relationship.secondary is None or relationship.viewonly:
+                continue
+
+            column, secondary_column = relationship.synchronize_pairs[0]
+            statement = relationship.secondary.delete().where(
+                secondary_column.in_(query.with_entities(column).statement)
+            )
+            self.sqla_session.execute(statement)
+        return query.delete(synchronize_session=False)
+
     def commit(self):
         """
         """
         self.sqla_session.commit()
         return None
+
+    def rollback(self):
+        """
+        """
+        self.sqla_session.rollback()
+        return None
@@ -34,6 +34,7 @@ import logging
 
 # third party
 import sqlalchemy
+import sqlalchemy.orm
 
 # local
 import jsonapi
@@ -59,6 +60,19 @@ class Attribute(jsonapi.base.schema.Attribute):
         The sqlchemy model
     :arg sqlattr:
         An sqlalchemy ColumnProperty
+
+    The *search* filter is only available for columns, which are declared
+    as searchable in their *info* dictionary:
+
+    .. code-block:: python3
+
+        title = Column(String, info={"jsonapi_search": True})
+
+    The declaration promises, that the database has a full text index for
+    the column: The table is an *FTS5* virtual table on SQLite, the column
+    has a *FULLTEXT* index on MySQL and an index on ``to_tsvector(column)``
+    (or the type *TSVECTOR*) on Postgres. Other databases do not support
+    the *search* filter.
     """
 
     def __init__(self, resource_class, sqlattr):
@@ -68,6 +82,12 @@ class Attribute(jsonapi.base.schema.Attribute):
         self.sqlattr = sqlattr
         self.class_attr = sqlattr.class_attribute
         self.resource_class = resource_class
+
+        #: True, if the column can be used with the *search* filter.
+        self.searchable = any(
+            column.info.get("jsonapi_search", False)\
+            for column in getattr(sqlattr, "columns", list())
+        )
         return None
 
     def get(self, resource):
@@ -141,12 +161,28 @@ class ToManyRelationship(jsonapi.base.schema.ToManyRelationship):
     """
     Wraps an sqlalchemy to-many relationship.
 
+    The relatives can be added and removed by their identifiers. If the
+    collection of a persistent resource has not been loaded yet, only the
+    ids of the relatives are selected from the association table (or the
+    table of the relatives) and the relatives are added and removed with
+    a single *INSERT* or *DELETE* on the association table (or an *UPDATE*
+    of the foreign key). Like the bulk delete in
+    :meth:`~jsonapi.sqlalchemy.database.Session.delete_where`, these
+    statements do not synchronize the session: The backrefs of relatives,
+    which have already been loaded, are not expired.
+
+    Relationships with composite keys, custom join conditions, polymorphic
+    relatives or a *delete-orphan* cascade are always loaded and changed
+    with the ORM.
+
     :arg resource_class:
         The sqlalchemy model
     :arg sqlrel:
         The relationship defined on the model
     """
 
+    accepts_identifiers = True
+
     def __init__(self, resource_class, sqlrel):
         super().__init__(name=sqlrel.key)
         self.sqlrel = sqlrel
@@ -154,9 +190,123 @@ class ToManyRelationship(jsonapi.base.schema.ToManyRelationship):
         self.resource_class = resource_class
         return None
 
+    def _link_columns(self):
+        """
+        Returns the tuple ``(local_column, parent_column, id_column)`` or
+        None, if the relationship can not be read and changed without the
+        ORM.
+
+        *local_column* is the column of the resource, which is referenced by
+        *parent_column*. *parent_column* and *id_column* are the columns of
+        the association table for a *many-to-many* relationship and the
+        foreign key and primary key of the relatives for a *one-to-many*
+        relationship.
+        """
+        sqlrel = self.sqlrel
+        mapper = sqlrel.mapper
+        if len(sqlrel.synchronize_pairs) != 1 \
+            or len(mapper.primary_key) != 1 or mapper.polymorphic_map \
+            or not hasattr(mapper.class_, "_jsonapi"):
+            return None
+
+        local_column, parent_column = sqlrel.synchronize_pairs[0]
+        if not sqlrel.primaryjoin.compare(local_column == parent_column):
+            return None
+
+        primary_key = mapper.primary_key[0]
+        if sqlrel.secondary is None:
+            return (local_column, parent_column, primary_key)
+
+        if len(sqlrel.secondary_synchronize_pairs) != 1:
+            return None
+
+        remote_column, id_column = sqlrel.secondary_synchronize_pairs[0]
+        if remote_column is not primary_key \
+            or not sqlrel.secondaryjoin.compare(primary_key == id_column):
+            return None
+        return (local_column, parent_column, id_column)
+
+    def _parent_id(self, resource, local_column):
+        """
+        Returns the value of the *local_column* of the *resource* or None,
+        if the collection of the *resource* must be used, because it is not
+        persistent or the collection has already been loaded.
+        """
+        state = sqlalchemy.inspect(resource)
+        if not state.persistent or self.name in state.dict:
+            return None
+
+        prop = state.mapper.get_property_by_column(local_column)
+        return getattr(resource, prop.key)
+
+    def _load(self, resource, relatives):
+        """
+        Replaces the identifier tuples in *relatives* with the loaded
+        relatives.
+        """
+        session = sqlalchemy.orm.object_session(resource)
+        query = session.query(self.sqlrel.mapper.class_)
+        return [
+            query.get(relative[1]) if isinstance(relative, tuple) \
+            else relative for relative in relatives
+        ]
+
+    def _execute(self, resource, relatives, statement):
+        """
+        Executes the *statement* ``statement(parent_id, ids, columns)``,
+        which adds or removes the *relatives* with a single query and
+        returns True. If the relationship must be changed with the ORM,
+        nothing is done and False is returned.
+        """
+        columns = self._link_columns()
+        if columns is None or self.sqlrel.viewonly \
+            or not all(isinstance(relative, tuple) for relative in relatives):
+            return False
+
+        parent_id = self._parent_id(resource, columns[0])
+        if parent_id is None:
+            return False
+
+        # The new relatives may have been added to the session, but not
+        # been inserted yet.
+        session = sqlalchemy.orm.object_session(resource)
+        session.flush()
+
+        ids = [relative_id for typename, relative_id in relatives]
+        session.execute(statement(parent_id, ids, columns))
+        return True
+
     def get(self, resource):
         return self.class_attr.__get__(resource, None)
 
+    def get_identifiers(self, resource):
+        """
+        Selects only the ids of the relatives from the association table
+        (or the table of the relatives), if the collection has not been
+        loaded yet.
+        """
+        columns = self._link_columns()
+        if columns is None:
+            return super().get_identifiers(resource)
+
+        local_column, parent_column, id_column = columns
+        parent_id = self._parent_id(resource, local_column)
+        if parent_id is None:
+            return super().get_identifiers(resource)
+
+        # The relatives must be joined, if they are ordered.
+        session = sqlalchemy.orm.object_session(resource)
+        if self.sqlrel.order_by:
+            query = session.query(self.sqlrel.mapper.primary_key[0])
+            query = query.with_parent(resource, self.class_attr)
+            query = query.order_by(*self.sqlrel.order_by)
+        else:
+            query = session.query(id_column)
+            query = query.filter(parent_column == parent_id)
+
+        typename = self.sqlrel.mapper.class_._jsonapi["typename"]
+        return [(typename, str(relative_id)) for relative_id, in query]
+
     def set(self, resource, relatives):
         self.class_attr.__set__(resource, relatives)
         return None
@@ -166,13 +316,56 @@ class ToManyRelationship(jsonapi.base.schema.ToManyRelationship):
         return None
 
     def add(self, resource, relative):
-        relatives = self.class_attr.__get__(resource, None)
-        relatives.append(relative)
+        self.extend(resource, [relative])
         return None
 
     def extend(self, resource, new_relatives):
-        relatives = self.class_attr.__get__(resource, None)
-        relatives.extend(new_relatives)
+        """
+        Inserts the rows into the association table (or updates the foreign
+        keys of the relatives), if the *new_relatives* are identifiers and
+        the collection has not been loaded yet.
+        """
+        def statement(parent_id, ids, columns):
+            local_column, parent_column, id_column = columns
+            if self.sqlrel.secondary is None:
+                return parent_column.table.update()\
+                    .where(id_column.in_(ids))\
+                    .values({parent_column: parent_id})
+            return self.sqlrel.secondary.insert().values([
+                {parent_column: parent_id, id_column: relative_id}\
+                for relative_id in ids
+            ])
+
+        if not self._execute(resource, new_relatives, statement):
+            relatives = self.class_attr.__get__(resource, None)
+            relatives.extend(self._load(resource, new_relatives))
+        return None
+
+    def remove_many(self, resource, old_relatives):
+        """
+        Deletes the rows from the association table (or sets the foreign
+        keys of the relatives to *NULL*), if the *old_relatives* are
+        identifiers and the collection has not been loaded yet.
+        """
+        def statement(parent_id, ids, columns):
+            local_column, parent_column, id_column = columns
+            criterion = sqlalchemy.and_(
+                parent_column == parent_id, id_column.in_(ids)
+            )
+            if self.sqlrel.secondary is None:
+                return parent_column.table.update()\
+                    .where(criterion)\
+                    .values({parent_column: None})
+            return self.sqlrel.secondary.delete().where(criterion)
+
+        # The ORM deletes orphans.
+        if self.sqlrel.cascade.delete_orphan \
+            or not self._execute(resource, old_relatives, statement):
+            # Removing the items one by one (instead of replacing the whole
+            # collection) only issues the deletes for the removed rows.
+            relatives = self.class_attr.__get__(resource, None)
+            for relative in self._load(resource, old_relatives):
+                relatives.remove(relative)
         return None
 
 
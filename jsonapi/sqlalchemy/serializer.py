@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2016 Benedikt Schmitt
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""
+jsonapi.sqlalchemy.serializer
+=============================
+
+Creates the JSONapi resource objects directly from the rows of a
+*sqlalchemy* query, without loading the resources.
+"""
+
+# std
+from collections import OrderedDict
+import logging
+
+# third party
+import sqlalchemy
+
+# local
+import jsonapi
+from . import schema
+
+
+__all__ = [
+    "RowSerializer"
+]
+
+
+LOG = logging.getLogger(__file__)
+
+
+class RowSerializer(object):
+    """
+    Creates the JSONapi resource objects from the rows of a query, which
+    selects only the columns returned by :meth:`select`.
+
+    This is only possible, if the result is equal to the one of the
+    :class:`~jsonapi.base.serializer.Serializer`. Attributes and
+    relationships defined with a marker, *to-many* relationships and
+    polymorphic models need the resource itself. In this case, :meth:`select`
+    returns None.
+
+    :arg jsonapi.base.api.API api:
+    :arg str typename:
+    """
+
+    def __init__(self, api, typename):
+        """
+        """
+        self.api = api
+        self.typename = typename
+        self.schema = api.get_schema(typename)
+        self.resource_class = api.get_resource_class(typename)
+        return None
+
+    def _fieldnames(self, fields=None):
+        """
+        Returns the names of the attributes and relationships, which are
+        included in the resource objects.
+        """
+        attributes = [
+            name for name in sorted(self.schema.attributes)\
+            if fields is None or name in fields
+        ]
+        relationships = [
+            name for name in sorted(self.schema.relationships)\
+            if fields is None or name in fields
+        ]
+        return (attributes, relationships)
+
+    def _primary_key(self, mapper):
+        """
+        Returns the primary key column of the *mapper* or None, if the
+        primary key is composite.
+        """
+        if len(mapper.primary_key) != 1:
+            return None
+        return mapper.primary_key[0]
+
+    def _relative_typename(self, relationship):
+        """
+        Returns the typename of the relatives in the *to-one* relationship
+        or None, if the identifiers of the relatives can not be created from
+        the foreign key.
+        """
+        sqlrel = relationship.sqlrel
+        mapper = sqlrel.mapper
+
+        if mapper.polymorphic_on is not None:
+            return None
+        if sqlrel.secondary is not None or len(sqlrel.local_columns) != 1:
+            return None
+
+        # The foreign key must reference the primary key of the relative.
+        primary_key = self._primary_key(mapper)
+        if primary_key is None or list(sqlrel.remote_side) != [primary_key]:
+            return None
+
+        typename = self.api.get_typename(mapper.class_, None)
+        if typename is None:
+            return None
+
+        id_attribute = self.api.get_schema(typename).id_attribute
+        if type(id_attribute) is not schema.IDAttribute:
+            return None
+        return typename
+
+    def select(self, fields=None):
+        """
+        Returns the list with the columns, which must be selected to create
+        the resource objects, or None, if the resource objects can not be
+        created from the rows.
+
+        :arg list fields:
+            A list with the names of the fields, which should be included.
+        """
+        serializer = self.api.get_serializer(self.typename)
+        if type(serializer) is not jsonapi.base.serializer.Serializer:
+            return None
+
+        mapper = sqlalchemy.inspect(self.resource_class)
+        if mapper.polymorphic_on is not None:
+            return None
+
+        primary_key = self._primary_key(mapper)
+        if primary_key is None \
+            or type(self.schema.id_attribute) is not schema.IDAttribute:
+            return None
+
+        columns = [primary_key]
+        attributes, relationships = self._fieldnames(fields)
+        for name in attributes:
+            attr = self.schema.attributes[name]
+            if type(attr) is not schema.Attribute \
+                or not isinstance(attr.sqlattr, sqlalchemy.orm.ColumnProperty):
+                return None
+            columns.append(attr.class_attr)
+
+        for name in relationships:
+            rel = self.schema.relationships[name]
+            if type(rel) is not schema.ToOneRelationship \
+                or self._relative_typename(rel) is None:
+                return None
+            columns.extend(rel.sqlrel.local_columns)
+        return columns
+
+    def serialize_rows(self, rows, fields=None):
+        """
+        Creates the resource objects from the *rows*. The columns of each
+        row must be in the order returned by :meth:`select`.
+
+        :arg rows:
+            An iterable of rows
+        :arg list fields:
+            A list with the names of the fields, which should be included.
+        """
+        attributes, relationships = self._fieldnames(fields)
+        typenames = [
+            self._relative_typename(self.schema.relationships[name])\
+            for name in relationships
+        ]
+
+        data = list()
+        for row in rows:
+            d = OrderedDict()
+            d["type"] = self.typename
+            d["id"] = str(row[0])
+
+            if attributes:
+                d["attributes"] = OrderedDict(
+                    zip(attributes, row[1:len(attributes) + 1])
+                )
+
+            if relationships:
+                d["relationships"] = OrderedDict()
+                foreign_keys = row[len(attributes) + 1:]
+                for name, typename, foreign_key in zip(
+                    relationships, typenames, foreign_keys
+                    ):
+                    relationship = OrderedDict()
+                    if foreign_key is None:
+                        relationship["data"] = None
+                    else:
+                        relationship["data"] = OrderedDict([
+                            ("type", typename),
+                            ("id", str(foreign_key))
+                        ])
+                    d["relationships"][name] = relationship
+            data.append(d)
+        return data
@@ -34,6 +34,7 @@ import asyncio
 import tornado
 import tornado.web
 import tornado.gen
+from tornado.platform.asyncio import to_asyncio_future
 
 # local
 import jsonapi
@@ -44,34 +45,86 @@ __all__ = [
 ]
 
 
+@tornado.web.stream_request_body
 class Handler(tornado.web.RequestHandler):
     """
     This handler works as proxy for the API. Each request is forwarded to
     the *jsonapi*.
+
+    The body of a request is received in chunks. A newline delimited JSON
+    body (an import) is forwarded to the API while it is still being
+    received, so that it is never kept in memory as a whole. All other
+    bodies are buffered.
     """
 
     def initialize(self, jsonapi):
         """
         """
         self.jsonapi = jsonapi
+
+        # The chunks of a buffered body.
+        self._body_chunks = list()
+
+        # The stream and the pending response of a streamed body.
+        self._body_stream = None
+        self._response = None
         return None
 
-    @asyncio.coroutine
+    def _create_request(self, body):
+        """
+        Transforms the tornado request into a jsonapi request.
+        """
+        return jsonapi.base.Request(
+            self.request.uri, self.request.method, self.request.headers, body
+        )
+
     def prepare(self):
         """
-        .. hint::
+        Starts handling the request, if the body can be streamed.
+        """
+        content_type = self.request.headers.get("content-type", "")
+        content_type = content_type.split(";")[0].strip()
+
+        if self.request.method == "POST" \
+            and content_type == "application/x-ndjson":
+            self._body_stream = jsonapi.asyncio.request.BodyStream()
+            self._response = asyncio.ensure_future(
+                self.jsonapi.handle_request(
+                    self._create_request(self._body_stream)
+                )
+            )
+
+            # Discard the rest of the body, if the API does not read it
+            # anymore.
+            self._response.add_done_callback(
+                lambda future: self._body_stream.close()
+            )
+        return None
 
-            Prepare is not the best way to dispatch the request. Try to find
-            a better way.
+    @asyncio.coroutine
+    def data_received(self, chunk):
         """
-        # Transform the request
-        request = jsonapi.base.Request(
-            self.request.uri, self.request.method, self.request.headers,
-            self.request.body
-        )
+        """
+        if self._body_stream is not None:
+            yield from self._body_stream.feed(chunk)
+        else:
+            self._body_chunks.append(chunk)
+        return None
+
+    @asyncio.coroutine
+    def _handle(self):
+        """
+        .. hint::
 
+            This method is called, after the whole body has been received.
+        """
         # Let the API handle it.
-        resp = yield from self.jsonapi.handle_request(request)
+        if self._body_stream is not None:
+            yield from self._body_stream.feed_eof()
+            resp = yield from self._response
+        else:
+            request = self._create_request(b"".join(self._body_chunks))
+            resp = yield from self.jsonapi.handle_request(request)
 
         # Create the response.
         for key, value in resp.headers.items():
@@ -80,40 +133,54 @@ class Handler(tornado.web.RequestHandler):
 
         if resp.is_file:
             raise RuntimeError("Sorry, files are not yet supported :(")
+        elif resp.is_stream:
+            # Send each chunk, as soon as it is available, so that only
+            # one chunk must be kept in memory. A chunk may be a coroutine,
+            # which loads the next batch of resources.
+            for chunk in resp.chunks:
+                if asyncio.iscoroutine(chunk):
+                    chunk = yield from chunk
+                self.write(chunk)
+                yield from to_asyncio_future(self.flush())
         elif resp.has_body:
             self.write(resp.body)
 
         self.finish()
         return None
 
+    @asyncio.coroutine
     def head(self, *args, **kargs):
         """
         """
-        # Overridden, to avoid a MethodNotAllowed error raised by tornado.
+        yield from self._handle()
         return None
 
+    @asyncio.coroutine
     def get(self, *args, **kargs):
         """
         """
-        # Overridden, to avoid a MethodNotAllowed error raised by tornado.
+        yield from self._handle()
         return None
 
+    @asyncio.coroutine
     def post(self, *args, **kargs):
         """
         """
-        # Overridden, to avoid a MethodNotAllowed error raised by tornado.
+        yield from self._handle()
         return None
 
+    @asyncio.coroutine
     def patch(self, *args, **kargs):
         """
         """
-        # Overridden, to avoid a MethodNotAllowed error raised by tornado.
+        yield from self._handle()
         return None
 
+    @asyncio.coroutine
     def delete(self, *args, **kargs):
         """
         """
-        # Overridden, to avoid a MethodNotAllowed error raised by tornado.
+        yield from self._handle()
         return None
 
 
@@ -54,6 +54,7 @@ setup(
         "jsonapi.base.handler",
         "jsonapi.asyncio",
         "jsonapi.asyncio.handler",
+        "jsonapi.bulk_database",
         "jsonapi.flask",
         "jsonapi.marker",
         "jsonapi.mongoengine",
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+"""
+Shared fixtures for the py-jsonapi tests.
+
+The adapter tests need *sqlalchemy* (sqlite in memory) and *mongoengine*
+with *mongomock*. They are skipped, if these packages are not installed.
+"""
+
+# std
+import asyncio
+import json
+
+# third party
+import pytest
+
+# local
+from jsonapi.base.request import Request
+
+
+@asyncio.coroutine
+def _read_chunks(chunks):
+    """
+    Returns the body of a streamed response. The chunks of an asynchronous
+    API may be coroutines.
+    """
+    body = list()
+    for chunk in chunks:
+        if asyncio.iscoroutine(chunk):
+            chunk = yield from chunk
+        body.append(chunk.decode() if isinstance(chunk, bytes) else chunk)
+    return "".join(body)
+
+
+def _decode(response, body):
+    """
+    Returns the decoded JSON *body* of the *response* or None.
+    """
+    if isinstance(body, bytes):
+        body = body.decode()
+
+    if not body:
+        return None
+    if response.headers.get("content-type") == "application/x-ndjson":
+        return [json.loads(line) for line in body.splitlines() if line]
+    return json.loads(body)
+
+
+@pytest.fixture
+def fetch():
+    """
+    Returns a function, which sends a request to an API and returns the
+    status code and the decoded response body. The request is run in a new
+    event loop, if the API is asynchronous.
+    """
+    def fetch(api, method, uri, body=None, headers=None):
+        headers = dict(headers or dict())
+        headers.setdefault("content-type", "application/vnd.api+json")
+        if body is not None and not isinstance(body, (bytes, str)) \
+            and not hasattr(body, "__next__"):
+            body = json.dumps(body).encode()
+        request = Request(uri, method, headers, body or b"")
+        response = api.handle_request(request)
+
+        if not asyncio.iscoroutine(response):
+            if response.is_stream:
+                body = "".join(
+                    chunk.decode() if isinstance(chunk, bytes) else chunk\
+                    for chunk in response.chunks
+                )
+            else:
+                body = response.body
+            return response.status, _decode(response, body)
+
+        loop = asyncio.new_event_loop()
+        try:
+            response = loop.run_until_complete(response)
+            if response.is_stream:
+                body = loop.run_until_complete(_read_chunks(response.chunks))
+            else:
+                body = response.body
+        finally:
+            loop.close()
+        return response.status, _decode(response, body)
+    return fetch
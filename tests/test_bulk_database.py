@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+
+"""
+Tests for the synchronous and the asynchronous bulk database with fake
+database adapters, which record their calls.
+"""
+
+# std
+import asyncio
+import threading
+
+# third party
+import pytest
+
+# local
+import jsonapi
+import jsonapi.bulk_database
+import jsonapi.bulk_database.asyncio
+
+
+class FakeDatabase(jsonapi.base.database.Database):
+    """
+    Records the identifiers of each :meth:`get_many` call, the threads in
+    which the sessions are created and used and the commits. If *barrier*
+    is given, each call waits until all adapters sharing the barrier have
+    been called.
+    """
+
+    def __init__(self, barrier=None, fail_commit=False):
+        super().__init__()
+        self.calls = list()
+        self.barrier = barrier
+        self.created = list()
+        self.threads = set()
+        self.commits = 0
+        self.fail_commit = fail_commit
+        return None
+
+    def session(self):
+        self.created.append(threading.get_ident())
+        return FakeSession(self)
+
+
+class FakeSession(jsonapi.base.database.Session):
+
+    def __init__(self, db):
+        super().__init__(db.api)
+        self.db = db
+        return None
+
+    def get_many(self, identifiers, required=False):
+        identifiers = list(identifiers)
+        self.db.calls.append(identifiers)
+        self.db.threads.add(threading.get_ident())
+        if self.db.barrier is not None:
+            self.db.barrier.wait(timeout=5)
+        return {identifier: object() for identifier in identifiers}
+
+    def commit(self):
+        self.db.threads.add(threading.get_ident())
+        if self.db.fail_commit:
+            raise RuntimeError("commit failed")
+        self.db.commits += 1
+        return None
+
+
+class AsyncFakeDatabase(jsonapi.asyncio.database.Database):
+    """
+    The asynchronous version of :class:`FakeDatabase`. *load* counts the
+    calls, which are currently waiting for the database, and their maximum.
+    """
+
+    def __init__(self, load):
+        super().__init__()
+        self.calls = list()
+        self.load = load
+        return None
+
+    def session(self):
+        return AsyncFakeSession(self)
+
+
+class AsyncFakeSession(jsonapi.asyncio.database.Session):
+
+    def __init__(self, db):
+        super().__init__(db.api)
+        self.db = db
+        return None
+
+    @asyncio.coroutine
+    def get_many(self, identifiers, required=False):
+        identifiers = list(identifiers)
+        self.db.calls.append(identifiers)
+
+        load = self.db.load
+        load["current"] += 1
+        load["peak"] = max(load["peak"], load["current"])
+        yield from asyncio.sleep(0.01)
+        load["current"] -= 1
+        return {identifier: object() for identifier in identifiers}
+
+
+IDENTIFIERS = [("A", "1"), ("B", "1"), ("A", "2"), ("B", "2"), ("A", "3")]
+
+
+# user-026
+# ~~~~~~~~
+
+def test_get_many_groups_unsorted_identifiers():
+    db_a, db_b = FakeDatabase(), FakeDatabase()
+    bulk_db = jsonapi.bulk_database.Database()
+    bulk_db.add_type("A", db_a)
+    bulk_db.add_type("B", db_b)
+
+    resources = bulk_db.session().get_many(IDENTIFIERS)
+    assert set(resources) == set(IDENTIFIERS)
+    assert db_a.calls == [[("A", "1"), ("A", "2"), ("A", "3")]]
+    assert db_b.calls == [[("B", "1"), ("B", "2")]]
+
+
+# user-027
+# ~~~~~~~~
+
+def test_get_many_fans_out():
+    # The calls only return, if both adapters are called at the same time.
+    barrier = threading.Barrier(2)
+    db_a, db_b = FakeDatabase(barrier), FakeDatabase(barrier)
+    bulk_db = jsonapi.bulk_database.Database(max_workers=2)
+    bulk_db.add_type("A", db_a)
+    bulk_db.add_type("B", db_b)
+
+    session = bulk_db.session()
+    resources = session.get_many(IDENTIFIERS)
+    assert set(resources) == set(IDENTIFIERS)
+    assert set(session.timings) == {db_a, db_b}
+    assert all(
+        timings["get_many"] > 0 for timings in session.timings.values()
+    )
+
+
+def test_get_many_single_database():
+    db_a, db_b = FakeDatabase(), FakeDatabase()
+    bulk_db = jsonapi.bulk_database.Database()
+    bulk_db.add_type("A", db_a)
+    bulk_db.add_type("B", db_b)
+
+    bulk_db.session().get_many([("A", "1"), ("A", "2")])
+    assert db_a.calls == [[("A", "1"), ("A", "2")]]
+    assert db_b.calls == []
+
+    # The worker threads are not needed for one database.
+    assert bulk_db._workers is None
+
+
+def test_sessions_are_bound_to_one_thread():
+    db_a, db_b = FakeDatabase(), FakeDatabase()
+    bulk_db = jsonapi.bulk_database.Database(max_workers=2)
+    bulk_db.add_type("A", db_a)
+    bulk_db.add_type("B", db_b)
+
+    session = bulk_db.session()
+    for i in range(3):
+        session.get_many(IDENTIFIERS)
+        session.get_many([("B", "1")])
+    session.commit()
+
+    # The sessions are created in the calling thread. The session created
+    # first is used there, the other one in a worker thread.
+    current = threading.get_ident()
+    assert db_a.created == db_b.created == [current]
+    assert db_a.threads == {current}
+    assert len(db_b.threads) == 1 and not current in db_b.threads
+
+
+def test_commit_one_after_another():
+    db_a, db_b = FakeDatabase(), FakeDatabase(fail_commit=True)
+    db_c = FakeDatabase()
+    bulk_db = jsonapi.bulk_database.Database()
+    bulk_db.add_type("A", db_a)
+    bulk_db.add_type("B", db_b)
+    bulk_db.add_type("C", db_c)
+
+    # The sessions are committed in the order of the adapters, not in the
+    # order in which they have been used.
+    session = bulk_db.session()
+    session.get_many([("C", "1"), ("B", "1"), ("A", "1")])
+    with pytest.raises(RuntimeError):
+        session.commit()
+    assert (db_a.commits, db_c.commits) == (1, 0)
+
+
+# user-028
+# ~~~~~~~~
+
+def test_asyncio_get_many_gathers():
+    load = {"current": 0, "peak": 0}
+    db_a, db_b = AsyncFakeDatabase(load), AsyncFakeDatabase(load)
+    bulk_db = jsonapi.bulk_database.asyncio.Database()
+    bulk_db.add_type("A", db_a)
+    bulk_db.add_type("B", db_b)
+
+    loop = asyncio.new_event_loop()
+    try:
+        resources = loop.run_until_complete(
+            bulk_db.session().get_many(IDENTIFIERS)
+        )
+    finally:
+        loop.close()
+
+    assert set(resources) == set(IDENTIFIERS)
+    assert db_a.calls == [[("A", "1"), ("A", "2"), ("A", "3")]]
+    assert db_b.calls == [[("B", "1"), ("B", "2")]]
+
+    # Both adapters were waiting for the database at the same time.
+    assert load["peak"] == 2
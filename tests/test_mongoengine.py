@@ -0,0 +1,753 @@
+#!/usr/bin/env python3
+
+"""
+Tests for the mongoengine adapter against a mongomock database.
+"""
+
+# std
+import json
+
+# third party
+import pytest
+
+mongoengine = pytest.importorskip("mongoengine")
+mongomock = pytest.importorskip("mongomock")
+
+# local
+import jsonapi
+import jsonapi.mongoengine
+
+
+class Author(mongoengine.Document):
+    name = mongoengine.StringField()
+
+
+class Tag(mongoengine.Document):
+    name = mongoengine.StringField(unique=True)
+
+
+class Category(mongoengine.Document):
+    name = mongoengine.StringField()
+
+
+class Post(mongoengine.Document):
+    title = mongoengine.StringField()
+    views = mongoengine.IntField(default=0)
+    author = mongoengine.ReferenceField(
+        Author, reverse_delete_rule=mongoengine.NULLIFY
+    )
+    category = mongoengine.ReferenceField(
+        Category, reverse_delete_rule=mongoengine.DENY
+    )
+    tags = mongoengine.ListField(mongoengine.ReferenceField(
+        Tag, reverse_delete_rule=mongoengine.PULL
+    ))
+
+
+class Comment(mongoengine.Document):
+    text = mongoengine.StringField()
+    post = mongoengine.ReferenceField(
+        Post, reverse_delete_rule=mongoengine.CASCADE
+    )
+
+
+class Animal(mongoengine.Document):
+    name = mongoengine.StringField()
+    meta = {"allow_inheritance": True}
+
+
+class Dog(Animal):
+    pass
+
+
+class Owner(mongoengine.Document):
+    name = mongoengine.StringField()
+    favorite = mongoengine.ReferenceField(Animal)
+    pets = mongoengine.ListField(mongoengine.ReferenceField(Animal))
+
+
+@pytest.fixture(autouse=True)
+def connection():
+    mongoengine.connect(
+        "jsonapi-test", host="mongodb://localhost",
+        mongo_client_class=mongomock.MongoClient
+    )
+    yield None
+    mongoengine.disconnect()
+
+
+@pytest.fixture
+def api():
+    api = jsonapi.base.api.API("/api", jsonapi.mongoengine.Database())
+    for document in (Author, Tag, Category, Post, Comment):
+        api.add_type(jsonapi.mongoengine.Schema(document))
+    return api
+
+
+@pytest.fixture
+def blog(api):
+    """
+    Two authors, three tags, a category, three posts and three comments.
+    """
+    alice = Author(name="alice").save()
+    bob = Author(name="bob").save()
+    python = Tag(name="python").save()
+    rust = Tag(name="rust").save()
+    go = Tag(name="go").save()
+    news = Category(name="news").save()
+    posts = [
+        Post(
+            title="a", views=10, author=alice, category=news,
+            tags=[python, rust]
+        ).save(),
+        Post(title="b", views=20, author=alice, tags=[python]).save(),
+        Post(title="c", views=30, author=bob).save()
+    ]
+    comments = [
+        Comment(text="x", post=posts[0]).save(),
+        Comment(text="y", post=posts[0]).save(),
+        Comment(text="z", post=posts[1]).save()
+    ]
+    return {
+        "authors": [alice, bob], "tags": [python, rust, go],
+        "categories": [news],
+        "posts": posts, "comments": comments
+    }
+
+
+@pytest.fixture
+def pets(api):
+    """
+    An owner with a dog, which is referenced as animal.
+    """
+    # The subclass is added first, so that it does not share the *_jsonapi*
+    # dictionary of its base class.
+    for document in (Dog, Animal, Owner):
+        api.add_type(jsonapi.mongoengine.Schema(document))
+
+    dog = Dog(name="rex").save()
+    return Owner(name="alice", favorite=dog, pets=[dog]).save()
+
+
+def tag_names(post):
+    post = Post.objects.get(id=post.id)
+    return sorted(tag.name for tag in post.tags)
+
+
+# user-039
+# ~~~~~~~~
+
+def test_replace_to_many_relationship(api, fetch, blog):
+    post = blog["posts"][0]
+    rust, go = blog["tags"][1:]
+    status, _ = fetch(
+        api, "patch", "/api/Post/{}/relationships/tags".format(post.id),
+        {"data": [
+            {"type": "Tag", "id": str(rust.id)},
+            {"type": "Tag", "id": str(go.id)}
+        ]}
+    )
+    assert status == 200
+    assert tag_names(post) == ["go", "rust"]
+
+
+def test_extend_to_many_relationship(api, fetch, blog):
+    post = blog["posts"][1]
+    python, rust, go = blog["tags"]
+    status, _ = fetch(
+        api, "post", "/api/Post/{}/relationships/tags".format(post.id),
+        {"data": [
+            {"type": "Tag", "id": str(python.id)},
+            {"type": "Tag", "id": str(go.id)}
+        ]}
+    )
+    assert status == 200
+    assert tag_names(post) == ["go", "python"]
+
+
+# user-036
+# ~~~~~~~~
+
+def test_delete_where_pulls_references(api, fetch, blog):
+    status, document = fetch(
+        api, "delete", '/api/Tag?filter[name]=eq:"python"'
+    )
+    assert status == 200
+    assert document["meta"]["deleted-resources"] == 1
+    assert tag_names(blog["posts"][0]) == ["rust"]
+    assert tag_names(blog["posts"][1]) == []
+
+
+def test_delete_where_nullifies_references(api, fetch, blog):
+    alice = blog["authors"][0]
+    status, document = fetch(
+        api, "delete", "/api/Author",
+        {"data": [{"type": "Author", "id": str(alice.id)}]}
+    )
+    assert status == 200
+    assert document["meta"]["deleted-resources"] == 1
+    assert Post.objects(author=alice.id).count() == 0
+    assert Post.objects.count() == 3
+
+
+def test_delete_where_cascades(api, fetch, blog):
+    status, document = fetch(
+        api, "delete", "/api/Post?filter[views]=in:[20,30]"
+    )
+    assert status == 200
+    assert document["meta"]["deleted-resources"] == 2
+    assert [comment.text for comment in Comment.objects] == ["x", "y"]
+
+
+def test_delete_where_invalid_id(api, fetch, blog):
+    status, document = fetch(
+        api, "delete", "/api/Post", {"data": [{"type": "Post", "id": "bad"}]}
+    )
+    assert status == 200
+    assert document["meta"]["deleted-resources"] == 0
+    assert Post.objects.count() == 3
+
+
+def test_get_many_invalid_id(api, blog):
+    session = api.database.session()
+    assert session.get_many([("Post", "bad")]) == dict()
+    with pytest.raises(jsonapi.base.errors.ResourceNotFound):
+        session.get_many([("Post", "bad")], required=True)
+
+
+def test_delete_where_denied(api, fetch, blog):
+    status, document = fetch(
+        api, "delete", '/api/Category?filter[name]=eq:"news"'
+    )
+    assert status == 409
+    assert Category.objects.count() == 1
+
+
+# user-050
+# ~~~~~~~~
+
+def test_relationship_counts(api, fetch, blog):
+    status, document = fetch(
+        api, "get", "/api/Post?meta[counts]=tags&sort=title"
+    )
+    assert status == 200
+
+    relationships = [item["relationships"] for item in document["data"]]
+    assert [rels["tags"] for rels in relationships] == [
+        {"meta": {"count": 2}}, {"meta": {"count": 1}}, {"meta": {"count": 0}}
+    ]
+    assert "data" in relationships[0]["author"]
+
+
+# user-038
+# ~~~~~~~~
+
+def test_import_ndjson_reports_rejected_batch(api, fetch):
+    lines = [
+        {"type": "Tag", "attributes": {"name": "a"}},
+        {"type": "Tag", "attributes": {"name": "a"}},
+        {"type": "Tag", "attributes": {"name": "b"}},
+        {"type": "Tag", "attributes": {"name": "c"}}
+    ]
+    body = "\n".join(json.dumps(line) for line in lines).encode()
+
+    api.settings["import_batch_size"] = 2
+    status, document = fetch(
+        api, "post", "/api/Tag", body,
+        headers={"content-type": "application/x-ndjson"}
+    )
+    assert status == 200
+
+    reports = document["meta"]["batches"]
+    assert [report["created"] for report in reports] == [0, 2]
+    assert [error["status"] for error in reports[0]["errors"]] == [500]
+    assert document["meta"]["imported-resources"] == 2
+    assert sorted(tag.name for tag in Tag.objects) == ["a", "b", "c"]
+
+
+# user-046
+# ~~~~~~~~
+
+def titles(document):
+    return [item["attributes"]["title"] for item in document["data"]]
+
+
+def test_filter_to_one_path(api, fetch, blog):
+    status, document = fetch(
+        api, "get", '/api/Post?filter[author.name]=eq:"alice"&sort=title'
+    )
+    assert status == 200
+    assert titles(document) == ["a", "b"]
+
+
+def test_filter_to_many_path(api, fetch, blog):
+    status, document = fetch(
+        api, "get", '/api/Post?filter[tags.name]=in:["rust","go"]'
+    )
+    assert status == 200
+    assert titles(document) == ["a"]
+
+
+@pytest.mark.skip(
+    reason="mongomock does not resolve a dotted localField through arrays"
+)
+def test_filter_nested_path(api, fetch, blog):
+    status, document = fetch(
+        api, "get",
+        '/api/Comment?filter[post.author.name]=eq:"alice"&sort=-text'
+    )
+    assert status == 200
+    texts = [item["attributes"]["text"] for item in document["data"]]
+    assert texts == ["z", "y", "x"]
+
+
+def test_filter_path_with_pagination_and_sort(api, fetch, blog):
+    status, document = fetch(
+        api, "get",
+        '/api/Post?filter[author.name]=eq:"alice"&filter[views]=gt:5'\
+        '&sort=-author.name,-title&page[size]=1&page[number]=1'
+    )
+    assert status == 200
+    assert titles(document) == ["b"]
+    assert document["meta"]["total-resources"] == 2
+
+
+def test_filter_unknown_path(api, fetch, blog):
+    status, _ = fetch(api, "get", '/api/Post?filter[title.name]=eq:"a"')
+    assert status == 400
+
+
+def test_delete_where_path_filter(api, fetch, blog):
+    status, document = fetch(
+        api, "delete", '/api/Post?filter[author.name]=eq:"bob"'
+    )
+    assert status == 200
+    assert document["meta"]["deleted-resources"] == 1
+    assert sorted(post.title for post in Post.objects) == ["a", "b"]
+
+
+def test_aggregate_path_filter(api, fetch, blog):
+    status, document = fetch(
+        api, "get",
+        '/api/Post?aggregate[sum]=views&filter[author.name]=eq:"alice"'
+    )
+    assert status == 200
+    assert document["meta"]["aggregates"] == [
+        {"group": {}, "sum": {"views": 30}}
+    ]
+
+
+# user-035
+# ~~~~~~~~
+
+def test_update_many_resources(api, fetch, blog):
+    posts = blog["posts"]
+    python, rust, go = blog["tags"]
+    status, _ = fetch(api, "patch", "/api/Post", {"data": [
+        {
+            "type": "Post", "id": str(posts[0].id),
+            "attributes": {"title": "A"},
+            "relationships": {"tags": {"data": [
+                {"type": "Tag", "id": str(rust.id)},
+                {"type": "Tag", "id": str(go.id)}
+            ]}}
+        },
+        {
+            "type": "Post", "id": str(posts[2].id),
+            "relationships": {"tags": {"data": [
+                {"type": "Tag", "id": str(python.id)}
+            ]}}
+        }
+    ]})
+    assert status == 200
+    assert Post.objects.get(id=posts[0].id).title == "A"
+    assert tag_names(posts[0]) == ["go", "rust"]
+    assert tag_names(posts[1]) == ["python"]
+    assert tag_names(posts[2]) == ["python"]
+
+
+# user-045
+# ~~~~~~~~
+
+def test_include(api, fetch, blog):
+    status, document = fetch(
+        api, "get", "/api/Post?include=author,tags&sort=title"
+    )
+    assert status == 200
+    included = sorted(
+        (item["type"], item["attributes"]["name"])\
+        for item in document["included"]
+    )
+    assert included == [
+        ("Author", "alice"), ("Author", "bob"),
+        ("Tag", "python"), ("Tag", "rust")
+    ]
+
+
+def test_include_converts_relatives_once(api, blog, monkeypatch):
+    alice = blog["authors"][0]
+    posts = [
+        post.to_mongo().to_dict() for post in Post.objects(author=alice.id)
+    ]
+    for post in posts:
+        post[jsonapi.mongoengine.database.LOOKUP_PREFIX + "author"] = [
+            alice.to_mongo().to_dict()
+        ]
+
+    converted = list()
+    from_son = Author._from_son
+
+    def spy(son, *args, **kargs):
+        converted.append(son["_id"])
+        return from_son(son, *args, **kargs)
+
+    monkeypatch.setattr(Author, "_from_son", spy)
+
+    session = api.database.session()
+    tree = session._build_include_tree("Post", [["author"]])
+    relatives = dict()
+    session._load_lookup_results("Post", tree, posts, relatives)
+    assert converted == [alice.id]
+    assert set(relatives) == {
+        ("Author", str(alice.id)),
+        ("Post", str(blog["posts"][0].id)), ("Post", str(blog["posts"][1].id))
+    }
+
+
+# user-026
+# ~~~~~~~~
+
+def test_get_many_unsorted_identifiers(api, blog):
+    alice, bob = blog["authors"]
+    python = blog["tags"][0]
+    identifiers = [
+        ("Author", str(alice.id)), ("Tag", str(python.id)),
+        ("Author", str(bob.id))
+    ]
+    resources = api.database.session().get_many(identifiers)
+    assert resources[identifiers[0]].name == "alice"
+    assert resources[identifiers[1]].name == "python"
+    assert resources[identifiers[2]].name == "bob"
+
+
+# user-032
+# ~~~~~~~~
+
+def test_query_iter(api, blog):
+    resources = api.database.session().query_iter(
+        "Post", order=[("-", "title")], filters=[("views", "gt", 10)],
+        batch_size=1
+    )
+    assert not isinstance(resources, list)
+    assert [post.title for post in resources] == ["c", "b"]
+
+
+# user-033
+# ~~~~~~~~
+
+def test_export_ndjson(api, fetch, blog):
+    status, lines = fetch(
+        api, "get",
+        "/api/Post?export=ndjson&filter[views]=gte:20&sort=-title"\
+        "&fields[Post]=title"
+    )
+    assert status == 200
+    assert [(line["id"], line["attributes"]) for line in lines] == [
+        (str(blog["posts"][2].id), {"title": "c"}),
+        (str(blog["posts"][1].id), {"title": "b"})
+    ]
+
+
+# user-034
+# ~~~~~~~~
+
+def test_create_many_resources(api, fetch, blog):
+    bob = blog["authors"][1]
+    status, document = fetch(api, "post", "/api/Post", {"data": [
+        {
+            "type": "Post", "attributes": {"title": "d"},
+            "relationships": {
+                "author": {"data": {"type": "Author", "id": str(bob.id)}}
+            }
+        },
+        {"type": "Post", "attributes": {"title": "e"}}
+    ]})
+    assert [item["attributes"]["title"] for item in document["data"]] == [
+        "d", "e"
+    ]
+    assert Post.objects.get(title="d").author.name == "bob"
+    assert Post.objects.count() == 5
+
+
+# user-037
+# ~~~~~~~~
+
+def test_batch(api, fetch, blog):
+    bob = blog["authors"][1]
+    rust, go = blog["tags"][1:]
+    status, document = fetch(api, "post", "/api/batch", {
+        "atomic:operations": [
+            {
+                "op": "add",
+                "data": {
+                    "type": "Post", "lid": "p", "attributes": {"title": "d"},
+                    "relationships": {"author": {
+                        "data": {"type": "Author", "id": str(bob.id)}
+                    }}
+                }
+            },
+            {
+                "op": "add",
+                "ref": {"type": "Post", "lid": "p", "relationship": "tags"},
+                "data": [{"type": "Tag", "id": str(go.id)}]
+            },
+            {
+                "op": "remove",
+                "ref": {
+                    "type": "Post", "id": str(blog["posts"][0].id),
+                    "relationship": "tags"
+                },
+                "data": [{"type": "Tag", "id": str(rust.id)}]
+            },
+            {
+                "op": "remove",
+                "ref": {"type": "Comment", "id": str(blog["comments"][2].id)}
+            }
+        ]
+    })
+    assert status == 200
+    assert len(document["atomic:results"]) == 4
+    assert document["atomic:results"][2]["data"] == [
+        {"type": "Tag", "id": str(blog["tags"][0].id)}
+    ]
+
+    post = Post.objects.get(title="d")
+    assert post.author.name == "bob"
+    assert tag_names(post) == ["go"]
+    assert tag_names(blog["posts"][0]) == ["python"]
+    assert Comment.objects.count() == 2
+
+
+def test_batch_is_atomic(api, fetch, blog):
+    status, document = fetch(api, "post", "/api/batch", {
+        "atomic:operations": [
+            {"op": "add", "data": {"type": "Tag", "attributes": {"name": "c"}}},
+            {
+                "op": "update",
+                "data": {
+                    "type": "Author", "id": str(blog["authors"][0].id),
+                    "attributes": {"name": "eve"}
+                }
+            },
+            {
+                "op": "update",
+                "data": {
+                    "type": "Author", "id": "000000000000000000000000",
+                    "attributes": {"name": "eve"}
+                }
+            }
+        ]
+    })
+    assert status == 404
+    assert Tag.objects(name="c").count() == 0
+    assert Author.objects(name="eve").count() == 0
+
+
+# user-040
+# ~~~~~~~~
+
+def test_related_paginated(api, fetch, blog):
+    post = blog["posts"][0]
+    status, document = fetch(
+        api, "get",
+        "/api/Post/{}/tags?sort=-name&page[size]=1&page[number]=1"\
+        .format(post.id)
+    )
+    assert status == 200
+    assert [item["attributes"]["name"] for item in document["data"]] == [
+        "rust"
+    ]
+    assert document["meta"]["total-resources"] == 2
+
+
+def test_relationship_filtered(api, fetch, blog):
+    post = blog["posts"][0]
+    status, document = fetch(
+        api, "get",
+        '/api/Post/{}/relationships/tags?filter[name]=eq:"python"'\
+        .format(post.id)
+    )
+    assert status == 200
+    assert document["data"] == [
+        {"type": "Tag", "id": str(blog["tags"][0].id)}
+    ]
+
+
+def test_related_paginated_keeps_order(api, fetch, blog):
+    post = blog["posts"][0]
+    python, rust = blog["tags"][:2]
+    post.tags = [rust, python]
+    post.save()
+
+    names = list()
+    for number in (1, 2):
+        status, document = fetch(
+            api, "get",
+            "/api/Post/{}/tags?page[size]=1&page[number]={}"\
+            .format(post.id, number)
+        )
+        assert status == 200
+        names.extend(item["attributes"]["name"] for item in document["data"])
+    assert names == ["rust", "python"]
+
+
+def test_relationship_filtered_keeps_order(api, fetch, blog):
+    post = blog["posts"][0]
+    python, rust, go = blog["tags"]
+    post.tags = [go, rust, python]
+    post.save()
+
+    status, document = fetch(
+        api, "get",
+        '/api/Post/{}/relationships/tags?filter[name]=ne:"rust"'\
+        .format(post.id)
+    )
+    assert status == 200
+    assert document["data"] == [
+        {"type": "Tag", "id": str(go.id)},
+        {"type": "Tag", "id": str(python.id)}
+    ]
+
+
+# user-042
+# ~~~~~~~~
+
+@pytest.mark.parametrize("uri", [
+    "/api/Post?sort=title",
+    "/api/Post?sort=-views&fields[Post]=title,author,tags",
+    "/api/Post?filter[views]=gte:20&sort=title&fields[Post]=views",
+    "/api/Author?sort=name&page[size]=1&page[number]=2"
+])
+def test_raw_documents(api, fetch, blog, monkeypatch, uri):
+    status, expected = fetch(api, "get", uri)
+    assert status == 200
+
+    # Fail, if a mongoengine document is created from the database.
+    def from_son(*args, **kargs):
+        raise AssertionError("The document should not be loaded.")
+
+    for document in (Author, Post):
+        monkeypatch.setattr(document, "_from_son", from_son)
+    api.settings["mongoengine_raw_documents"] = True
+
+    status, document = fetch(api, "get", uri)
+    assert status == 200
+    assert document == expected
+
+
+def test_raw_documents_inheritance(api, pets):
+    # The documents, which allow inheritance, and the references to them
+    # need the mongoengine documents.
+    for typename in ("Owner", "Animal", "Dog"):
+        serializer = jsonapi.mongoengine.serializer.RawSerializer(
+            api, typename
+        )
+        assert serializer.select() is None
+
+
+# user-043
+# ~~~~~~~~
+
+def test_linkage_without_dereferencing(api, fetch, blog, monkeypatch):
+    post = blog["posts"][0]
+    alice = blog["authors"][0]
+    python, rust = blog["tags"][:2]
+
+    def from_son(*args, **kargs):
+        raise AssertionError("The relative should not be loaded.")
+
+    for document in (Author, Tag, Category):
+        monkeypatch.setattr(document, "_from_son", from_son)
+
+    status, document = fetch(api, "get", "/api/Post/{}".format(post.id))
+    assert status == 200
+
+    relationships = document["data"]["relationships"]
+    assert relationships["author"]["data"] == {
+        "type": "Author", "id": str(alice.id)
+    }
+    assert relationships["tags"]["data"] == [
+        {"type": "Tag", "id": str(python.id)},
+        {"type": "Tag", "id": str(rust.id)}
+    ]
+
+
+def test_reference_identifier(blog):
+    alice = blog["authors"][0]
+    field = Post._fields["author"]
+    reference_identifier = jsonapi.mongoengine.schema.reference_identifier
+
+    expected = ("Author", str(alice.id))
+    assert reference_identifier(field, alice.id) == expected
+    assert reference_identifier(field, alice.to_dbref()) == expected
+    assert reference_identifier(field, alice) == expected
+
+
+def test_linkage_inheritance(api, fetch, pets):
+    status, document = fetch(api, "get", "/api/Owner/{}".format(pets.id))
+    assert status == 200
+
+    dog = {"type": "Dog", "id": str(pets.pets[0].id)}
+    relationships = document["data"]["relationships"]
+    assert relationships["favorite"]["data"] == dog
+    assert relationships["pets"]["data"] == [dog]
+
+
+# user-047
+# ~~~~~~~~
+
+def test_sort_related_attribute(api, fetch, blog):
+    Post(title="d").save()
+    status, document = fetch(api, "get", "/api/Post?sort=-author.name,title")
+    assert status == 200
+    assert titles(document) == ["c", "a", "b", "d"]
+
+
+@pytest.mark.parametrize("sort", ["tags.name", "author.age"])
+def test_sort_unsortable_path(api, fetch, blog, sort):
+    status, _ = fetch(api, "get", "/api/Post?sort=" + sort)
+    assert status == 400
+
+
+# user-049
+# ~~~~~~~~
+
+def test_aggregate(api, fetch, blog):
+    status, document = fetch(
+        api, "get",
+        "/api/Post?aggregate[count]=*&aggregate[sum]=views"\
+        "&aggregate[min]=views&aggregate[max]=views&aggregate[avg]=views"
+    )
+    assert status == 200
+    assert document["meta"]["aggregates"] == [{
+        "group": {}, "count": {"*": 3}, "sum": {"views": 60},
+        "min": {"views": 10}, "max": {"views": 30}, "avg": {"views": 20}
+    }]
+
+
+def test_aggregate_group_by_relationship(api, fetch, blog):
+    alice, bob = blog["authors"]
+    status, document = fetch(
+        api, "get",
+        "/api/Post?aggregate[count]=*&aggregate[sum]=views&group[by]=author"
+    )
+    assert status == 200
+    results = sorted(
+        document["meta"]["aggregates"], key=lambda item: item["count"]["*"]
+    )
+    assert results == [
+        {"group": {"author": str(bob.id)}, "count": {"*": 1},
+            "sum": {"views": 30}},
+        {"group": {"author": str(alice.id)}, "count": {"*": 2},
+            "sum": {"views": 30}}
+    ]
@@ -0,0 +1,1148 @@
+#!/usr/bin/env python3
+
+"""
+Tests for the sqlalchemy adapter against an in-memory sqlite database.
+"""
+
+# std
+import asyncio
+import json
+import threading
+
+# third party
+import pytest
+
+sqlalchemy = pytest.importorskip("sqlalchemy")
+
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# local
+import jsonapi
+import jsonapi.asyncio
+import jsonapi.sqlalchemy
+
+
+Base = declarative_base()
+
+post_tags = sqlalchemy.Table(
+    "post_tags", Base.metadata,
+    sqlalchemy.Column("post_id", sqlalchemy.ForeignKey("posts.id")),
+    sqlalchemy.Column("tag_id", sqlalchemy.ForeignKey("tags.id"))
+)
+
+
+class Author(Base):
+    __tablename__ = "authors"
+    id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True)
+    name = sqlalchemy.Column(sqlalchemy.String)
+
+
+class Tag(Base):
+    __tablename__ = "tags"
+    id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True)
+    name = sqlalchemy.Column(sqlalchemy.String, unique=True)
+
+
+class Post(Base):
+    __tablename__ = "posts"
+    id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True)
+    title = sqlalchemy.Column(sqlalchemy.String)
+    views = sqlalchemy.Column(sqlalchemy.Integer, default=0)
+    author_id = sqlalchemy.Column(
+        sqlalchemy.Integer, sqlalchemy.ForeignKey("authors.id")
+    )
+    author = relationship(Author, backref="posts")
+    tags = relationship(Tag, secondary=post_tags, backref="posts")
+
+
+class Comment(Base):
+    __tablename__ = "comments"
+    id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True)
+    text = sqlalchemy.Column(sqlalchemy.String)
+    post_id = sqlalchemy.Column(
+        sqlalchemy.Integer, sqlalchemy.ForeignKey("posts.id")
+    )
+    post = relationship(
+        Post, backref=sqlalchemy.orm.backref(
+            "comments", cascade="all, delete-orphan"
+        )
+    )
+
+
+class Article(Base):
+    """
+    Mapped on an FTS5 virtual table, which is created in
+    :func:`sessionmaker_`.
+    """
+    __tablename__ = "articles"
+    rowid = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True)
+    title = sqlalchemy.Column(sqlalchemy.String, info={"jsonapi_search": True})
+    text = sqlalchemy.Column(sqlalchemy.String)
+
+
+@pytest.fixture
+def sessionmaker_():
+    engine = sqlalchemy.create_engine(
+        "sqlite://", connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    sqlalchemy.event.listen(
+        engine, "connect",
+        lambda connection, record: connection.execute("PRAGMA foreign_keys=ON")
+    )
+    Base.metadata.create_all(
+        engine, tables=[
+            table for table in Base.metadata.sorted_tables\
+            if table is not Article.__table__
+        ]
+    )
+    engine.execute("CREATE VIRTUAL TABLE articles USING fts5(title, text)")
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def session(sessionmaker_):
+    """
+    A session for preparing and checking the database state.
+    """
+    session = sessionmaker_()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def api(sessionmaker_):
+    db = jsonapi.sqlalchemy.Database(sessionmaker_)
+    api = jsonapi.base.api.API("/api", db)
+    for resource_class in (Author, Tag, Post, Comment, Article):
+        api.add_type(jsonapi.sqlalchemy.Schema(resource_class))
+    return api
+
+
+@pytest.fixture
+def asyncio_api(sessionmaker_):
+    """
+    An asynchronous API, which runs the sqlalchemy adapter in worker
+    threads.
+    """
+    db = jsonapi.asyncio.database.ExecutorDatabase(
+        jsonapi.sqlalchemy.Database(sessionmaker_), max_workers=2
+    )
+    api = jsonapi.asyncio.api.API("/api", db)
+    for resource_class in (Author, Tag, Post, Comment):
+        api.add_type(jsonapi.sqlalchemy.Schema(resource_class))
+    return api
+
+
+@pytest.fixture
+def blog(session):
+    """
+    Two authors, three tags, three posts and three comments.
+    """
+    alice, bob = Author(name="alice"), Author(name="bob")
+    python, rust, go = Tag(name="python"), Tag(name="rust"), Tag(name="go")
+    posts = [
+        Post(title="a", views=10, author=alice, tags=[python, rust]),
+        Post(title="b", views=20, author=alice, tags=[python]),
+        Post(title="c", views=30, author=bob)
+    ]
+    comments = [
+        Comment(text="x", post=posts[0]), Comment(text="y", post=posts[0]),
+        Comment(text="z", post=posts[1])
+    ]
+    session.add_all(posts + comments + [go])
+    session.commit()
+    return None
+
+
+def tag_ids(session, post_id):
+    session.expire_all()
+    return sorted(tag.id for tag in session.query(Post).get(post_id).tags)
+
+
+# user-039
+# ~~~~~~~~
+
+def test_replace_to_many_relationship(api, fetch, session, blog):
+    status, _ = fetch(
+        api, "patch", "/api/Post/1/relationships/tags",
+        {"data": [{"type": "Tag", "id": "2"}, {"type": "Tag", "id": "3"}]}
+    )
+    assert status == 200
+    assert tag_ids(session, 1) == [2, 3]
+
+
+def test_extend_to_many_relationship(api, fetch, session, blog):
+    status, _ = fetch(
+        api, "post", "/api/Post/2/relationships/tags",
+        {"data": [{"type": "Tag", "id": "1"}, {"type": "Tag", "id": "3"}]}
+    )
+    assert status == 200
+    assert tag_ids(session, 2) == [1, 3]
+
+
+@pytest.fixture
+def collection_loads(monkeypatch):
+    """
+    Records the names of the to-many relationships, whichs collection is
+    loaded.
+    """
+    loads = list()
+    relationship_class = jsonapi.sqlalchemy.schema.ToManyRelationship
+    get = relationship_class.get
+
+    def spy(self, resource):
+        loads.append(self.name)
+        return get(self, resource)
+
+    monkeypatch.setattr(relationship_class, "get", spy)
+    return loads
+
+
+def test_get_identifiers(api, session, blog):
+    tags = api.get_schema("Post").relationships["tags"]
+    posts = api.get_schema("Author").relationships["posts"]
+
+    post, author = session.query(Post).get(1), session.query(Author).get(1)
+    assert sorted(tags.get_identifiers(post)) == [("Tag", "1"), ("Tag", "2")]
+    assert sorted(posts.get_identifiers(author)) == [
+        ("Post", "1"), ("Post", "2")
+    ]
+    assert not "tags" in sqlalchemy.inspect(post).dict
+    assert not "posts" in sqlalchemy.inspect(author).dict
+
+
+def test_update_to_many_relationship_without_loading(
+    api, fetch, session, blog, collection_loads
+    ):
+    status, _ = fetch(
+        api, "patch", "/api/Post/1/relationships/tags",
+        {"data": [{"type": "Tag", "id": "2"}, {"type": "Tag", "id": "3"}]}
+    )
+    assert status == 200
+    status, _ = fetch(
+        api, "patch", "/api/Post/1/relationships/tags",
+        {"data": [{"type": "Tag", "id": "2"}]}
+    )
+    assert status == 200
+    assert collection_loads == []
+    assert tag_ids(session, 1) == [2]
+
+
+def test_update_one_to_many_relationship_without_loading(
+    api, fetch, session, blog, collection_loads
+    ):
+    status, _ = fetch(
+        api, "post", "/api/Author/2/relationships/posts",
+        {"data": [{"type": "Post", "id": "1"}]}
+    )
+    assert status == 200
+    status, _ = fetch(
+        api, "patch", "/api/Author/1/relationships/posts",
+        {"data": []}
+    )
+    assert status == 200
+    assert collection_loads == []
+
+    session.expire_all()
+    authors = [post.author_id for post in session.query(Post).order_by(Post.id)]
+    assert authors == [2, None, 2]
+
+
+# user-036
+# ~~~~~~~~
+
+def test_delete_where_removes_association_rows(api, fetch, session, blog):
+    status, document = fetch(
+        api, "delete", '/api/Tag?filter[name]=eq:"python"'
+    )
+    assert status == 200
+    assert document["meta"]["deleted-resources"] == 1
+    assert session.query(post_tags).filter_by(tag_id=1).count() == 0
+    assert tag_ids(session, 1) == [2]
+
+
+def test_delete_where_nullifies_foreign_keys(api, fetch, session, blog):
+    status, document = fetch(
+        api, "delete", "/api/Author",
+        {"data": [{"type": "Author", "id": "1"}]}
+    )
+    assert status == 200
+    assert document["meta"]["deleted-resources"] == 1
+    assert session.query(Post).filter_by(author_id=1).count() == 0
+    assert session.query(Post).count() == 3
+
+
+def test_delete_where_cascades(api, fetch, session, blog):
+    status, document = fetch(
+        api, "delete", "/api/Post?filter[views]=lt:25"
+    )
+    assert status == 200
+    assert document["meta"]["deleted-resources"] == 2
+    assert [post.title for post in session.query(Post)] == ["c"]
+    assert session.query(Comment).count() == 0
+    assert session.query(post_tags).count() == 0
+
+
+# user-050
+# ~~~~~~~~
+
+@pytest.mark.parametrize("raw_rows", [False, True])
+def test_relationship_counts(api, fetch, blog, raw_rows):
+    api.settings["sqlalchemy_raw_rows"] = raw_rows
+    status, document = fetch(
+        api, "get", "/api/Post?meta[counts]=comments,tags&sort=title"
+    )
+    assert status == 200
+
+    relationships = [item["relationships"] for item in document["data"]]
+    assert [rels["comments"] for rels in relationships] == [
+        {"meta": {"count": 2}}, {"meta": {"count": 1}}, {"meta": {"count": 0}}
+    ]
+    assert [rels["tags"] for rels in relationships] == [
+        {"meta": {"count": 2}}, {"meta": {"count": 1}}, {"meta": {"count": 0}}
+    ]
+    assert relationships[0]["author"] == {"data": {"type": "Author", "id": "1"}}
+
+
+def test_relationship_counts_to_one(api, fetch, blog):
+    status, _ = fetch(api, "get", "/api/Post?meta[counts]=author")
+    assert status == 400
+
+
+# user-038
+# ~~~~~~~~
+
+def test_import_ndjson_rolls_back_rejected_batch(api, session):
+    lines = [
+        {"type": "Tag", "attributes": {"name": "a"}},
+        {"type": "Tag", "attributes": {"name": "a"}},
+        {"type": "Tag", "attributes": {"name": "b"}},
+        {"type": "Tag", "attributes": {"name": "c"}}
+    ]
+    body = "\n".join(json.dumps(line) for line in lines).encode()
+
+    reports = api.import_ndjson([body], typename="Tag", batch_size=2)
+    assert [report["created"] for report in reports] == [0, 2]
+    assert reports[0]["lines"] == [1, 2]
+    assert [error["status"] for error in reports[0]["errors"]] == [500]
+    assert reports[0]["errors"][0]["line"] is None
+    assert reports[1]["errors"] == []
+    assert sorted(tag.name for tag in session.query(Tag)) == ["b", "c"]
+
+
+# user-035
+# ~~~~~~~~
+
+def test_update_many_resources(api, fetch, session, blog):
+    status, document = fetch(api, "patch", "/api/Post", {"data": [
+        {
+            "type": "Post", "id": "1", "attributes": {"title": "A"},
+            "relationships": {
+                "tags": {"data": [
+                    {"type": "Tag", "id": "2"}, {"type": "Tag", "id": "3"}
+                ]},
+                "author": {"data": {"type": "Author", "id": "2"}}
+            }
+        },
+        {
+            "type": "Post", "id": "3",
+            "relationships": {"tags": {"data": [{"type": "Tag", "id": "1"}]}}
+        }
+    ]})
+    assert status == 200
+    assert [item["id"] for item in document["data"]] == ["1", "3"]
+
+    session.expire_all()
+    post = session.query(Post).get(1)
+    assert (post.title, post.author_id) == ("A", 2)
+    assert tag_ids(session, 1) == [2, 3]
+    assert tag_ids(session, 2) == [1]
+    assert tag_ids(session, 3) == [1]
+
+
+def test_update_many_resources_unknown_relative(api, fetch, session, blog):
+    status, _ = fetch(api, "patch", "/api/Post", {"data": [{
+        "type": "Post", "id": "1",
+        "relationships": {"tags": {"data": [{"type": "Tag", "id": "9"}]}}
+    }]})
+    assert status == 404
+    assert tag_ids(session, 1) == [1, 2]
+
+
+def test_update_many_resources_does_not_load_relatives(
+    api, fetch, session, blog, monkeypatch
+    ):
+    loaded = list()
+    get_many = jsonapi.sqlalchemy.database.Session.get_many
+
+    def spy(self, identifiers, required=False):
+        if identifiers:
+            loaded.append(set(identifiers))
+        return get_many(self, identifiers, required)
+
+    monkeypatch.setattr(jsonapi.sqlalchemy.database.Session, "get_many", spy)
+    status, _ = fetch(api, "patch", "/api/Post", {"data": [{
+        "type": "Post", "id": "1",
+        "relationships": {"tags": {"data": [
+            {"type": "Tag", "id": "1"}, {"type": "Tag", "id": "3"}
+        ]}}
+    }]})
+    assert status == 200
+    # The relationship accepts identifiers, so the new tags are not loaded.
+    assert loaded == [{("Post", "1")}]
+    assert tag_ids(session, 1) == [1, 3]
+
+
+# user-048
+# ~~~~~~~~
+
+@pytest.fixture
+def articles(session):
+    session.add_all([
+        Article(title="python and sqlite", text="x"),
+        Article(title="sqlite", text="y"),
+        Article(title="python", text="sqlite")
+    ])
+    session.commit()
+    return None
+
+
+def test_search(api, fetch, articles):
+    status, document = fetch(
+        api, "get", '/api/Article?filter[title]=search:"sqlite"'\
+        '&sort=relevance'
+    )
+    assert status == 200
+    assert [item["attributes"]["title"] for item in document["data"]] == [
+        "sqlite", "python and sqlite"
+    ]
+
+
+def test_search_query_syntax_is_plain_text(api, fetch, articles):
+    status, document = fetch(
+        api, "get", '/api/Article?filter[title]=search:"python AND (sq*"'
+    )
+    assert status == 200
+    assert document["data"] == []
+
+
+def test_search_undeclared_field(api, fetch, blog, articles):
+    status, _ = fetch(api, "get", '/api/Article?filter[text]=search:"x"')
+    assert status == 400
+
+    status, _ = fetch(api, "get", '/api/Post?filter[title]=search:"a"')
+    assert status == 400
+
+
+def test_sort_relevance_without_search(api, fetch, articles):
+    status, _ = fetch(api, "get", "/api/Article?sort=relevance")
+    assert status == 400
+
+
+# user-031
+# ~~~~~~~~
+
+@pytest.mark.parametrize("include", ["", "&include=author"])
+def test_stream_collection(api, fetch, blog, include):
+    uri = "/api/Post?sort=title&fields[Post]=title" + include
+    status, expected = fetch(api, "get", uri)
+    assert status == 200
+
+    api.settings["stream_collections"] = True
+    status, document = fetch(api, "get", uri)
+    assert status == 200
+    assert document == expected
+
+
+def test_stream_collection_chunks(api, blog, monkeypatch):
+    dump_json_chunks = api.dump_json_chunks
+    monkeypatch.setattr(
+        api, "dump_json_chunks",
+        lambda d: dump_json_chunks(d, chunk_size=1)
+    )
+    api.settings["stream_collections"] = True
+
+    request = jsonapi.base.request.Request(
+        "/api/Post?sort=title", "get",
+        {"content-type": "application/vnd.api+json"}, b""
+    )
+    response = api.handle_request(request)
+    assert response.is_stream and not response.has_body
+
+    chunks = list(response.chunks)
+    assert len(chunks) == 4
+    document = json.loads(b"".join(chunks).decode())
+    assert [item["id"] for item in document["data"]] == ["1", "2", "3"]
+
+
+def test_stream_error_before_first_chunk(api, fetch, blog, monkeypatch):
+    def query_iter(self, typename, **kargs):
+        raise jsonapi.base.errors.BadRequest(detail="Broken cursor.")
+        yield None
+
+    monkeypatch.setattr(
+        jsonapi.sqlalchemy.database.Session, "query_iter", query_iter
+    )
+    status, document = fetch(api, "get", "/api/Post?export=ndjson")
+    assert status == 400
+    assert document["errors"][0]["detail"] == "Broken cursor."
+
+
+def test_stream_error_after_first_chunk(
+    api, fetch, session, blog, monkeypatch, caplog
+    ):
+    def query_iter(self, typename, **kargs):
+        yield self.sqla_session.query(Post).get(1)
+        raise RuntimeError("Lost connection.")
+
+    monkeypatch.setattr(
+        jsonapi.sqlalchemy.database.Session, "query_iter", query_iter
+    )
+
+    # Send each line in its own chunk.
+    dump_ndjson_chunks = api.dump_ndjson_chunks
+    monkeypatch.setattr(
+        api, "dump_ndjson_chunks",
+        lambda items: dump_ndjson_chunks(items, chunk_size=1)
+    )
+
+    request = jsonapi.base.request.Request(
+        "/api/Post?export=ndjson", "get",
+        {"content-type": "application/vnd.api+json"}, b""
+    )
+    response = api.handle_request(request)
+    assert response.status == 200
+    assert json.loads(next(response.chunks).decode())["id"] == "1"
+    with pytest.raises(RuntimeError):
+        next(response.chunks)
+    assert "Lost connection." in caplog.text
+
+
+def test_stream_collection_asyncio(asyncio_api, fetch, blog, monkeypatch):
+    threads = list()
+    serialize_many = jsonapi.base.serializer.serialize_many
+
+    def spy(resources, fields=None):
+        threads.append((len(resources), threading.get_ident()))
+        return serialize_many(resources, fields)
+
+    monkeypatch.setattr(jsonapi.base.serializer, "serialize_many", spy)
+    asyncio_api.settings["asyncio_offload_threshold"] = 2
+    asyncio_api.settings["stream_batch_size"] = 2
+    asyncio_api.settings["stream_collections"] = True
+
+    status, document = fetch(asyncio_api, "get", "/api/Post?sort=title")
+    assert status == 200
+    assert [item["id"] for item in document["data"]] == ["1", "2", "3"]
+    assert document["included"] == []
+
+    # Each batch is serialized on its own, the large one in the executor.
+    offloaded = [
+        (size, thread != threading.get_ident())\
+        for size, thread in threads if size
+    ]
+    assert offloaded == [(2, True), (1, False)]
+
+
+# user-033
+# ~~~~~~~~
+
+def test_export_ndjson(api, fetch, blog):
+    api.settings["stream_batch_size"] = 1
+    status, lines = fetch(
+        api, "get",
+        "/api/Post?export=ndjson&filter[views]=gte:20&sort=-title"\
+        "&fields[Post]=title,author&page[size]=1"
+    )
+    assert status == 200
+    assert lines == [
+        {
+            "type": "Post", "id": "3", "attributes": {"title": "c"},
+            "relationships": {"author": {"data": {"type": "Author", "id": "2"}}}
+        },
+        {
+            "type": "Post", "id": "2", "attributes": {"title": "b"},
+            "relationships": {"author": {"data": {"type": "Author", "id": "1"}}}
+        }
+    ]
+
+
+def test_export_ndjson_asyncio(asyncio_api, fetch, blog, monkeypatch):
+    asyncio_api.settings["stream_batch_size"] = 2
+
+    batches = list()
+    serialize_many = asyncio_api.serialize_many
+
+    def spy(resources, fields):
+        batches.append(len(resources))
+        return serialize_many(resources, fields)
+
+    monkeypatch.setattr(asyncio_api, "serialize_many", spy)
+
+    status, lines = fetch(
+        asyncio_api, "get",
+        "/api/Post?export=ndjson&sort=-title&fields[Post]=title"
+    )
+    assert status == 200
+    assert [line["attributes"] for line in lines] == [
+        {"title": "c"}, {"title": "b"}, {"title": "a"}
+    ]
+    assert batches == [2, 1]
+
+
+def test_export_ndjson_asyncio_is_lazy(asyncio_api, blog, monkeypatch):
+    batches = list()
+    next_batch = jsonapi.asyncio.database.ExecutorBatchIterator.next_batch
+
+    def spy(self):
+        batches.append(self)
+        return next_batch(self)
+
+    monkeypatch.setattr(
+        jsonapi.asyncio.database.ExecutorBatchIterator, "next_batch", spy
+    )
+    asyncio_api.settings["stream_batch_size"] = 1
+
+    request = jsonapi.base.request.Request(
+        "/api/Post?export=ndjson&sort=title", "get",
+        {"content-type": "application/vnd.api+json"}, b""
+    )
+    loop = asyncio.new_event_loop()
+    try:
+        response = loop.run_until_complete(
+            asyncio_api.handle_request(request)
+        )
+        # Only the first batch is loaded, before the response is sent.
+        assert len(batches) == 1
+
+        # The first chunk has already been created.
+        lines = list()
+        for chunk in response.chunks:
+            if not isinstance(chunk, bytes):
+                chunk = loop.run_until_complete(chunk)
+            lines.append(chunk)
+            assert len(batches) == len(lines)
+    finally:
+        loop.close()
+
+    assert [json.loads(line.decode())["id"] for line in lines[:-1]] == [
+        "1", "2", "3"
+    ]
+    assert lines[-1] == b""
+
+
+# user-029
+# ~~~~~~~~
+
+def test_executor_database(asyncio_api, fetch, session, blog, monkeypatch):
+    threads = list()
+    query = jsonapi.sqlalchemy.database.Session.query
+
+    def spy(self, *args, **kargs):
+        threads.append(threading.get_ident())
+        return query(self, *args, **kargs)
+
+    monkeypatch.setattr(jsonapi.sqlalchemy.database.Session, "query", spy)
+
+    status, document = fetch(
+        asyncio_api, "get", "/api/Post?sort=title&include=author"
+    )
+    assert status == 200
+    assert [item["id"] for item in document["data"]] == ["1", "2", "3"]
+    assert sorted(item["id"] for item in document["included"]) == ["1", "2"]
+    assert len(threads) == 1 and threads[0] != threading.get_ident()
+
+    status, document = fetch(asyncio_api, "post", "/api/Tag", {"data": {
+        "type": "Tag", "attributes": {"name": "c"}
+    }})
+    assert document["data"]["attributes"] == {"name": "c"}
+    assert session.query(Tag).filter_by(name="c").count() == 1
+
+
+# user-030
+# ~~~~~~~~
+
+@pytest.mark.parametrize("threshold", [None, 2])
+def test_offload_serialization(
+    asyncio_api, fetch, blog, monkeypatch, threshold
+    ):
+    threads = list()
+    serialize_many = jsonapi.base.serializer.serialize_many
+
+    def spy(resources, fields=None):
+        threads.append(threading.get_ident())
+        return serialize_many(resources, fields)
+
+    monkeypatch.setattr(jsonapi.base.serializer, "serialize_many", spy)
+
+    asyncio_api.settings["asyncio_offload_threshold"] = threshold
+    status, document = fetch(
+        asyncio_api, "get", "/api/Post?sort=title&include=author"
+    )
+    assert status == 200
+    assert [item["attributes"]["title"] for item in document["data"]] == [
+        "a", "b", "c"
+    ]
+    assert len(document["included"]) == 2
+
+    # The included resources and the primary data.
+    offloaded = [thread != threading.get_ident() for thread in threads]
+    assert offloaded == [threshold is not None]*2
+
+
+# user-032
+# ~~~~~~~~
+
+def test_query_iter(api, blog):
+    resources = api.database.session().query_iter(
+        "Post", order=[("-", "title")], filters=[("views", "gt", 10)],
+        batch_size=1
+    )
+    assert not isinstance(resources, list)
+    assert [post.title for post in resources] == ["c", "b"]
+
+
+def test_stream_collection_query_iter(api, fetch, blog, monkeypatch):
+    calls = list()
+    query_iter = jsonapi.sqlalchemy.database.Session.query_iter
+
+    def spy(self, typename, **kargs):
+        calls.append(kargs["batch_size"])
+        return query_iter(self, typename, **kargs)
+
+    monkeypatch.setattr(
+        jsonapi.sqlalchemy.database.Session, "query_iter", spy
+    )
+    api.settings["stream_collections"] = True
+    api.settings["stream_batch_size"] = 2
+
+    status, document = fetch(api, "get", "/api/Post?sort=title")
+    assert status == 200
+    assert [item["id"] for item in document["data"]] == ["1", "2", "3"]
+    assert calls == [2]
+
+
+def test_query_iter_asyncio(asyncio_api, blog, monkeypatch):
+    threads = list()
+    query_iter = jsonapi.sqlalchemy.database.Session.query_iter
+
+    def spy(self, typename, **kargs):
+        for resource in query_iter(self, typename, **kargs):
+            threads.append(threading.get_ident())
+            yield resource
+
+    monkeypatch.setattr(
+        jsonapi.sqlalchemy.database.Session, "query_iter", spy
+    )
+
+    @asyncio.coroutine
+    def titles():
+        session = asyncio_api.database.session()
+        batches = yield from session.query_iter(
+            "Post", order=[("+", "title")], batch_size=2
+        )
+        result = list()
+        while True:
+            batch = yield from batches.next_batch()
+            if not batch:
+                return result
+            result.append([post.title for post in batch])
+
+    loop = asyncio.new_event_loop()
+    try:
+        assert loop.run_until_complete(titles()) == [["a", "b"], ["c"]]
+    finally:
+        loop.close()
+
+    # The cursor is only used in the worker thread of the session.
+    assert len(set(threads)) == 1 and threads[0] != threading.get_ident()
+
+
+def test_stream_collection_asyncio_query_iter(
+    asyncio_api, fetch, blog, monkeypatch
+    ):
+    def query(self, *args, **kargs):
+        raise AssertionError("The result must not be loaded at once.")
+
+    monkeypatch.setattr(jsonapi.sqlalchemy.database.Session, "query", query)
+    asyncio_api.settings["stream_collections"] = True
+    asyncio_api.settings["stream_batch_size"] = 2
+
+    status, document = fetch(asyncio_api, "get", "/api/Post?sort=-title")
+    assert status == 200
+    assert [item["id"] for item in document["data"]] == ["3", "2", "1"]
+
+
+# user-034
+# ~~~~~~~~
+
+def test_create_many_resources(api, fetch, session, blog):
+    status, document = fetch(api, "post", "/api/Post", {"data": [
+        {
+            "type": "Post", "attributes": {"title": "d"},
+            "relationships": {
+                "author": {"data": {"type": "Author", "id": "2"}},
+                "tags": {"data": [{"type": "Tag", "id": "3"}]}
+            }
+        },
+        {"type": "Post", "attributes": {"title": "e"}}
+    ]})
+    assert [item["attributes"]["title"] for item in document["data"]] == [
+        "d", "e"
+    ]
+    assert document["data"][0]["links"]["self"].endswith(
+        "/Post/" + document["data"][0]["id"]
+    )
+
+    post = session.query(Post).filter_by(title="d").one()
+    assert post.author_id == 2
+    assert [tag.id for tag in post.tags] == [3]
+    assert session.query(Post).count() == 5
+
+
+def test_create_many_resources_unknown_relative(api, fetch, session, blog):
+    status, _ = fetch(api, "post", "/api/Post", {"data": [
+        {"type": "Post", "attributes": {"title": "d"}},
+        {
+            "type": "Post", "attributes": {"title": "e"},
+            "relationships": {"tags": {"data": [{"type": "Tag", "id": "9"}]}}
+        }
+    ]})
+    assert status == 404
+    assert session.query(Post).count() == 3
+
+
+def test_create_many_resources_wrong_type(api, fetch, session, blog):
+    status, _ = fetch(api, "post", "/api/Post", {"data": [
+        {"type": "Post", "attributes": {"title": "d"}},
+        {"type": "Tag", "attributes": {"name": "e"}}
+    ]})
+    assert status == 409
+    assert session.query(Post).count() == 3
+
+
+# user-037
+# ~~~~~~~~
+
+def test_batch(api, fetch, session, blog):
+    status, document = fetch(api, "post", "/api/batch", {
+        "atomic:operations": [
+            {
+                "op": "add",
+                "data": {
+                    "type": "Post", "lid": "p", "attributes": {"title": "d"},
+                    "relationships": {
+                        "author": {"data": {"type": "Author", "id": "2"}}
+                    }
+                }
+            },
+            {
+                "op": "add",
+                "ref": {"type": "Post", "lid": "p", "relationship": "tags"},
+                "data": [{"type": "Tag", "id": "3"}]
+            },
+            {
+                "op": "update",
+                "data": {
+                    "type": "Author", "id": "1", "attributes": {"name": "eve"}
+                }
+            },
+            {"op": "remove", "ref": {"type": "Comment", "id": "3"}}
+        ]
+    })
+    assert status == 200
+
+    results = document["atomic:results"]
+    assert len(results) == 4
+    assert results[0]["data"]["attributes"]["title"] == "d"
+    assert results[1]["data"] == [{"type": "Tag", "id": "3"}]
+    assert results[2]["data"]["attributes"]["name"] == "eve"
+    assert results[3] == {}
+
+    session.expire_all()
+    post = session.query(Post).filter_by(title="d").one()
+    assert post.author_id == 2
+    assert [tag.id for tag in post.tags] == [3]
+    assert session.query(Author).get(1).name == "eve"
+    assert session.query(Comment).get(3) is None
+
+
+@pytest.mark.parametrize("api_fixture", ["api", "asyncio_api"])
+def test_batch_is_atomic(request, fetch, session, blog, api_fixture):
+    api = request.getfixturevalue(api_fixture)
+    status, document = fetch(api, "post", "/api/batch", {
+        "atomic:operations": [
+            {
+                "op": "update",
+                "data": {
+                    "type": "Author", "id": "1", "attributes": {"name": "eve"}
+                }
+            },
+            {"op": "add", "data": {"type": "Tag", "attributes": {"name": "c"}}},
+            {"op": "remove", "ref": {"type": "Comment", "id": "9"}}
+        ]
+    })
+    assert status == 404
+
+    session.expire_all()
+    assert session.query(Author).get(1).name == "alice"
+    assert session.query(Tag).filter_by(name="c").count() == 0
+
+
+def test_batch_unknown_local_id(api, fetch, session, blog):
+    status, document = fetch(api, "post", "/api/batch", {
+        "atomic:operations": [{
+            "op": "add",
+            "ref": {"type": "Post", "lid": "x", "relationship": "tags"},
+            "data": [{"type": "Tag", "id": "3"}]
+        }]
+    })
+    assert status == 400
+    assert document["errors"][0]["source"]["pointer"] == \
+        "/atomic:operations/0/ref/lid/"
+
+
+# user-040
+# ~~~~~~~~
+
+def test_related_paginated(api, fetch, blog):
+    status, document = fetch(
+        api, "get",
+        "/api/Author/1/posts?sort=-title&page[size]=1&page[number]=1"
+    )
+    assert status == 200
+    assert [item["attributes"]["title"] for item in document["data"]] == ["b"]
+    assert document["meta"]["total-resources"] == 2
+
+
+def test_related_filtered(api, fetch, blog):
+    status, document = fetch(
+        api, "get", '/api/Post/1/tags?filter[name]=eq:"rust"'
+    )
+    assert status == 200
+    assert [item["attributes"]["name"] for item in document["data"]] == [
+        "rust"
+    ]
+
+    status, document = fetch(
+        api, "get", '/api/Author/1/posts?filter[title]=eq:"a"'
+    )
+    assert status == 200
+    assert [item["id"] for item in document["data"]] == ["1"]
+
+
+def test_relationship_paginated(api, fetch, blog):
+    status, document = fetch(
+        api, "get",
+        "/api/Author/1/relationships/posts?sort=title&page[size]=1"\
+        "&page[number]=2"
+    )
+    assert status == 200
+    assert document["data"] == [{"type": "Post", "id": "2"}]
+    assert document["meta"]["total-resources"] == 2
+
+
+# user-041
+# ~~~~~~~~
+
+@pytest.mark.parametrize("uri, loads_resources", [
+    ("/api/Post?sort=title", True),
+    ("/api/Post?sort=title&fields[Post]=title,author", False),
+    ('/api/Post?sort=-views&filter[author.name]=eq:"alice"&fields[Post]=views',
+        False),
+    ("/api/Post?sort=title&fields[Post]=title,tags", True),
+    ("/api/Author?sort=name&page[size]=1&page[number]=2", True)
+])
+def test_raw_rows(api, fetch, blog, monkeypatch, uri, loads_resources):
+    status, expected = fetch(api, "get", uri)
+    assert status == 200
+
+    queries = list()
+    query = jsonapi.sqlalchemy.database.Session.query
+
+    def spy(self, *args, **kargs):
+        queries.append(args)
+        return query(self, *args, **kargs)
+
+    monkeypatch.setattr(jsonapi.sqlalchemy.database.Session, "query", spy)
+    api.settings["sqlalchemy_raw_rows"] = True
+
+    status, document = fetch(api, "get", uri)
+    assert status == 200
+    assert document == expected
+    assert bool(queries) == loads_resources
+
+
+# user-044
+# ~~~~~~~~
+
+@pytest.fixture
+def identifier_relationship(api, monkeypatch):
+    """
+    Lets the *tags* relationship of *Post* accept identifiers and records
+    the identifiers passed to *extend()*.
+    """
+    relationship = api.get_schema("Post").relationships["tags"]
+    extended = list()
+    monkeypatch.setattr(relationship, "accepts_identifiers", True)
+    monkeypatch.setattr(
+        relationship, "extend",
+        lambda resource, identifiers: extended.extend(identifiers)
+    )
+    return extended
+
+
+def test_extend_by_identifiers(
+    api, fetch, blog, identifier_relationship, monkeypatch
+    ):
+    checked = list()
+    monkeypatch.setattr(
+        jsonapi.sqlalchemy.database.Session, "check_existence",
+        lambda self, identifiers: checked.extend(identifiers)
+    )
+    status, _ = fetch(
+        api, "post", "/api/Post/1/relationships/tags",
+        {"data": [{"type": "Tag", "id": "2"}, {"type": "Tag", "id": "3"}]}
+    )
+    assert status == 200
+    assert checked == [("Tag", "3")]
+    assert identifier_relationship == [("Tag", "3")]
+
+
+def test_extend_by_identifiers_checks_existence(
+    api, fetch, blog, identifier_relationship
+    ):
+    status, _ = fetch(
+        api, "post", "/api/Post/1/relationships/tags",
+        {"data": [{"type": "Tag", "id": "9"}]}
+    )
+    assert status == 404
+    assert identifier_relationship == []
+
+
+# user-046
+# ~~~~~~~~
+
+def titles(document):
+    return [item["attributes"]["title"] for item in document["data"]]
+
+
+@pytest.mark.parametrize("query, expected", [
+    ('filter[author.name]=eq:"alice"', ["a", "b"]),
+    ("filter[author]=eq:2", ["c"]),
+    ("filter[author]=exists:false", []),
+    ('filter[tags.name]=in:["rust","go"]', ["a"]),
+    ("filter[tags]=in:[1]", ["a", "b"]),
+    ("filter[tags]=exists:false", ["c"]),
+    ('filter[comments.text]=eq:"z"', ["b"])
+])
+def test_filter_path(api, fetch, blog, query, expected):
+    status, document = fetch(api, "get", "/api/Post?sort=title&" + query)
+    assert status == 200
+    assert titles(document) == expected
+
+
+def test_filter_nested_path(api, fetch, blog):
+    status, document = fetch(
+        api, "get",
+        '/api/Comment?filter[post.author.name]=eq:"alice"&sort=-text'
+    )
+    assert status == 200
+    texts = [item["attributes"]["text"] for item in document["data"]]
+    assert texts == ["z", "y", "x"]
+
+
+def test_filter_unknown_path(api, fetch, blog):
+    status, _ = fetch(api, "get", '/api/Post?filter[title.name]=eq:"a"')
+    assert status == 400
+
+    status, _ = fetch(api, "get", '/api/Post?filter[author.age]=eq:1')
+    assert status == 400
+
+
+def test_delete_where_path_filter(api, fetch, session, blog):
+    status, document = fetch(
+        api, "delete", '/api/Post?filter[author.name]=eq:"bob"'
+    )
+    assert status == 200
+    assert document["meta"]["deleted-resources"] == 1
+    assert sorted(post.title for post in session.query(Post)) == ["a", "b"]
+
+
+# user-047
+# ~~~~~~~~
+
+def test_sort_related_attribute(api, fetch, session, blog):
+    # A post without an author.
+    session.add(Post(title="d", views=0))
+    session.commit()
+
+    status, document = fetch(api, "get", "/api/Post?sort=-author.name,title")
+    assert status == 200
+    assert titles(document) == ["c", "a", "b", "d"]
+    assert len(document["data"]) == session.query(Post).count()
+
+
+def test_sort_nested_related_attribute(api, fetch, session, blog):
+    # A comment on the post of bob.
+    session.add(Comment(text="w", post_id=3))
+    session.commit()
+
+    status, document = fetch(
+        api, "get", "/api/Comment?sort=-post.author.name,text&page[size]=3"\
+        "&page[number]=1"
+    )
+    assert status == 200
+    texts = [item["attributes"]["text"] for item in document["data"]]
+    assert texts == ["w", "x", "y"]
+    assert document["meta"]["total-resources"] == 4
+
+
+@pytest.mark.parametrize("sort", ["tags.name", "author.posts", "author.age"])
+def test_sort_unsortable_path(api, fetch, blog, sort):
+    status, _ = fetch(api, "get", "/api/Post?sort=" + sort)
+    assert status == 400
+
+
+# user-049
+# ~~~~~~~~
+
+def test_aggregate(api, fetch, blog):
+    status, document = fetch(
+        api, "get",
+        "/api/Post?aggregate[count]=*&aggregate[sum]=views"\
+        "&aggregate[min]=views&aggregate[max]=views&aggregate[avg]=views"
+    )
+    assert status == 200
+    assert document["meta"]["aggregates"] == [{
+        "group": {}, "count": {"*": 3}, "sum": {"views": 60},
+        "min": {"views": 10}, "max": {"views": 30}, "avg": {"views": 20}
+    }]
+
+
+def test_aggregate_group_by_relationship(api, fetch, blog):
+    status, document = fetch(
+        api, "get",
+        "/api/Post?aggregate[count]=*&aggregate[sum]=views&group[by]=author"\
+        "&filter[views]=gt:5"
+    )
+    assert status == 200
+    results = sorted(
+        document["meta"]["aggregates"], key=lambda item: item["group"]["author"]
+    )
+    assert results == [
+        {"group": {"author": "1"}, "count": {"*": 2}, "sum": {"views": 30}},
+        {"group": {"author": "2"}, "count": {"*": 1}, "sum": {"views": 30}}
+    ]
+
+
+@pytest.mark.parametrize("query", [
+    "aggregate[sum]=tags", "aggregate[sum]=views&group[by]=tags",
+    "aggregate[median]=views", "aggregate[sum]=*"
+])
+def test_aggregate_invalid(api, fetch, blog, query):
+    status, _ = fetch(api, "get", "/api/Post?" + query)
+    assert status == 400